@@ -222,6 +222,10 @@ class CustomTkButtonWidget(customtkinter.CTkFrame):
         """Sets the command function to be executed on button click."""
         self.command = command
 
+    def set_image(self, image):
+        """Shows an image (e.g. the clip waveform) under the text, None removes it."""
+        self.button_label.configure(image=image, compound="bottom")
+
 
 # --- Example Usage ---
 if __name__ == "__main__":
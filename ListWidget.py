@@ -27,6 +27,7 @@ class ListWidget(customtkinter.CTkScrollableFrame):
 
         self.columns = columns
         self._buttons = []  # Stores references to the CTkButton instances
+        self._items = []  # Item each button shows (show_items), None if hidden
         self._current_row = 0
         self._current_column = 0
 
@@ -199,6 +200,7 @@ class ListWidget(customtkinter.CTkScrollableFrame):
         )
 
         self._buttons.append(button)
+        self._items.append(None)
 
         # Update the current column and row for the next button
         self._current_column += 1
@@ -208,6 +210,65 @@ class ListWidget(customtkinter.CTkScrollableFrame):
 
         return button
 
+    def show_items(self, items, bind, **button_kwargs):
+        """
+        Shows one button per item, reusing the buttons that already exist.
+
+        Button i is re-bound to items[i] with bind(button, item) only when it
+        showed another item before; buttons beyond len(items) are hidden, not
+        destroyed, so filtering the list does not recreate widgets. New
+        buttons are created (with button_kwargs) only when there are more
+        items than ever before.
+
+        Args:
+            items (list): Items to show, in order (hashable, e.g. names).
+            bind (callable): bind(button, item) sets text, command, colors...
+            **button_kwargs: Arguments of the buttons that have to be created.
+        """
+        for index, item in enumerate(items):
+            if index < len(self._buttons):
+                button = self._buttons[index]
+                if self._items[index] is None:
+                    button.grid()  # Back in its cell
+            else:
+                button = self.add_button(text="", **button_kwargs)
+
+            if self._items[index] != item:
+                bind(button, item)
+                self._items[index] = item
+
+        for index in range(len(items), len(self._buttons)):
+            if self._items[index] is not None:
+                self._buttons[index].grid_remove()
+                self._items[index] = None
+
+    def rebind(self, item, bind):
+        """Binds the button showing item again, after the item changed."""
+        for button, shown in zip(self._buttons, self._items):
+            if shown == item:
+                bind(button, item)
+
+    def remove_button(self, button):
+        """
+        Removes one button from the widget.
+
+        Only the buttons after it move one cell back, the others are not
+        touched, so removing costs nothing for the buttons before it.
+        """
+        index = self._buttons.index(button)
+        self._buttons.pop(index)
+        if index < len(self._items):
+            self._items.pop(index)
+        button.destroy()
+
+        for position in range(index, len(self._buttons)):
+            row, column = divmod(position, self.columns)
+            self._buttons[position].grid(row=row, column=column)
+
+        self._current_row, self._current_column = divmod(
+            len(self._buttons), self.columns
+        )
+
     def clear_buttons(self):
         """
         Removes all buttons from the widget.
@@ -215,6 +276,7 @@ class ListWidget(customtkinter.CTkScrollableFrame):
         for button in self._buttons:
             button.destroy()  # Destroy the tkinter widget
         self._buttons.clear()  # Clear the list of references
+        self._items.clear()
         self._current_row = 0
         self._current_column = 0
 
@@ -0,0 +1,131 @@
+import os
+
+import customtkinter
+
+
+class MetricsPanel(customtkinter.CTkFrame):
+    """
+    A small status panel showing the real-time health of the audio streams:
+    dropped input (overflows), late output (underflows) and the worst
+    callback time. It reads EngineMetrics snapshots on its own timer, so the
+    audio thread never touches the UI. With a StallWatchdog it also shows the
+    stalls of the UI event loop itself, with a Recorder the current recording
+    and the blocks it dropped.
+    """
+
+    def __init__(
+        self,
+        master,
+        metrics=(),
+        watchdog=None,
+        recorder=None,
+        refresh_ms: int = 500,
+        font_size: int = 13,
+        text_color="#A2A2A2",
+        warning_color="#F44336",
+        **kwargs,
+    ):
+        """
+        Initializes the MetricsPanel.
+
+        Args:
+            master: The parent widget.
+            metrics (iterable): EngineMetrics objects to display, one line each.
+            watchdog (StallWatchdog): UI event loop monitor, None hides its line.
+            recorder (Recorder): Output recorder, None hides its line.
+            refresh_ms (int): Milliseconds between two refreshes.
+            font_size (int): Font size of the lines.
+            text_color (str): Color of a healthy stream.
+            warning_color (str): Color of a stream that had xruns.
+            **kwargs: Additional keyword arguments for CTkFrame.
+        """
+        super().__init__(master, **kwargs)
+
+        self.metrics = list(metrics)
+        self.watchdog = watchdog
+        self.recorder = recorder
+        self.refresh_ms = refresh_ms
+        self.text_color = text_color
+        self.warning_color = warning_color
+
+        self._labels = []
+        lines = len(self.metrics) + (watchdog is not None) + (recorder is not None)
+        for _ in range(lines):
+            label = customtkinter.CTkLabel(
+                self,
+                text="",
+                font=("Roboto", font_size),
+                text_color=text_color,
+                justify="left",
+                anchor="w",
+            )
+            label.pack(fill="x", padx=10)
+            self._labels.append(label)
+
+        self._refresh()
+
+    @staticmethod
+    def format_snapshot(snapshot):
+        text = (
+            f"{snapshot['name']}: {snapshot['input_overflows']} in / "
+            f"{snapshot['output_underflows']} out xruns\n"
+            f"worst {snapshot['worst_callback_ms']:.2f} ms "
+            f"({snapshot['worst_load']:.0%} of block)"
+        )
+
+        # Saving of the voice gate: share of idle blocks and their cost
+        if snapshot["bypassed_callbacks"]:
+            idle = snapshot["bypassed_callbacks"] / snapshot["callbacks"]
+            text += (
+                f"\nidle {idle:.0%}: {snapshot['mean_bypassed_ms']:.3f} ms "
+                f"vs {snapshot['mean_active_ms']:.3f} ms"
+            )
+        return text
+
+    @staticmethod
+    def format_stalls(snapshot):
+        text = (
+            f"ui: {snapshot['stalls']} stalls, "
+            f"worst lag {snapshot['worst_lag_ms']:.0f} ms"
+        )
+        if snapshot["last"] is not None:
+            last = snapshot["last"]
+            text += f"\nlast {last['lag_ms']:.0f} ms in {last['where']}"
+        return text
+
+    @staticmethod
+    def format_recorder(snapshot):
+        if snapshot["path"] is None:
+            return "rec: off"
+        state = "recording" if snapshot["recording"] else "recorded"
+        return (
+            f"rec: {state} {snapshot['seconds']:.1f} s, "
+            f"{snapshot['dropped_blocks']} blocks dropped\n"
+            f"{os.path.basename(snapshot['path'])}"
+        )
+
+    def _refresh(self):
+        for label, metrics in zip(self._labels, self.metrics):
+            label.configure(
+                text=self.format_snapshot(metrics.snapshot()),
+                text_color=self.warning_color if metrics.xruns else self.text_color,
+            )
+
+        labels = iter(self._labels[len(self.metrics) :])
+        if self.watchdog is not None:
+            snapshot = self.watchdog.snapshot()
+            stalled = snapshot["stalls"] > 0
+            next(labels).configure(
+                text=self.format_stalls(snapshot),
+                text_color=self.warning_color if stalled else self.text_color,
+            )
+
+        if self.recorder is not None:
+            snapshot = self.recorder.snapshot()
+            dropped = snapshot["dropped_blocks"] > 0
+            next(labels).configure(
+                text=self.format_recorder(snapshot),
+                text_color=self.warning_color if dropped else self.text_color,
+            )
+
+        self.after(self.refresh_ms, self._refresh)
@@ -0,0 +1,148 @@
+import collections
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+
+# Frames of this folder are the ones worth pointing at in a stack
+APP_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+
+class StallWatchdog:
+    """
+    Measures how late the Tk event loop runs and records its stalls.
+
+    A heartbeat is scheduled with after() every interval_ms; the delay
+    between when a beat was due and when it ran is the event loop lag. A
+    monitor thread notices a beat that is overdue by threshold_ms while the
+    loop is still stuck, and grabs the stack of the Tk thread right then, so
+    every stall comes with the code that caused it.
+
+    Stalls are printed, kept in stalls (newest last) for the app, and
+    appended to log_path as JSON lines when one is given.
+    """
+
+    def __init__(
+        self,
+        widget,
+        interval_ms: int = 50,
+        threshold_ms: int = 100,
+        log_path: str = None,
+        history: int = 50,
+    ):
+        """
+        Initializes the StallWatchdog, on the Tk thread.
+
+        Args:
+            widget: Any widget of the app, its after() drives the heartbeat.
+            interval_ms (int): Milliseconds between two heartbeats.
+            threshold_ms (int): Lag from which the loop counts as stalled.
+            log_path (str): JSON lines file the stalls are appended to, None
+                keeps them in memory only.
+            history (int): Number of stalls kept in stalls.
+        """
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.log_path = log_path
+
+        self.stalls = collections.deque(maxlen=history)
+        self.stall_count = 0
+        self.worst_lag_ms = 0.0
+        self.beats = 0
+
+        self._tk_thread = threading.get_ident()
+        self._last_beat = None
+        self._captured = None  # (beat the stall started after, frames)
+        self._after_id = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._last_beat = time.perf_counter()
+        self._after_id = self.widget.after(self.interval_ms, self._beat)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    # --- Tk thread ---
+
+    def _beat(self):
+        now = time.perf_counter()
+        previous = self._last_beat
+        lag_ms = (now - previous) * 1000.0 - self.interval_ms
+        self._last_beat = now
+        self.beats += 1
+        self.worst_lag_ms = max(self.worst_lag_ms, lag_ms)
+
+        captured, self._captured = self._captured, None
+        if lag_ms >= self.threshold_ms:
+            # A stack grabbed during an earlier stall does not belong to this one
+            frames = captured[1] if captured and captured[0] == previous else None
+            self._record(lag_ms, frames)
+
+        self._after_id = self.widget.after(self.interval_ms, self._beat)
+
+    def _record(self, lag_ms: float, frames):
+        where = "unknown (shorter than the monitor could catch)"
+        if frames:
+            # Innermost frame of the app itself, not of Tk or a library
+            inside = [f for f in frames if f.filename.startswith(APP_FOLDER)]
+            frame = (inside or frames)[-1]
+            where = f"{frame.name} ({os.path.basename(frame.filename)}:{frame.lineno})"
+
+        stall = {
+            "time": time.time(),
+            "lag_ms": round(lag_ms, 1),
+            "where": where,
+            "stack": "".join(traceback.format_list(frames)) if frames else None,
+        }
+        self.stalls.append(stall)
+        self.stall_count += 1
+        print(f"UI stalled for {lag_ms:.0f} ms in {where}")
+
+        if self.log_path:
+            try:
+                with open(self.log_path, "a") as file:
+                    file.write(json.dumps(stall) + "\n")
+            except OSError as e:
+                print(f"Error writing UI stall log: {e}")
+
+    def snapshot(self):
+        """Counters for the app, JSON serializable."""
+        return {
+            "beats": self.beats,
+            "stalls": self.stall_count,
+            "worst_lag_ms": self.worst_lag_ms,
+            "last": self.stalls[-1] if self.stalls else None,
+        }
+
+    # --- Monitor thread ---
+
+    def _watch(self):
+        # Checked twice per threshold, a stall is caught while it lasts
+        period = self.threshold_ms / 2000.0
+        overdue = (self.interval_ms + self.threshold_ms) / 1000.0
+        while not self._stop.wait(period):
+            last_beat = self._last_beat
+            if self._captured is not None and self._captured[0] == last_beat:
+                continue  # This stall already has its stack
+            if time.perf_counter() - last_beat < overdue:
+                continue
+
+            frame = sys._current_frames().get(self._tk_thread)
+            if frame is not None:
+                self._captured = (last_beat, traceback.extract_stack(frame))
@@ -0,0 +1,3 @@
+"""
+Real-time audio engine: clip cache, mixer and output streams
+"""
@@ -0,0 +1,209 @@
+"""
+Offline analysis of whole clips: loudness (ITU-R BS.1770 / EBU R128), true
+peak and silence at both ends. Nothing here runs in the audio callback, the
+results are computed once per file and stored (see sound_library).
+"""
+
+import math
+
+import numpy as np
+import soundfile as sf
+from numba import jit
+
+# Blocks quieter than this never count for the integrated loudness
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+
+@jit(nopython=True, cache=True)
+def _biquad(x, b0, b1, b2, a1, a2):
+    """Direct form I biquad over a float64 signal."""
+    y = np.empty_like(x)
+    x1 = x2 = y1 = y2 = 0.0
+
+    for i in range(len(x)):
+        out = b0 * x[i] + b1 * x1 + b2 * x2 - a1 * y1 - a2 * y2
+        x2, x1 = x1, x[i]
+        y2, y1 = y1, out
+        y[i] = out
+
+    return y
+
+
+def k_weighting(samplerate: int):
+    """
+    The two BS.1770 K-weighting biquads (high shelf, then high pass) as
+    (b0, b1, b2, a1, a2) tuples, derived for any sample rate.
+    """
+    # High shelf, +4 dB above ~1.7 kHz (head acoustics)
+    gain_db, q, fc = 3.99984385397, 0.7071752369554193, 1681.9744509555319
+    k = math.tan(math.pi * fc / samplerate)
+    vh = 10 ** (gain_db / 20.0)
+    vb = vh**0.499666774155
+    a0 = 1.0 + k / q + k * k
+    shelf = (
+        (vh + vb * k / q + k * k) / a0,
+        2.0 * (k * k - vh) / a0,
+        (vh - vb * k / q + k * k) / a0,
+        2.0 * (k * k - 1.0) / a0,
+        (1.0 - k / q + k * k) / a0,
+    )
+
+    # High pass at ~38 Hz (RLB weighting)
+    q, fc = 0.5003270373253953, 38.13547087613982
+    k = math.tan(math.pi * fc / samplerate)
+    a0 = 1.0 + k / q + k * k
+    high_pass = (
+        1.0,
+        -2.0,
+        1.0,
+        2.0 * (k * k - 1.0) / a0,
+        (1.0 - k / q + k * k) / a0,
+    )
+
+    return shelf, high_pass
+
+
+def integrated_loudness(data, samplerate: int):
+    """
+    Integrated loudness in LUFS of a mono float signal, -inf for silence.
+
+    400 ms blocks with 75% overlap, absolute gate at -70 LUFS and relative
+    gate 10 LU under the ungated mean, as in BS.1770-4. The block mean
+    squares come from one cumulative sum, so the gating is vectorized.
+    """
+    weighted = np.asarray(data, dtype=np.float64)
+    for coefficients in k_weighting(samplerate):
+        weighted = _biquad(weighted, *coefficients)
+
+    block = int(0.4 * samplerate)
+    step = block // 4
+    if len(weighted) < block:
+        # Shorter than one gating block: the whole clip is the block
+        block = step = max(1, len(weighted))
+
+    energy = np.concatenate(([0.0], np.cumsum(weighted * weighted)))
+    starts = np.arange(0, len(weighted) - block + 1, step)
+    mean_squares = (energy[starts + block] - energy[starts]) / block
+
+    with np.errstate(divide="ignore"):
+        loudness = -0.691 + 10.0 * np.log10(mean_squares)
+
+    gated = mean_squares[loudness > ABSOLUTE_GATE_LUFS]
+    if len(gated) == 0:
+        return float("-inf")
+
+    relative_gate = -0.691 + 10.0 * math.log10(gated.mean()) + RELATIVE_GATE_LU
+    with np.errstate(divide="ignore"):
+        gated = gated[-0.691 + 10.0 * np.log10(gated) > relative_gate]
+    if len(gated) == 0:
+        return float("-inf")
+
+    return -0.691 + 10.0 * math.log10(gated.mean())
+
+
+def true_peak(data, oversample: int = 4, taps_per_phase: int = 12):
+    """
+    True peak in dBTP: the sample peak of the signal upsampled oversample
+    times with a windowed sinc (BS.1770 annex 2), which catches the overs
+    between samples that a DAC produces.
+    """
+    data = np.asarray(data, dtype=np.float64)
+    if len(data) == 0:
+        return float("-inf")
+
+    length = oversample * taps_per_phase
+    t = (np.arange(length) - (length - 1) / 2.0) / oversample
+    kernel = np.sinc(t) * np.hanning(length)
+
+    peak = float(np.max(np.abs(data)))
+    for phase in range(oversample):
+        taps = kernel[phase::oversample]
+        taps = taps * (1.0 / taps.sum())
+        peak = max(peak, float(np.max(np.abs(np.convolve(data, taps)))))
+
+    return 20.0 * math.log10(peak) if peak > 0.0 else float("-inf")
+
+
+def silence_bounds(data, threshold_db: float = -50.0, full_scale: float = 1.0):
+    """
+    First audible sample and one past the last one, (0, 0) for silence.
+
+    Args:
+        data (np.ndarray): Mono samples (float, or int16 with full_scale
+            32768).
+        threshold_db (float): Level under which a sample is silence.
+        full_scale (float): Value of 0 dBFS in data.
+    """
+    threshold = full_scale * 10 ** (threshold_db / 20.0)
+    # No abs(): it overflows on int16 -32768
+    audible = np.flatnonzero((data > threshold) | (data < -threshold))
+    if len(audible) == 0:
+        return 0, 0
+    return int(audible[0]), int(audible[-1]) + 1
+
+
+def analyze_file(file_path: str, silence_db: float = -50.0):
+    """
+    Analyzes one file, as it will be played: mixed down to mono.
+
+    Returns a JSON serializable dict with loudness (LUFS), true_peak (dBTP),
+    duration, leading_silence and trailing_silence (seconds).
+    """
+    data, samplerate = sf.read(file_path, dtype="float32", always_2d=True)
+    mono = data.mean(axis=1)
+
+    start, end = silence_bounds(mono, silence_db)
+    if end == 0:
+        start = end = len(mono)
+
+    loudness = integrated_loudness(mono, samplerate)
+    peak = true_peak(mono)
+
+    # None for silent files, -inf is not valid JSON
+    return {
+        "loudness": None if math.isinf(loudness) else loudness,
+        "true_peak": None if math.isinf(peak) else peak,
+        "duration": len(mono) / samplerate,
+        "leading_silence": start / samplerate,
+        "trailing_silence": (len(mono) - end) / samplerate,
+    }
+
+
+def peak_levels(data, samples_per_peak: int = 256, levels: int = 4, factor: int = 4):
+    """
+    Min/max summaries of a clip at a few resolutions, for waveform drawing.
+
+    The finest level has one (min, max) pair per samples_per_peak samples,
+    every next one is factor times coarser and is reduced from the previous
+    level, so the clip itself is read once. All reductions are reshapes.
+
+    Returns:
+        dict: samples per peak -> (mins, maxs), arrays of data's dtype.
+    """
+    result = {}
+    size = samples_per_peak
+
+    # Padded with the last sample, so every peak covers a full window
+    count = -(-len(data) // size) if len(data) else 0
+    padded = np.empty(count * size, dtype=data.dtype)
+    padded[: len(data)] = data
+    padded[len(data) :] = data[-1] if len(data) else 0
+
+    windows = padded.reshape(count, size)
+    mins, maxs = windows.min(axis=1), windows.max(axis=1)
+    result[size] = (mins, maxs)
+
+    for _ in range(levels - 1):
+        if len(mins) <= 1:
+            break
+        count = -(-len(mins) // factor)
+        pad = count * factor - len(mins)
+        mins = np.concatenate((mins, np.repeat(mins[-1:], pad)))
+        maxs = np.concatenate((maxs, np.repeat(maxs[-1:], pad)))
+        mins = mins.reshape(count, factor).min(axis=1)
+        maxs = maxs.reshape(count, factor).max(axis=1)
+        size *= factor
+        result[size] = (mins, maxs)
+
+    return result
@@ -0,0 +1,29 @@
+"""
+Audio backends: sounddevice, PyAudio and an offline (no hardware) backend
+behind the same stream interface, see base.AudioBackend
+"""
+
+BACKENDS = ("sounddevice", "pyaudio", "offline")
+
+
+def get_backend(name: str = "sounddevice", **kwargs):
+    """
+    Creates a backend by name.
+
+    Backends are imported lazily, so a missing PortAudio/PyAudio install only
+    matters when that backend is actually used.
+    """
+    if name == "sounddevice":
+        from audio_engine.backends.sounddevice_backend import SounddeviceBackend
+
+        return SounddeviceBackend(**kwargs)
+    if name == "pyaudio":
+        from audio_engine.backends.pyaudio_backend import PyAudioBackend
+
+        return PyAudioBackend(**kwargs)
+    if name == "offline":
+        from audio_engine.backends.offline import OfflineBackend
+
+        return OfflineBackend(**kwargs)
+
+    raise ValueError(f"Unknown audio backend '{name}', expected one of {BACKENDS}")
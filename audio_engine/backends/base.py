@@ -0,0 +1,81 @@
+class CallbackStatus:
+    """
+    Stream status passed to callbacks by backends other than sounddevice.
+
+    Has the attributes of sounddevice.CallbackFlags that the engine reads, so
+    callbacks work the same whatever backend drives them.
+    """
+
+    __slots__ = ("input_overflow", "output_underflow")
+
+    def __init__(self, input_overflow: bool = False, output_underflow: bool = False):
+        self.input_overflow = input_overflow
+        self.output_underflow = output_underflow
+
+    def __bool__(self):
+        return self.input_overflow or self.output_underflow
+
+
+class AudioBackend:
+    """
+    Interface every audio backend implements.
+
+    Streams are callback driven and use the sounddevice conventions:
+        input:  callback(indata, frames, time_info, status)
+        output: callback(outdata, frames, time_info, status)
+        duplex: callback(indata, outdata, frames, time_info, status)
+    where indata/outdata are numpy arrays of shape (frames, channels).
+
+    Returned streams have start(), stop(), close(), and the attributes
+    active, latency (seconds), samplerate and blocksize.
+    """
+
+    name = "base"
+
+    def query_devices(self):
+        """Returns a list of device dicts with the sounddevice.query_devices() keys."""
+        raise NotImplementedError
+
+    def query_hostapis(self):
+        """Returns a list of host API dicts with at least a "name" key."""
+        raise NotImplementedError
+
+    def rescan(self):
+        """Re-enumerates the hardware. Invalidates open streams."""
+
+    def open_input_stream(
+        self,
+        callback,
+        samplerate: int,
+        blocksize: int,
+        channels: int = 1,
+        device=None,
+        dtype: str = "float32",
+        finished_callback=None,
+    ):
+        raise NotImplementedError
+
+    def open_output_stream(
+        self,
+        callback,
+        samplerate: int,
+        blocksize: int,
+        channels: int = 1,
+        device=None,
+        dtype: str = "float32",
+        finished_callback=None,
+    ):
+        raise NotImplementedError
+
+    def open_duplex_stream(
+        self,
+        callback,
+        samplerate: int,
+        blocksize: int,
+        channels: int = 1,
+        input_device=None,
+        output_device=None,
+        dtype: str = "float32",
+        finished_callback=None,
+    ):
+        raise NotImplementedError
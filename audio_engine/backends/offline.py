@@ -0,0 +1,275 @@
+import threading
+import time
+
+import numpy as np
+import soundfile as sf
+
+from audio_engine.backends.base import AudioBackend, CallbackStatus
+
+INPUT = "input"
+OUTPUT = "output"
+DUPLEX = "duplex"
+
+
+class OfflineStream:
+    """
+    Stream of the OfflineBackend.
+
+    Input comes from the backend's input signal (numpy array or audio file),
+    output is discarded or captured in memory. Blocks are processed either
+    by OfflineBackend.run(), as fast as the CPU allows, or by a thread at the
+    real block rate when the backend is realtime.
+    """
+
+    def __init__(
+        self,
+        backend,
+        kind,
+        callback,
+        samplerate,
+        blocksize,
+        channels,
+        dtype,
+        finished_callback=None,
+    ):
+        self.backend = backend
+        self.kind = kind
+        self.callback = callback
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self.finished_callback = finished_callback
+        self.latency = 0.0
+
+        self.active = False
+        self.frames_processed = 0
+        self._input_position = 0
+        self._output_blocks = []
+        self._thread = None
+        self._status = CallbackStatus()
+
+    def _read_input(self, frames):
+        indata = self.backend.read_input(self._input_position, frames, self.channels)
+        self._input_position += frames
+
+        if self.dtype.kind == "i":
+            scale = np.iinfo(self.dtype).max
+            return (indata * scale).astype(self.dtype)
+        return indata.astype(self.dtype, copy=False)
+
+    def process_block(self):
+        """Runs the callback once, like a sound card asking for one block."""
+        frames = self.blocksize
+
+        if self.kind in (INPUT, DUPLEX):
+            indata = self._read_input(frames)
+        if self.kind in (OUTPUT, DUPLEX):
+            outdata = np.zeros((frames, self.channels), dtype=self.dtype)
+
+        if self.kind == DUPLEX:
+            self.callback(indata, outdata, frames, None, self._status)
+        elif self.kind == INPUT:
+            self.callback(indata, frames, None, self._status)
+        else:
+            self.callback(outdata, frames, None, self._status)
+
+        if self.kind != INPUT and self.backend.capture:
+            self._output_blocks.append(outdata)
+
+        self.frames_processed += frames
+
+    @property
+    def output(self):
+        """Everything the stream has output so far, shape (frames, channels)."""
+        if not self._output_blocks:
+            return np.zeros((0, self.channels), dtype=self.dtype)
+        return np.concatenate(self._output_blocks)
+
+    def _run_realtime(self):
+        period = self.blocksize / self.samplerate
+        deadline = time.perf_counter()
+
+        while self.active:
+            self.process_block()
+
+            # Sleep until the next block is due, without accumulating drift
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def start(self):
+        self.active = True
+        if self.backend.realtime:
+            self._thread = threading.Thread(target=self._run_realtime)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        self.active = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        self.backend.streams.remove(self)
+        if self.finished_callback is not None:
+            self.finished_callback()
+
+
+class OfflineBackend(AudioBackend):
+    """
+    Backend without audio hardware.
+
+    Drives the engine from a numpy array or an audio file and captures what
+    it outputs, either faster than real time (call run()) or paced at the
+    real block rate (realtime=True), which stands in for a null sound card in
+    latency benchmarks.
+    """
+
+    name = "offline"
+
+    def __init__(
+        self,
+        input_signal=None,
+        samplerate: int = 44100,
+        realtime: bool = False,
+        capture: bool = True,
+    ):
+        """
+        Initializes the OfflineBackend.
+
+        Args:
+            input_signal (np.ndarray or str, optional): float32 samples in
+                [-1, 1] of shape (frames,) or (frames, channels), or the path
+                of an audio file. Input streams read silence when it is None
+                or exhausted.
+            samplerate (int): Sample rate reported for the fake devices.
+            realtime (bool): Process blocks from a thread at the block rate.
+            capture (bool): Keep output blocks in memory (see stream.output).
+        """
+        self.samplerate = samplerate
+        self.realtime = realtime
+        self.capture = capture
+        self.streams = []
+
+        self._input_file = None
+        self._input = None
+        if isinstance(input_signal, str):
+            self._input_file = sf.SoundFile(input_signal)
+        elif input_signal is not None:
+            signal = np.asarray(input_signal, dtype=np.float32)
+            self._input = signal.reshape(len(signal), -1)
+
+    def read_input(self, position: int, frames: int, channels: int):
+        """Returns float32 input of shape (frames, channels), zero padded."""
+        if self._input_file is not None:
+            self._input_file.seek(min(position, self._input_file.frames))
+            block = self._input_file.read(
+                frames, dtype="float32", always_2d=True, fill_value=0.0
+            )
+        elif self._input is not None:
+            block = self._input[position : position + frames]
+            if len(block) < frames:
+                block = np.pad(block, ((0, frames - len(block)), (0, 0)))
+        else:
+            return np.zeros((frames, channels), dtype=np.float32)
+
+        # Match the requested channel count (mono signal to every channel)
+        if block.shape[1] != channels:
+            block = np.repeat(block[:, :1], channels, axis=1)
+        return block
+
+    def query_devices(self):
+        return [
+            {
+                "name": "Offline Input",
+                "index": 0,
+                "hostapi": 0,
+                "max_input_channels": 2,
+                "max_output_channels": 0,
+                "default_samplerate": self.samplerate,
+            },
+            {
+                "name": "Offline Output",
+                "index": 1,
+                "hostapi": 0,
+                "max_input_channels": 0,
+                "max_output_channels": 2,
+                "default_samplerate": self.samplerate,
+            },
+        ]
+
+    def query_hostapis(self):
+        return [{"name": "Offline"}]
+
+    def _open(self, kind, callback, samplerate, blocksize, channels, dtype, finished):
+        stream = OfflineStream(
+            self, kind, callback, samplerate, blocksize, channels, dtype, finished
+        )
+        self.streams.append(stream)
+        return stream
+
+    def open_input_stream(
+        self,
+        callback,
+        samplerate,
+        blocksize,
+        channels=1,
+        device=None,
+        dtype="float32",
+        finished_callback=None,
+    ):
+        return self._open(
+            INPUT, callback, samplerate, blocksize, channels, dtype, finished_callback
+        )
+
+    def open_output_stream(
+        self,
+        callback,
+        samplerate,
+        blocksize,
+        channels=1,
+        device=None,
+        dtype="float32",
+        finished_callback=None,
+    ):
+        return self._open(
+            OUTPUT, callback, samplerate, blocksize, channels, dtype, finished_callback
+        )
+
+    def open_duplex_stream(
+        self,
+        callback,
+        samplerate,
+        blocksize,
+        channels=1,
+        input_device=None,
+        output_device=None,
+        dtype="float32",
+        finished_callback=None,
+    ):
+        return self._open(
+            DUPLEX, callback, samplerate, blocksize, channels, dtype, finished_callback
+        )
+
+    def run(self, frames: int):
+        """
+        Processes every started stream until it has produced frames more
+        frames, as fast as possible. Streams advance block by block in turn,
+        as if they shared one clock.
+        """
+        targets = {
+            stream: stream.frames_processed + frames
+            for stream in self.streams
+            if stream.active
+        }
+
+        while targets:
+            for stream in list(targets):
+                if stream.frames_processed >= targets[stream] or not stream.active:
+                    del targets[stream]
+                else:
+                    stream.process_block()
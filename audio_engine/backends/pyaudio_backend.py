@@ -0,0 +1,214 @@
+import numpy as np
+import pyaudio
+
+from audio_engine.backends.base import AudioBackend, CallbackStatus
+
+FORMATS = {
+    "int16": pyaudio.paInt16,
+    "int32": pyaudio.paInt32,
+    "float32": pyaudio.paFloat32,
+}
+
+
+class PyAudioStream:
+    """Wraps a PyAudio callback stream behind the sounddevice-like interface."""
+
+    def __init__(
+        self,
+        pa,
+        callback,
+        samplerate,
+        blocksize,
+        channels,
+        dtype,
+        input_device,
+        output_device,
+        is_input,
+        is_output,
+        finished_callback,
+    ):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self.channels = channels
+        self.dtype = np.dtype(dtype)
+        self._callback = callback
+        self._finished_callback = finished_callback
+        self._is_input = is_input
+        self._is_output = is_output
+
+        self._stream = pa.open(
+            format=FORMATS[dtype],
+            channels=channels,
+            rate=samplerate,
+            input=is_input,
+            output=is_output,
+            input_device_index=input_device,
+            output_device_index=output_device,
+            frames_per_buffer=blocksize,
+            stream_callback=self._pyaudio_callback,
+            start=False,
+        )
+
+    def _pyaudio_callback(self, in_data, frame_count, time_info, status_flags):
+        status = CallbackStatus(
+            input_overflow=bool(status_flags & pyaudio.paInputOverflow),
+            output_underflow=bool(status_flags & pyaudio.paOutputUnderflow),
+        )
+
+        try:
+            if self._is_input:
+                indata = np.frombuffer(in_data, dtype=self.dtype).reshape(
+                    -1, self.channels
+                )
+            if self._is_output:
+                outdata = np.zeros((frame_count, self.channels), dtype=self.dtype)
+
+            if self._is_input and self._is_output:
+                self._callback(indata, outdata, frame_count, time_info, status)
+            elif self._is_input:
+                self._callback(indata, frame_count, time_info, status)
+            else:
+                self._callback(outdata, frame_count, time_info, status)
+        except Exception as e:
+            print(f"Error in audio callback: {e}")
+            if self._finished_callback is not None:
+                self._finished_callback()
+            return (None, pyaudio.paAbort)
+
+        return (outdata.tobytes() if self._is_output else None, pyaudio.paContinue)
+
+    @property
+    def active(self):
+        return self._stream.is_active()
+
+    @property
+    def latency(self):
+        if self._is_output:
+            return self._stream.get_output_latency()
+        return self._stream.get_input_latency()
+
+    def start(self):
+        self._stream.start_stream()
+
+    def stop(self):
+        self._stream.stop_stream()
+
+    def close(self):
+        self._stream.close()
+
+
+class PyAudioBackend(AudioBackend):
+    """Backend on top of PyAudio (PortAudio with byte buffers)."""
+
+    name = "pyaudio"
+
+    def __init__(self):
+        self._pa = pyaudio.PyAudio()
+
+    def query_devices(self):
+        devices = []
+        for index in range(self._pa.get_device_count()):
+            info = self._pa.get_device_info_by_index(index)
+            devices.append(
+                {
+                    "name": info["name"],
+                    "index": index,
+                    "hostapi": info["hostApi"],
+                    "max_input_channels": info["maxInputChannels"],
+                    "max_output_channels": info["maxOutputChannels"],
+                    "default_samplerate": info["defaultSampleRate"],
+                }
+            )
+        return devices
+
+    def query_hostapis(self):
+        return [
+            {"name": self._pa.get_host_api_info_by_index(index)["name"]}
+            for index in range(self._pa.get_host_api_count())
+        ]
+
+    def rescan(self):
+        # A PyAudio instance keeps the device list it was created with
+        self._pa.terminate()
+        self._pa = pyaudio.PyAudio()
+
+    def _open(self, callback, samplerate, blocksize, channels, dtype, **kwargs):
+        return PyAudioStream(
+            self._pa,
+            callback,
+            samplerate,
+            blocksize,
+            channels,
+            dtype,
+            **kwargs,
+        )
+
+    def open_input_stream(
+        self,
+        callback,
+        samplerate,
+        blocksize,
+        channels=1,
+        device=None,
+        dtype="float32",
+        finished_callback=None,
+    ):
+        return self._open(
+            callback,
+            samplerate,
+            blocksize,
+            channels,
+            dtype,
+            input_device=device,
+            output_device=None,
+            is_input=True,
+            is_output=False,
+            finished_callback=finished_callback,
+        )
+
+    def open_output_stream(
+        self,
+        callback,
+        samplerate,
+        blocksize,
+        channels=1,
+        device=None,
+        dtype="float32",
+        finished_callback=None,
+    ):
+        return self._open(
+            callback,
+            samplerate,
+            blocksize,
+            channels,
+            dtype,
+            input_device=None,
+            output_device=device,
+            is_input=False,
+            is_output=True,
+            finished_callback=finished_callback,
+        )
+
+    def open_duplex_stream(
+        self,
+        callback,
+        samplerate,
+        blocksize,
+        channels=1,
+        input_device=None,
+        output_device=None,
+        dtype="float32",
+        finished_callback=None,
+    ):
+        return self._open(
+            callback,
+            samplerate,
+            blocksize,
+            channels,
+            dtype,
+            input_device=input_device,
+            output_device=output_device,
+            is_input=True,
+            is_output=True,
+            finished_callback=finished_callback,
+        )
@@ -0,0 +1,84 @@
+import sounddevice as sd
+
+from audio_engine.backends.base import AudioBackend
+
+
+class SounddeviceBackend(AudioBackend):
+    """Backend on top of sounddevice (PortAudio with numpy buffers)."""
+
+    name = "sounddevice"
+
+    def query_devices(self):
+        return sd.query_devices()
+
+    def query_hostapis(self):
+        return sd.query_hostapis()
+
+    def rescan(self):
+        # PortAudio only enumerates devices when it is initialized
+        sd._terminate()
+        sd._initialize()
+
+    def open_input_stream(
+        self,
+        callback,
+        samplerate,
+        blocksize,
+        channels=1,
+        device=None,
+        dtype="float32",
+        finished_callback=None,
+    ):
+        return sd.InputStream(
+            samplerate=samplerate,
+            blocksize=blocksize,
+            device=device,
+            channels=channels,
+            dtype=dtype,
+            latency="low",
+            callback=callback,
+            finished_callback=finished_callback,
+        )
+
+    def open_output_stream(
+        self,
+        callback,
+        samplerate,
+        blocksize,
+        channels=1,
+        device=None,
+        dtype="float32",
+        finished_callback=None,
+    ):
+        return sd.OutputStream(
+            samplerate=samplerate,
+            blocksize=blocksize,
+            device=device,
+            channels=channels,
+            dtype=dtype,
+            latency="low",
+            callback=callback,
+            finished_callback=finished_callback,
+        )
+
+    def open_duplex_stream(
+        self,
+        callback,
+        samplerate,
+        blocksize,
+        channels=1,
+        input_device=None,
+        output_device=None,
+        dtype="float32",
+        finished_callback=None,
+    ):
+        return sd.Stream(
+            samplerate=samplerate,
+            blocksize=blocksize,
+            device=(input_device, output_device),
+            channels=channels,
+            dtype=dtype,
+            latency="low",
+            callback=callback,
+            finished_callback=finished_callback,
+        )
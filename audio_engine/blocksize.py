@@ -0,0 +1,143 @@
+import time
+
+import numpy as np
+
+BLOCK_SIZE_LADDER = (64, 128, 256, 512, 1024, 2048)
+
+
+class BlockSizeController:
+    """
+    Picks the smallest block size the machine can run without glitches.
+
+    At startup calibrate() times the audio processing at every size of the
+    ladder. At runtime check() is called periodically: the block size goes one
+    step up as soon as a stream had xruns or came close to its deadline, and
+    one step down after the load stayed low for a while. Every step up makes
+    the next step down wait twice as long, so a machine on the edge does not
+    flip back and forth.
+
+    The user can pin a latency target instead, which disables the automatic
+    steps.
+    """
+
+    def __init__(
+        self,
+        metrics,
+        samplerate: int = 44100,
+        block_size: int = 256,
+        ladder=BLOCK_SIZE_LADDER,
+        high_load: float = 0.6,
+        low_load: float = 0.2,
+        stable_checks: int = 10,
+        on_change=None,
+    ):
+        """
+        Initializes the BlockSizeController.
+
+        Args:
+            metrics (list): EngineMetrics of the streams to watch.
+            samplerate (int): Stream sample rate.
+            block_size (int): Block size the streams start with.
+            ladder (tuple): Allowed block sizes, ascending.
+            high_load (float): Deadline share that triggers a step up.
+            low_load (float): Deadline share under which a step down is safe
+                (half the block size roughly doubles the load).
+            stable_checks (int): Low-load checks in a row before a step down.
+            on_change (callable): Called with the new block size.
+        """
+        self.metrics = list(metrics)
+        self.samplerate = samplerate
+        self.block_size = block_size
+        self.ladder = tuple(ladder)
+        self.high_load = high_load
+        self.low_load = low_load
+        self.stable_checks = stable_checks
+        self.on_change = on_change
+
+        self.pinned_ms = None
+        self._required_checks = stable_checks
+        self._stable = 0
+
+    def latency_ms(self, block_size=None):
+        """Duration of one block in milliseconds."""
+        return 1000.0 * (block_size or self.block_size) / self.samplerate
+
+    def calibrate(self, process, repeats: int = 20):
+        """
+        Times process(block) at every ladder size and switches to the smallest
+        size whose worst run stays under high_load of the deadline.
+        """
+        chosen = self.ladder[-1]
+        for size in self.ladder:
+            block = np.zeros(size, dtype=np.float32)
+            process(block)  # Warmup (numba compile, caches)
+
+            worst = 0.0
+            for _ in range(repeats):
+                start = time.perf_counter()
+                process(block)
+                worst = max(worst, time.perf_counter() - start)
+
+            if worst * self.samplerate / size < self.high_load:
+                chosen = size
+                break
+
+        self.set_block_size(chosen)
+        return chosen
+
+    def pin_latency(self, target_ms):
+        """
+        Uses the largest block size not longer than target_ms, or goes back to
+        automatic selection when target_ms is None.
+        """
+        self.pinned_ms = target_ms
+        self._stable = 0
+        if target_ms is None:
+            return
+
+        fitting = [
+            size for size in self.ladder if self.latency_ms(size) <= target_ms
+        ]
+        self.set_block_size(fitting[-1] if fitting else self.ladder[0])
+
+    def check(self):
+        """Looks at the metrics since the last check and steps if needed."""
+        windows = [metrics.take_window() for metrics in self.metrics]
+        if self.pinned_ms is not None:
+            return
+
+        # A stream without callbacks (not open) says nothing either way
+        windows = [window for window in windows if window[2]]
+        if not windows:
+            return
+        loads = [load for load, _, _ in windows if load is not None]
+        worst_load = max(loads, default=0.0)
+        xruns = sum(count for _, count, _ in windows)
+        # A stream that was bypassed the whole window (voice gate closed)
+        # gives no reason to step down
+        idle = len(loads) < len(windows)
+        index = self.ladder.index(self.block_size)
+
+        if xruns or worst_load > self.high_load:
+            self._stable = 0
+            if index + 1 < len(self.ladder):
+                self._required_checks = min(self._required_checks * 2, 64)
+                self.set_block_size(self.ladder[index + 1])
+        elif idle:
+            pass
+        elif worst_load < self.low_load:
+            self._stable += 1
+            if self._stable >= self._required_checks and index > 0:
+                self._stable = 0
+                self.set_block_size(self.ladder[index - 1])
+        else:
+            self._stable = 0
+
+    def set_block_size(self, block_size: int):
+        if block_size == self.block_size:
+            return
+
+        self.block_size = block_size
+        print(f"Block size set to {block_size} ({self.latency_ms():.1f} ms)")
+        if self.on_change is not None:
+            self.on_change(block_size)
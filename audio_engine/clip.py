@@ -0,0 +1,159 @@
+import numpy as np
+import soundfile as sf
+
+from audio_engine.analysis import silence_bounds
+
+INT16_SCALE = 1.0 / 32768.0
+
+# Kept around the audible part when trimming, so attacks and decays stay whole
+TRIM_PRE_ROLL_MS = 2.0
+TRIM_POST_ROLL_MS = 10.0
+
+
+class Clip:
+    """
+    A decoded sound clip kept in memory, ready to be mixed.
+
+    The audio is stored as mono int16 at the engine sample rate. The first
+    block is additionally kept pre-converted to float32, so the callback that
+    starts a voice does not have to convert anything before the first sample
+    goes out.
+
+    A normalization gain is folded into the int16 -> float32 scale factor, so
+    it costs nothing on top of the conversion.
+
+    Silence at both ends can be trimmed: the clip then plays data, a view of
+    source between start and end, and the decoded samples are not copied.
+
+    polyphony and choke_group tell the mixer how the voices of the clip
+    stack, see PlaybackEngine.
+    """
+
+    def __init__(
+        self,
+        data,
+        samplerate: int,
+        name: str = "",
+        block_size: int = 256,
+        gain: float = 1.0,
+        start: int = 0,
+        end: int = None,
+    ):
+        """
+        Initializes the Clip.
+
+        Args:
+            data (np.ndarray): Mono int16 samples at the engine sample rate.
+            samplerate (int): Sample rate of data.
+            name (str): Display name of the clip.
+            block_size (int): Size of the pre-converted first block.
+            gain (float): Linear gain applied on playback.
+            start (int): First sample of data that is played.
+            end (int): One past the last sample played, None for the end.
+        """
+        self.name = name
+        self.source = data
+        self.start = start
+        self.end = len(data) if end is None else end
+        self.data = data[self.start : self.end]  # A view, not a copy
+        self.samplerate = samplerate
+        self.gain = gain
+        self.scale = INT16_SCALE * gain
+        self.head = None
+        self.prime(block_size)
+
+        # Most voices of this clip at once (1 restarts it), None: no limit
+        self.polyphony = None
+        # A voice starting cuts the other voices of its group, None: no group
+        self.choke_group = None
+
+    def __len__(self):
+        return len(self.data)
+
+    def prime(self, block_size: int):
+        """(Re)builds the pre-converted first block for the given block size."""
+        head = self.data[:block_size].astype(np.float32)
+        head *= self.scale
+        self.head = head
+
+    def set_gain(self, gain: float):
+        """Changes the playback gain (the head is rebuilt at its current size)."""
+        self.gain = gain
+        self.scale = INT16_SCALE * gain
+        self.prime(len(self.head))
+
+    def read(self, position: int, out) -> int:
+        """
+        Writes the clip samples starting at position into out (float32).
+
+        Returns the number of samples written, which is less than len(out)
+        when the clip ends inside this block.
+        """
+        count = min(len(out), len(self.data) - position)
+        if count <= 0:
+            return 0
+
+        head = self.head  # prime() can swap it in from the UI thread meanwhile
+        head_count = max(0, min(count, len(head) - position))
+        if head_count:
+            out[:head_count] = head[position : position + head_count]
+        if head_count < count:
+            np.multiply(
+                self.data[position + head_count : position + count],
+                self.scale,
+                out=out[head_count:count],
+                casting="unsafe",
+            )
+        return count
+
+
+def resample_linear(data, source_rate: int, target_rate: int):
+    """Resamples int16 audio with linear interpolation (done once, at load time)."""
+    if source_rate == target_rate or len(data) == 0:
+        return data
+
+    length = int(round(len(data) * target_rate / source_rate))
+    positions = np.arange(length, dtype=np.float64) * (source_rate / target_rate)
+    resampled = np.interp(positions, np.arange(len(data)), data)
+    return resampled.astype(np.int16)
+
+
+def load_clip(
+    file_path: str,
+    samplerate: int,
+    block_size: int,
+    gain: float = 1.0,
+    trim_db: float = None,
+):
+    """
+    Decodes a file into a mono Clip at the engine sample rate.
+
+    With trim_db, the silence (samples under trim_db dBFS) at both ends is
+    left out of playback, so a trigger starts at the first audible sample.
+    """
+    data, file_samplerate = sf.read(file_path, dtype="int16")
+
+    # TODO: Give user a choice to not convert into mono, for better sound
+    if len(data.shape) > 1:
+        data = np.mean(data, axis=1).astype(np.int16)
+
+    data = resample_linear(data, file_samplerate, samplerate)
+
+    start, end = 0, len(data)
+    if trim_db is not None:
+        start, end = silence_bounds(data, trim_db, full_scale=32768.0)
+        if end > start:
+            start = max(0, start - int(samplerate * TRIM_PRE_ROLL_MS / 1000.0))
+            end = min(len(data), end + int(samplerate * TRIM_POST_ROLL_MS / 1000.0))
+        else:
+            start, end = 0, len(data)  # All silence, played as it is
+
+    return Clip(
+        data,
+        samplerate,
+        name=file_path,
+        block_size=block_size,
+        gain=gain,
+        start=start,
+        end=end,
+    )
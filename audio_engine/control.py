@@ -0,0 +1,426 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+from audio_engine.routing import OUTPUTS
+
+# Largest HTTP request body accepted, a batch of commands is far smaller
+MAX_BODY_SIZE = 1 << 20
+
+# Host headers accepted over HTTP, so that no web page can reach the API
+# through the browser (DNS rebinding) or post to it (no Origin header allowed)
+ALLOWED_HOSTS = ("localhost", "127.0.0.1")
+
+HTTP_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    403: "Forbidden",
+    404: "Not Found",
+    413: "Payload Too Large",
+}
+
+
+def meter_state(meter):
+    """JSON serializable reading of a LevelMeter."""
+    return {"level": meter.level, "peak": meter.peak, "rms": meter.rms}
+
+
+class EngineControl:
+    """
+    The commands of the control API, run against the audio engine only (never
+    Tk), from whatever thread the server runs on.
+
+    A request is one command or a list of commands (a batch), a command is a
+    dict like:
+        {"cmd": "play", "sound": "airhorn.wav"}
+        {"cmd": "stop"}
+        {"cmd": "effect", "name": "robot_effect.py"}   (null: no effect)
+        {"cmd": "meters"}
+        {"cmd": "metrics"}
+        {"cmd": "record", "on": true}                  (false stops)
+
+    Every command gets a result dict with "ok" and, when it failed, "error".
+    The plays of a batch are handed to the engine as one command, so they
+    start in the same audio block.
+    """
+
+    def __init__(
+        self,
+        playback,
+        voice=None,
+        router=None,
+        resolve_clip=None,
+        resolve_effect=None,
+        record=None,
+        recorder=None,
+    ):
+        """
+        Initializes the EngineControl.
+
+        Args:
+            playback (PlaybackEngine): Engine the sounds play on.
+            voice (VoiceChanger): Microphone path, None disables "effect".
+            router (AudioRouter): Reported by "meters" and "metrics" (cable
+                and monitor outputs) when the engine runs routed.
+            resolve_clip (callable): resolve_clip(sound) -> Clip, None when
+                the sound is unknown or not decoded yet. Must not block.
+            resolve_effect (callable): resolve_effect(name) -> effect (None
+                for no effect), raises KeyError for an unknown name.
+            record (callable): record(on) -> file recorded to, None when it
+                stopped or could not start. None disables "record".
+            recorder (Recorder): Reported by "record" and "metrics" (file,
+                seconds written, dropped blocks), None reports nothing.
+        """
+        self.playback = playback
+        self.voice = voice
+        self.router = router
+        self.resolve_clip = resolve_clip or (lambda sound: None)
+        self.resolve_effect = resolve_effect
+        self.record = record
+        self.recorder = recorder
+
+        self._handlers = {
+            "stop": self._stop,
+            "effect": self._effect,
+            "meters": self._meters,
+            "metrics": self._metrics,
+            "record": self._record,
+        }
+
+    def execute(self, request):
+        """Runs one command or a batch (list), returns its result(s)."""
+        if isinstance(request, list):
+            return self._batch(request)
+        return self._batch([request])[0]
+
+    def _batch(self, commands):
+        trigger_time = time.perf_counter()
+        results = []
+        plays = []
+
+        for command in commands:
+            name = command.get("cmd") if isinstance(command, dict) else None
+            if name == "play":
+                try:
+                    results.append(self._play(command, plays))
+                except Exception as e:
+                    results.append(self._error(str(e)))
+                continue
+
+            # The plays before this command are queued before it, order holds
+            self._flush(plays, trigger_time)
+
+            handler = self._handlers.get(name)
+            if handler is None:
+                results.append(self._error(f"unknown command {name}"))
+                continue
+            try:
+                results.append(handler(command))
+            except Exception as e:
+                results.append(self._error(str(e)))
+
+        self._flush(plays, trigger_time)
+        return results
+
+    def _flush(self, plays, trigger_time):
+        if len(plays) == 1:
+            self.playback.trigger(plays[0], trigger_time)
+        elif plays:
+            self.playback.trigger_many(plays, trigger_time)
+        plays.clear()
+
+    @staticmethod
+    def _error(message):
+        return {"ok": False, "error": message}
+
+    # --- Commands ---
+
+    def _play(self, command, plays):
+        sound = command.get("sound")
+        if not isinstance(sound, str):
+            return self._error("sound must be a string")
+        clip = self.resolve_clip(sound)
+        if clip is None:
+            return self._error(f"unknown sound {sound}")
+        plays.append(clip)  # Triggered with the plays around it, see _flush
+        return {"ok": True}
+
+    def _stop(self, command):
+        self.playback.stop_all()
+        return {"ok": True}
+
+    def _effect(self, command):
+        if self.voice is None or self.resolve_effect is None:
+            return self._error("no voice path")
+        try:
+            effect = self.resolve_effect(command.get("name"))
+        except KeyError:
+            return self._error(f"unknown effect {command.get('name')}")
+        self.voice.set_effect(effect)
+        return {"ok": True}
+
+    def _meters(self, command):
+        meters = {"playback": meter_state(self.playback.meter)}
+        if self.voice is not None:
+            meters["voice_in"] = meter_state(self.voice.input_meter)
+            meters["voice_out"] = meter_state(self.voice.output_meter)
+        if self.router is not None:
+            for output, meter in zip(OUTPUTS, self.router.meters):
+                meters[output] = meter_state(meter)
+        return {"ok": True, "meters": meters}
+
+    def _metrics(self, command):
+        metrics = [self.playback.metrics.snapshot()]
+        if self.voice is not None:
+            metrics.append(self.voice.metrics.snapshot())
+        result = {"ok": True, "metrics": metrics}
+        if self.router is not None:
+            metrics.append(self.router.metrics.snapshot())
+            result["monitor_underruns"] = self.router.monitor_underruns
+        if self.recorder is not None:
+            result["recorder"] = self.recorder.snapshot()
+        return result
+
+    def _record(self, command):
+        if self.record is None:
+            return self._error("no recorder")
+        on = command.get("on", True)
+        if not isinstance(on, bool):
+            return self._error("on must be true or false")
+        path = self.record(on)
+        if on and path is None:
+            return self._error("recording could not start")
+        result = {"ok": True, "path": path}
+        if self.recorder is not None:
+            result["recorder"] = self.recorder.snapshot()  # Drops of the take
+        return result
+
+
+class ControlServer:
+    """
+    Local control API for scripts (stream deck buttons...): an asyncio server
+    on its own thread, listening on a Unix socket and optionally on HTTP on
+    localhost.
+
+    Unix socket: one JSON request per line, answered by one JSON line.
+    HTTP (keep-alive): POST / with a JSON request as body, GET /meters and
+    GET /metrics as shortcuts. Requests from a browser (with an Origin header,
+    or a Host other than localhost) are refused.
+
+    Requests are run by EngineControl right on the server thread; a command
+    only appends to a lock-free engine queue, so a request costs a JSON
+    round trip and nothing waits on the UI.
+    """
+
+    def __init__(
+        self,
+        control,
+        socket_path: str = None,
+        http_port: int = None,
+        host: str = "127.0.0.1",
+    ):
+        """
+        Initializes the ControlServer.
+
+        Args:
+            control (EngineControl): Runs the requests.
+            socket_path (str): Unix socket to listen on, None for none (and
+                ignored where Unix sockets are not available).
+            http_port (int): HTTP port, None for no HTTP, 0 for any free
+                port (see http_port after start()).
+            host (str): HTTP address, localhost only by default.
+        """
+        self.control = control
+        self.socket_path = socket_path
+        self.http_port = http_port
+        self.host = host
+
+        self._loop = None
+        self._thread = None
+        self._servers = []
+        self._writers = set()  # Open connections
+        self._ready = threading.Event()
+
+    @property
+    def active(self):
+        return self._thread is not None
+
+    # --- Protocol ---
+
+    def _handle(self, data: bytes):
+        """Runs one JSON request, returns the JSON response."""
+        try:
+            request = json.loads(data)
+        except ValueError:
+            result = EngineControl._error("invalid JSON")
+        else:
+            try:
+                result = self.control.execute(request)
+            except Exception as e:
+                # A bad request gets an error, never drops the connection
+                result = EngineControl._error(f"internal error: {e}")
+        return json.dumps(result).encode()
+
+    async def _serve_lines(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Over the limit: where the next request starts is lost
+                    error = EngineControl._error("request too long")
+                    writer.write(json.dumps(error).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                writer.write(self._handle(line) + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _serve_http(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    self._write_http(writer, 400, b"", False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY_SIZE:
+                    self._write_http(writer, 413, b"", False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                host = headers.get("host", "").rpartition(":")
+                host = host[0] if host[2].isdigit() else "".join(host)
+                if "origin" in headers or host.lower() not in ALLOWED_HOSTS:
+                    self._write_http(writer, 403, b"", False)
+                    break
+
+                shortcut = target.strip("/")
+                if method == "POST" and shortcut == "":
+                    status, payload = 200, self._handle(body)
+                elif method == "GET" and shortcut in ("meters", "metrics"):
+                    status = 200
+                    payload = json.dumps(self.control.execute({"cmd": shortcut}))
+                    payload = payload.encode()
+                else:
+                    status, payload = 404, b""
+
+                self._write_http(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ValueError:
+            self._write_http(writer, 400, b"", False)  # Line over the limit
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    @staticmethod
+    def _write_http(writer, status: int, payload: bytes, keep_alive: bool):
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + payload)
+
+    # --- Thread ---
+
+    async def _open(self):
+        if self.socket_path and hasattr(asyncio, "start_unix_server"):
+            try:
+                # Left behind by a run that did not shut down cleanly
+                if os.path.exists(self.socket_path):
+                    os.remove(self.socket_path)
+                server = await asyncio.start_unix_server(
+                    self._serve_lines, self.socket_path, limit=MAX_BODY_SIZE
+                )
+                os.chmod(self.socket_path, 0o600)  # Only this user's scripts
+                self._servers.append(server)
+            except OSError as e:
+                print(f"Error opening control socket {self.socket_path}: {e}")
+
+        if self.http_port is not None:
+            try:
+                server = await asyncio.start_server(
+                    self._serve_http, self.host, self.http_port
+                )
+                self.http_port = server.sockets[0].getsockname()[1]
+                self._servers.append(server)
+            except OSError as e:
+                print(f"Error opening control HTTP port {self.http_port}: {e}")
+
+    async def _close(self):
+        for server in self._servers:
+            server.close()
+        self._servers = []
+
+        # Open connections too, their handlers then read the end of stream
+        for writer in list(self._writers):
+            writer.close()
+        current = asyncio.current_task()
+        tasks = [task for task in asyncio.all_tasks() if task is not current]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._open())
+            self._ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._close())
+        finally:
+            self._ready.set()
+            self._loop.close()
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def start(self):
+        """Starts listening, returns once the sockets are open."""
+        if self._thread is not None:
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+        self._ready.wait(timeout=5.0)
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=1.0)
+        self._thread = None
@@ -0,0 +1,215 @@
+import threading
+
+INPUT = "input"
+OUTPUT = "output"
+
+
+class DeviceManager:
+    """
+    Resolves audio devices by name instead of by index and watches the
+    device list for changes.
+
+    Devices are registered under a role ("virtual_cable", "microphone", ...)
+    together with the name to look for. Listeners are told when the device
+    behind a role changes, so the owner of the stream can reopen it.
+
+    The device list comes from the query_devices/query_hostapis callables,
+    which default to sounddevice. Passing fake callables returning lists of
+    dicts makes the manager testable without audio hardware.
+    """
+
+    def __init__(
+        self,
+        query_devices=None,
+        query_hostapis=None,
+        rescan=None,
+        streams_open=None,
+        poll_interval: float = 2.0,
+    ):
+        """
+        Initializes the DeviceManager.
+
+        Args:
+            query_devices (callable, optional): Returns a list of device dicts
+                with the sounddevice.query_devices() keys.
+            query_hostapis (callable, optional): Returns a list of host API
+                dicts with a "name" key.
+            rescan (callable, optional): Makes the backend re-enumerate the
+                hardware. PortAudio only sees new devices after it is
+                reinitialized, which invalidates open streams, so this is only
+                called on check(rescan=True), e.g. after a stream died, and
+                by the watcher while no stream is open.
+            streams_open (callable, optional): True while the owner has a
+                stream open. None never rescans from the watcher, so a newly
+                plugged device is only seen after a rescan request.
+            poll_interval (float): Seconds between two checks of the watcher.
+        """
+        if query_devices is None or query_hostapis is None:
+            import sounddevice as sd
+
+            query_devices = query_devices or sd.query_devices
+            query_hostapis = query_hostapis or sd.query_hostapis
+
+        self._query_devices = query_devices
+        self._query_hostapis = query_hostapis
+        self._rescan = rescan
+        self._streams_open = streams_open
+        self.poll_interval = poll_interval
+
+        self._devices = None
+        self._hostapis = None
+        self._lock = threading.Lock()
+
+        self._roles = {}  # role -> (name, kind, hostapi)
+        self._resolved = {}  # role -> (index, name)
+        self._listeners = []
+
+        self._watching = False
+        self._watch_thread = None
+        self._wake = threading.Event()
+        self._rescan_requested = False
+
+    # --- Device list ---
+
+    def devices(self, refresh: bool = False):
+        """Returns the cached device list, querying the backend only when needed."""
+        with self._lock:
+            if self._devices is None or refresh:
+                self._devices = [dict(device) for device in self._query_devices()]
+                self._hostapis = [dict(api) for api in self._query_hostapis()]
+            return self._devices
+
+    def hostapi_name(self, device):
+        self.devices()
+        return self._hostapis[device["hostapi"]]["name"]
+
+    def find(self, name, kind: str = OUTPUT, hostapi=None):
+        """
+        Finds a device index by name.
+
+        An exact (case-insensitive) name match wins over a substring match.
+        Returns None when name is None or nothing matches, which means "use
+        the default device" for every backend.
+        """
+        if name is None:
+            return None
+
+        if kind == INPUT:
+            channels_key = "max_input_channels"
+        else:
+            channels_key = "max_output_channels"
+        wanted = name.lower()
+        partial = None
+
+        for index, device in enumerate(self.devices()):
+            if device[channels_key] <= 0:
+                continue
+            if hostapi is not None and hostapi.lower() not in (
+                self.hostapi_name(device).lower()
+            ):
+                continue
+
+            device_name = device["name"].lower()
+            if device_name == wanted:
+                return device.get("index", index)
+            if partial is None and wanted in device_name:
+                partial = device.get("index", index)
+
+        return partial
+
+    # --- Roles ---
+
+    def add_role(self, role: str, name, kind: str = OUTPUT, hostapi=None):
+        """Registers a role and returns the device index it resolves to."""
+        self._roles[role] = (name, kind, hostapi)
+        self._resolved[role] = self._resolve(role)
+
+        if name is not None and self._resolved[role][0] is None:
+            print(f"Audio device '{name}' not found, using the default {kind}")
+
+        return self._resolved[role][0]
+
+    def resolve(self, role: str):
+        """Returns the device index currently used for role."""
+        return self._resolved[role][0]
+
+    def _resolve(self, role):
+        name, kind, hostapi = self._roles[role]
+        index = self.find(name, kind, hostapi)
+        if index is None:
+            return (None, None)
+        return (index, self.devices()[index]["name"])
+
+    def add_listener(self, callback):
+        """Registers callback(role, index), called when a role's device changes."""
+        self._listeners.append(callback)
+
+    def check(self, rescan: bool = False):
+        """
+        Re-queries the device list and re-resolves every role.
+
+        Returns the roles whose device changed, after notifying the listeners.
+        A rescan reports every role as changed, since it is requested when
+        streams died and have to be reopened anyway.
+        """
+        if rescan and self._rescan is not None:
+            self._rescan()
+
+        before = self._devices
+        after = self.devices(refresh=True)
+        if before == after and not rescan:
+            return []
+
+        changed = []
+        for role in self._roles:
+            resolved = self._resolve(role)
+            if resolved != self._resolved[role] or rescan:
+                self._resolved[role] = resolved
+                changed.append(role)
+
+        for role in changed:
+            for callback in self._listeners:
+                try:
+                    callback(role, self._resolved[role][0])
+                except Exception as e:
+                    print(f"Error handling device change for {role}: {e}")
+
+        return changed
+
+    def request_rescan(self):
+        """Asks the watcher thread for a full rescan, e.g. after a stream died."""
+        self._rescan_requested = True
+        self._wake.set()
+
+    # --- Watcher ---
+
+    def _watch(self):
+        while self._watching:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if not self._watching:
+                break
+
+            rescan = self._rescan_requested
+            self._rescan_requested = False
+            try:
+                idle = self._streams_open is not None and not self._streams_open()
+                if idle and not rescan and self._rescan is not None:
+                    self._rescan()  # Nothing to invalidate, new devices show up
+                self.check(rescan=rescan)
+            except Exception as e:
+                print(f"Error checking audio devices: {e}")
+
+    def start_watching(self):
+        if self._watching:
+            return
+        self._watching = True
+        self._watch_thread = threading.Thread(target=self._watch)
+        self._watch_thread.daemon = True
+        self._watch_thread.start()
+
+    def stop_watching(self):
+        self._watching = False
+        self._wake.set()
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            self._watch_thread.join(timeout=1.0)
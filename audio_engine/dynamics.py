@@ -0,0 +1,228 @@
+"""
+Dynamics of the output bus: a compressor and a look-ahead peak limiter.
+
+Both follow the effect protocol (process, reset, expensive, latency) on mono
+float32 blocks and keep their state between blocks, so the result does not
+depend on the block size. They run last, on what goes to the virtual cable.
+"""
+
+import math
+
+import numpy as np
+from numba import jit
+
+
+@jit(nopython=True, cache=True)
+def _limiter_core(audio, ceiling, release, delay, box, peaks, times, state, index):
+    """
+    Look-ahead limiter over one block, the state arrays are updated in place.
+
+    The gain a sample needs (ceiling / level) is spread over the len(delay)
+    samples before it: a sliding minimum over lookahead + 1 samples, then a
+    moving average over lookahead samples. The signal is delayed by lookahead,
+    so the averaged gain is all the way down when the peak comes out, without
+    a step. Returns the output and the lowest gain of the block
+    """
+    lookahead = len(delay)
+    window = len(peaks)  # lookahead + 1
+    output = np.empty_like(audio)
+
+    gain, total = state[0], state[1]
+    n, head, count = index[0], index[1], index[2]
+    lowest = 1.0
+
+    for i in range(len(audio)):
+        x = audio[i]
+        level = abs(x)
+        required = ceiling / level if level > ceiling else 1.0
+
+        # Sliding minimum of the required gains (monotonic queue)
+        while count > 0 and peaks[(head + count - 1) % window] >= required:
+            count -= 1
+        peaks[(head + count) % window] = required
+        times[(head + count) % window] = n
+        count += 1
+        if times[head] <= n - window:
+            head = (head + 1) % window
+            count -= 1
+        target = peaks[head]
+
+        # Down at once (the average smooths it), back up with the release
+        if target < gain:
+            gain = target
+        else:
+            gain = target + (gain - target) * release
+
+        slot = n % lookahead
+        total += gain - box[slot]
+        box[slot] = gain
+        smoothed = total / lookahead
+
+        output[i] = delay[slot] * smoothed
+        delay[slot] = x
+        lowest = min(lowest, smoothed)
+        n += 1
+
+    state[0], state[1] = gain, total
+    index[0], index[1], index[2] = n, head, count
+    return output, lowest
+
+
+@jit(nopython=True, cache=True)
+def _compressor_core(audio, threshold, slope, attack, release, makeup, state):
+    """
+    Feed-forward compressor over one block: a peak envelope with attack and
+    release, and a gain of slope dB less per dB over threshold (dBFS).
+    Returns the output and the lowest gain of the block, without makeup
+    """
+    output = np.empty_like(audio)
+    envelope = state[0]
+    lowest = 1.0
+
+    for i in range(len(audio)):
+        level = abs(audio[i])
+        coefficient = attack if level > envelope else release
+        envelope = level + (envelope - level) * coefficient
+
+        gain = 1.0
+        if envelope > 1e-9:
+            over = 20.0 * math.log10(envelope) - threshold
+            if over > 0.0:
+                gain = 10.0 ** (-over * slope / 20.0)
+
+        output[i] = audio[i] * gain * makeup
+        lowest = min(lowest, gain)
+
+    state[0] = envelope
+    return output, lowest
+
+
+def _coefficient(samplerate: int, ms: float):
+    """Per-sample smoothing coefficient of a time constant in ms."""
+    if ms <= 0:
+        return 0.0
+    return math.exp(-1.0 / (samplerate * ms / 1000.0))
+
+
+class Limiter:
+    """
+    Look-ahead peak limiter: no sample leaves above ceiling_db, and peaks are
+    turned down smoothly instead of clipped.
+
+    Latency: lookahead_ms (rounded to samples), the signal is delayed by
+    exactly latency samples. reduction_db is the gain reduction of the last
+    block, 0.0 when the limiter did nothing.
+    """
+
+    expensive = False
+
+    def __init__(
+        self,
+        samplerate: int = 44100,
+        ceiling_db: float = -1.0,
+        lookahead_ms: float = 1.5,
+        release_ms: float = 60.0,
+    ):
+        """
+        Initializes the Limiter.
+
+        Args:
+            samplerate (int): Sample rate of the bus.
+            ceiling_db (float): Highest output level in dBFS.
+            lookahead_ms (float): How early the gain starts falling before a
+                peak, also the latency of the limiter.
+            release_ms (float): Time constant of the gain coming back up.
+        """
+        self.samplerate = samplerate
+        self.ceiling = 10 ** (ceiling_db / 20.0)
+        self.release = _coefficient(samplerate, release_ms)
+        self.latency = max(1, round(samplerate * lookahead_ms / 1000.0))
+
+        self._delay = np.zeros(self.latency, dtype=np.float32)
+        self._box = np.ones(self.latency, dtype=np.float64)
+        self._peaks = np.ones(self.latency + 1, dtype=np.float64)
+        self._times = np.zeros(self.latency + 1, dtype=np.int64)
+        self._state = np.zeros(2, dtype=np.float64)
+        self._index = np.zeros(3, dtype=np.int64)
+        self.reset()
+
+    def process(self, block):
+        output, lowest = _limiter_core(
+            block,
+            self.ceiling,
+            self.release,
+            self._delay,
+            self._box,
+            self._peaks,
+            self._times,
+            self._state,
+            self._index,
+        )
+        self.reduction_db = -20.0 * math.log10(max(lowest, 1e-6))
+        return output
+
+    def reset(self):
+        self._delay.fill(0.0)
+        self._box.fill(1.0)
+        self._state[:] = (1.0, self.latency)  # Gain, sum of the box
+        self._index.fill(0)  # Sample count, head and length of the queue
+        self.reduction_db = 0.0
+
+
+class Compressor:
+    """
+    Compressor for the output bus, to even out the mix before the limiter.
+
+    Latency: 0, it only follows the level. reduction_db is the gain
+    reduction of the last block, before makeup.
+    """
+
+    expensive = False
+    latency = 0
+
+    def __init__(
+        self,
+        samplerate: int = 44100,
+        threshold_db: float = -18.0,
+        ratio: float = 3.0,
+        attack_ms: float = 5.0,
+        release_ms: float = 120.0,
+        makeup_db: float = 0.0,
+    ):
+        """
+        Initializes the Compressor.
+
+        Args:
+            samplerate (int): Sample rate of the bus.
+            threshold_db (float): Level in dBFS from which it compresses.
+            ratio (float): dB over the threshold in for 1 dB out.
+            attack_ms (float): Time constant of the envelope rising.
+            release_ms (float): Time constant of the envelope falling.
+            makeup_db (float): Gain applied after the compression.
+        """
+        self.samplerate = samplerate
+        self.threshold_db = threshold_db
+        self.slope = 1.0 - 1.0 / ratio
+        self.attack = _coefficient(samplerate, attack_ms)
+        self.release = _coefficient(samplerate, release_ms)
+        self.makeup = 10 ** (makeup_db / 20.0)
+
+        self._state = np.zeros(1, dtype=np.float64)  # Envelope
+        self.reduction_db = 0.0
+
+    def process(self, block):
+        output, lowest = _compressor_core(
+            block,
+            self.threshold_db,
+            self.slope,
+            self.attack,
+            self.release,
+            self.makeup,
+            self._state,
+        )
+        self.reduction_db = -20.0 * math.log10(max(lowest, 1e-6))
+        return output
+
+    def reset(self):
+        self._state.fill(0.0)
+        self.reduction_db = 0.0
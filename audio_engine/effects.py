@@ -0,0 +1,155 @@
+import ast
+import importlib
+import os
+import sys
+
+import numpy as np
+
+EFFECTS_PACKAGE = "voice_effects"
+
+
+def available_effects(folder: str = EFFECTS_PACKAGE):
+    """Names of the effect modules in folder (private "_" modules excluded)."""
+    return sorted(
+        file[:-3]
+        for file in os.listdir(folder)
+        if file.endswith(".py") and not file.startswith("_")
+    )
+
+
+def parse_effect_spec(spec: str):
+    """
+    Splits an effect spec into the module name and its parameters.
+
+    "pitch_shift:factor=0.7,window_ms=30" -> ("pitch_shift", {"factor": 0.7,
+    "window_ms": 30}). Values are Python literals, anything else is a string.
+    """
+    name, _, params_text = spec.partition(":")
+    params = {}
+
+    for item in filter(None, params_text.split(",")):
+        key, _, value = item.partition("=")
+        try:
+            params[key.strip()] = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            params[key.strip()] = value.strip()
+
+    return name.strip(), params
+
+
+def load_effect(spec: str, samplerate: int):
+    """
+    Creates an effect processor from a spec.
+
+    Every module in voice_effects exposes create_effect(samplerate, **params)
+    returning an object with process(block) -> block (mono float32) and
+    reset().
+    """
+    name, params = parse_effect_spec(spec)
+    module = importlib.import_module(f"{EFFECTS_PACKAGE}.{name}")
+
+    if not hasattr(module, "create_effect"):
+        raise ValueError(f"'{name}' is not an effect module (no create_effect)")
+
+    return module.create_effect(samplerate, **params)
+
+
+def reload_effect_module(name: str):
+    """
+    Makes the next load_effect(name) use the current file of the module, after
+    it was added or edited while the app runs.
+    """
+    importlib.invalidate_caches()
+    module = sys.modules.get(f"{EFFECTS_PACKAGE}.{name}")
+    if module is not None:
+        importlib.reload(module)
+
+
+class EffectChain:
+    """Effect processors applied one after another on mono float32 blocks."""
+
+    def __init__(self, effects=()):
+        self.effects = list(effects)
+
+    @classmethod
+    def from_specs(cls, specs, samplerate: int):
+        return cls(load_effect(spec, samplerate) for spec in specs)
+
+    @property
+    def expensive(self):
+        """True when one of the effects is worth skipping during silence."""
+        return any(getattr(effect, "expensive", False) for effect in self.effects)
+
+    @property
+    def latency(self):
+        """Delay in samples the chain adds to the signal."""
+        return sum(effect.latency for effect in self.effects)
+
+    def process(self, block):
+        for effect in self.effects:
+            block = effect.process(block)
+        return block
+
+    def reset(self):
+        for effect in self.effects:
+            effect.reset()
+
+
+class EffectCrossfade:
+    """
+    Transition between two effects (None is passthrough): both run on the
+    same blocks and the output fades from old to new over length samples.
+    Once done is True the caller replaces it with new.
+    """
+
+    def __init__(self, old, new, length: int):
+        self.old = old
+        self.new = new
+        self.length = max(1, length)
+        self.position = 0
+
+    @property
+    def done(self):
+        return self.position >= self.length
+
+    @property
+    def expensive(self):
+        return any(
+            getattr(effect, "expensive", False) for effect in (self.old, self.new)
+        )
+
+    @property
+    def latency(self):
+        return getattr(self.new, "latency", 0)
+
+    def process(self, block):
+        old = block if self.old is None else self.old.process(block)
+        new = block if self.new is None else self.new.process(block)
+
+        ramp = np.arange(self.position + 1, self.position + len(block) + 1)
+        ramp = np.minimum(ramp / self.length, 1.0).astype(np.float32)
+        self.position += len(block)
+        return old + (new - old) * ramp
+
+    def reversed(self, length: int):
+        """
+        The transition back to old, over length samples, starting from the
+        current mix so the output does not jump.
+        """
+        back = EffectCrossfade(self.new, self.old, length)
+        progress = min(1.0, self.position / self.length)
+        back.position = round(back.length * (1.0 - progress))
+        return back
+
+    def effects(self):
+        """Every effect this transition runs, nested transitions included."""
+        for effect in (self.old, self.new):
+            if isinstance(effect, EffectCrossfade):
+                yield from effect.effects()
+            elif effect is not None:
+                yield effect
+
+    def reset(self):
+        for effect in (self.old, self.new):
+            if effect is not None:
+                effect.reset()
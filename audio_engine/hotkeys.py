@@ -0,0 +1,114 @@
+import collections
+import threading
+import time
+
+
+class HotkeyTrigger:
+    """
+    Fires clips from global hotkeys, without going through the Tk event loop.
+
+    The keyboard is read on a listener thread of its own (pynput, optional).
+    A key press looks its clip up in the clip cache and pushes it straight
+    into the playback engine's command queue, so a busy UI (redrawing,
+    resizing, rebuilding the sound panel) does not delay the trigger. Other
+    trigger sources (MIDI, the control API...) can call fire() from any
+    thread the same way.
+
+    The time from the listener callback (fire()) to the audio callback that
+    outputs the first sample of the clip is kept in latencies. pynput gives
+    no event time, so the delay of the OS and of the listener thread before
+    the callback runs is not included.
+    """
+
+    def __init__(self, engine, resolve, bindings=None):
+        """
+        Initializes the HotkeyTrigger.
+
+        Args:
+            engine (PlaybackEngine): Engine the clips are triggered on.
+            resolve (callable): resolve(name) -> Clip, or None when the clip
+                is not decoded yet. Called on the listener thread, so it must
+                not block (e.g. a lookup in the clip cache).
+            bindings (dict): Hotkey -> sound name, hotkeys in pynput format
+                like "<ctrl>+<alt>+1".
+        """
+        self.engine = engine
+        self.resolve = resolve
+        self.bindings = dict(bindings or {})
+
+        # Seconds from fire() to the audio callback outputting the clip
+        self.latencies = collections.deque(maxlen=4096)
+
+        self._listener = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self._listener is not None
+
+    def fire(self, hotkey: str, trigger_time=None):
+        """Triggers the clip bound to hotkey (any thread). False if none."""
+        if trigger_time is None:
+            trigger_time = time.perf_counter()
+
+        name = self.bindings.get(hotkey)
+        clip = self.resolve(name) if name is not None else None
+        if clip is None:
+            if name is not None:
+                print(f"Hotkey {hotkey}: {name} is not loaded yet")
+            return False
+
+        self.engine.trigger(clip, trigger_time, latencies=self.latencies)
+        return True
+
+    def bind(self, hotkey: str, name: str):
+        """Binds hotkey to a sound, replacing its previous sound."""
+        self.bindings[hotkey] = name
+        self._restart()
+
+    def unbind(self, hotkey: str):
+        if self.bindings.pop(hotkey, None) is not None:
+            self._restart()
+
+    def _restart(self):
+        if self.active:
+            self.stop()
+            self.start()
+
+    def start(self):
+        """
+        Starts listening to the bound hotkeys. Returns False when global
+        hotkeys are not available (pynput missing, no display...), the
+        buttons keep working.
+        """
+        with self._lock:
+            if self._listener is not None or not self.bindings:
+                return self._listener is not None
+            try:
+                from pynput import keyboard
+            except ImportError:
+                print("pynput is not installed, global hotkeys are disabled")
+                return False
+
+            # Default arguments pin each hotkey to its own callback
+            callbacks = {
+                hotkey: lambda hotkey=hotkey: self.fire(hotkey)
+                for hotkey in self.bindings
+            }
+            try:
+                listener = keyboard.GlobalHotKeys(callbacks)
+                listener.daemon = True
+                listener.start()
+            except Exception as e:
+                print(f"Error starting global hotkeys: {e}")
+                return False
+
+            self._listener = listener
+            return True
+
+    def stop(self):
+        with self._lock:
+            if self._listener is None:
+                return
+            self._listener.stop()
+            self._listener = None
@@ -0,0 +1,48 @@
+import math
+
+import numpy as np
+
+
+class LevelMeter:
+    """
+    Peak and RMS meter for one signal.
+
+    process() is called from the audio callback with every block, the UI reads
+    level from its own thread. The peak falls back slowly (release_ms per
+    -60 dB), so short peaks stay visible between two UI refreshes.
+    """
+
+    def __init__(
+        self, samplerate: int = 44100, release_ms: float = 300.0, floor_db=-60.0
+    ):
+        self.samplerate = samplerate
+        self.floor_db = floor_db
+
+        # Per-sample decay that falls by floor_db over release_ms
+        release_samples = samplerate * release_ms / 1000.0
+        self._decay_per_sample = 10 ** (floor_db / 20.0 / release_samples)
+
+        self.peak = 0.0
+        self.rms = 0.0
+
+    def process(self, block):
+        if len(block) == 0:
+            return
+
+        block_peak = float(max(block.max(), -block.min()))
+        self.rms = math.sqrt(float(np.dot(block, block)) / len(block))
+
+        decayed = self.peak * self._decay_per_sample ** len(block)
+        self.peak = max(block_peak, decayed)
+
+    @property
+    def level(self):
+        """Peak level mapped from floor_db..0 dBFS to 0.0..1.0."""
+        if self.peak <= 0.0:
+            return 0.0
+        db = 20.0 * math.log10(self.peak)
+        return min(1.0, max(0.0, 1.0 - db / self.floor_db))
+
+    def reset(self):
+        self.peak = 0.0
+        self.rms = 0.0
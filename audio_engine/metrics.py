@@ -0,0 +1,187 @@
+import json
+import threading
+import time
+
+# Histogram bucket upper edges, as a share of the block deadline
+LOAD_BUCKETS = (0.1, 0.25, 0.5, 0.75, 1.0)
+
+
+class EngineMetrics:
+    """
+    Real-time health counters of one audio stream.
+
+    record() is called at the end of every callback, from the audio thread.
+    It only does a few integer/float updates, no allocation and no locking;
+    readers on other threads take a snapshot(), which may be one callback
+    behind but never blocks the audio.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.reset()
+
+    def reset(self):
+        self.callbacks = 0
+        self.input_overflows = 0
+        self.output_underflows = 0
+        self.total_time = 0.0
+        self.worst_time = 0.0
+        self.worst_load = 0.0
+        self.last_load = 0.0
+        self.histogram = [0] * (len(LOAD_BUCKETS) + 1)
+
+        # Callbacks that skipped the expensive processing (silence)
+        self.bypassed_callbacks = 0
+        self.bypassed_time = 0.0
+
+        # Since the last take_window() call
+        self.window_worst_load = 0.0
+        self._window_callbacks = 0
+        self._window_active = 0
+        self._window_xruns = 0
+
+    def record(
+        self,
+        duration: float,
+        frames: int,
+        samplerate: int,
+        status=None,
+        bypassed: bool = False,
+    ):
+        """
+        Records one callback.
+
+        Args:
+            duration (float): Seconds the callback took.
+            frames (int): Frames in the block.
+            samplerate (int): Stream sample rate.
+            status: Backend status flags (input_overflow/output_underflow).
+            bypassed (bool): The callback skipped the expensive processing.
+        """
+        self.callbacks += 1
+        self._window_callbacks += 1
+        self.total_time += duration
+        if bypassed:
+            self.bypassed_callbacks += 1
+            self.bypassed_time += duration
+
+        if status:
+            if getattr(status, "input_overflow", False):
+                self.input_overflows += 1
+            if getattr(status, "output_underflow", False):
+                self.output_underflows += 1
+
+        load = duration * samplerate / frames if frames else 0.0
+        self.last_load = load
+        if duration > self.worst_time:
+            self.worst_time = duration
+        if load > self.worst_load:
+            self.worst_load = load
+        # Bypassed blocks say nothing about the load when someone speaks
+        if not bypassed:
+            self._window_active += 1
+            if load > self.window_worst_load:
+                self.window_worst_load = load
+
+        bucket = 0
+        while bucket < len(LOAD_BUCKETS) and load > LOAD_BUCKETS[bucket]:
+            bucket += 1
+        self.histogram[bucket] += 1
+
+    @property
+    def xruns(self):
+        return self.input_overflows + self.output_underflows
+
+    def take_window(self):
+        """
+        Returns (worst load, xruns, callbacks) since the previous call and
+        starts a new window. Used by the block size controller to watch recent
+        behaviour. The load is None when every callback of the window was
+        bypassed, or when there was none (stream not open).
+        """
+        worst_load = self.window_worst_load if self._window_active else None
+        callbacks = self._window_callbacks
+        self.window_worst_load = 0.0
+        self._window_callbacks = 0
+        self._window_active = 0
+
+        xruns = self.xruns - self._window_xruns
+        self._window_xruns = self.xruns
+        return worst_load, xruns, callbacks
+
+    def snapshot(self):
+        """Returns the counters as a JSON serializable dict."""
+        labels = [f"<={edge:.0%}" for edge in LOAD_BUCKETS] + [">100%"]
+        active = self.callbacks - self.bypassed_callbacks
+        return {
+            "name": self.name,
+            "callbacks": self.callbacks,
+            "input_overflows": self.input_overflows,
+            "output_underflows": self.output_underflows,
+            "mean_callback_ms": (
+                1000.0 * self.total_time / self.callbacks if self.callbacks else 0.0
+            ),
+            "worst_callback_ms": 1000.0 * self.worst_time,
+            "bypassed_callbacks": self.bypassed_callbacks,
+            "mean_active_ms": (
+                1000.0 * (self.total_time - self.bypassed_time) / active
+                if active
+                else 0.0
+            ),
+            "mean_bypassed_ms": (
+                1000.0 * self.bypassed_time / self.bypassed_callbacks
+                if self.bypassed_callbacks
+                else 0.0
+            ),
+            "worst_load": self.worst_load,
+            "load_histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+class MetricsLogger:
+    """
+    Appends a snapshot of every metrics object to a JSON lines file at a fixed
+    interval, for post-mortem analysis of glitches.
+    """
+
+    def __init__(self, metrics, path: str, interval: float = 5.0):
+        """
+        Initializes the MetricsLogger.
+
+        Args:
+            metrics (list): EngineMetrics objects to log.
+            path (str): JSON lines file, appended to.
+            interval (float): Seconds between two snapshots.
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    def write(self):
+        with open(self.path, "a") as file:
+            for metrics in self.metrics:
+                line = {"time": time.time(), **metrics.snapshot()}
+                file.write(json.dumps(line) + "\n")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.write()
+            except OSError as e:
+                print(f"Error writing metrics to {self.path}: {e}")
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+            self.write()  # Last state at shutdown
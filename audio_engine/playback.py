@@ -0,0 +1,502 @@
+import collections
+import itertools
+import time
+
+import numpy as np
+
+from audio_engine.meters import LevelMeter
+from audio_engine.metrics import EngineMetrics
+
+PLAY = "play"
+PLAY_MANY = "play_many"
+SCHEDULE = "schedule"
+QUEUE = "queue"
+RELEASE = "release"
+STOP = "stop"
+STOP_ALL = "stop_all"
+
+# Voice stealing policies, which voice goes when max_voices are playing
+STEAL_OLDEST = "oldest"
+STEAL_QUIETEST = "quietest"
+
+
+class Voice:
+    """
+    A single playing (or scheduled) instance of a clip.
+
+    start is the engine frame its first sample plays at, None while it waits
+    for the voice before it (next) to end. A looping voice jumps from
+    loop_end back to loop_start, loops more times (None: until released),
+    then plays on to the end of the clip.
+
+    A choked or stolen voice is not cut but faded out: fade is its position
+    in the engine's fade-out ramp, None while it plays normally.
+    """
+
+    __slots__ = (
+        "clip",
+        "id",
+        "position",
+        "start",
+        "started",
+        "loop_start",
+        "loop_end",
+        "loops",
+        "next",
+        "fade",
+    )
+
+    def __init__(self, clip, voice_id=None, start=None):
+        self.clip = clip
+        self.id = voice_id
+        self.position = 0
+        self.start = start
+        self.started = False  # Counted against the polyphony limits
+        self.loop_start = 0
+        self.loop_end = None  # None: no loop
+        self.loops = 0
+        self.next = None  # Voice starting right when this one ends
+        self.fade = None
+
+    def set_loop(self, loop_start: int = 0, loop_end: int = None, loops: int = None):
+        loop_end = len(self.clip) if loop_end is None else loop_end
+        if not 0 <= loop_start < loop_end <= len(self.clip):
+            raise ValueError(
+                f"Invalid loop points {loop_start}..{loop_end} "
+                f"for a clip of {len(self.clip)} samples"
+            )
+        self.loop_start = loop_start
+        self.loop_end = loop_end
+        self.loops = loops
+
+    def level(self, window: int):
+        """Peak of the next window samples (linear), to find the quietest voice."""
+        data = self.clip.data[self.position : self.position + window]
+        if self.fade is not None or len(data) == 0:
+            return 0.0
+        return max(int(data.max()), -int(data.min())) * self.clip.scale
+
+    def mix(self, mix, scratch, offset: int, fade_out):
+        """
+        Adds the voice to mix from offset on. Returns the offset in mix where
+        it ended, None when it plays on into the next block.
+        """
+        frames = len(mix)
+        while offset < frames:
+            looping = self.loop_end is not None and self.loops != 0
+            end = self.loop_end if looping else len(self.clip)
+
+            want = min(frames - offset, end - self.position)
+            if self.fade is not None:
+                want = min(want, len(fade_out) - self.fade)
+            count = self.clip.read(self.position, scratch[:want])
+            if self.fade is not None:
+                scratch[:count] *= fade_out[self.fade : self.fade + count]
+                self.fade += count
+
+            mix[offset : offset + count] += scratch[:count]
+            offset += count
+            self.position += count
+
+            if self.fade is not None and self.fade >= len(fade_out):
+                return offset  # Faded out
+            if self.position < end:
+                continue
+            if not looping:
+                return offset
+
+            # Back to the loop start, inside the same block: no gap
+            self.position = self.loop_start
+            if self.loops is not None:
+                self.loops -= 1
+        return None
+
+
+class PlaybackEngine:
+    """
+    Mixes triggered clips into a single output stream that stays open.
+
+    Triggering a clip only appends a command to a queue, the next audio
+    callback picks it up and the clip starts at the first sample of that
+    block. No stream is opened and no thread is started per sound.
+
+    Clips can also be scheduled on the engine's sample clock (frame, the
+    number of frames rendered so far): at a given frame, looping between
+    loop points, queued after the previous queued clip, or as a sequence.
+    The mixer starts a voice at its exact offset inside the block and a
+    queued voice on the sample its predecessor ends at, so the timing does
+    not depend on thread scheduling and transitions have no gap.
+
+    However the buttons are mashed, at most max_voices voices play (plus the
+    ones fading out, bounded by max_voices as well): a voice starting over
+    the limit steals the oldest or quietest one. A clip can also limit its
+    own voices (clip.polyphony, 1 restarts it instead of stacking) and belong
+    to a choke group (clip.choke_group) whose other voices it cuts. Cut
+    voices fade out over fade_ms instead of clicking.
+    """
+
+    def __init__(
+        self,
+        samplerate: int = 44100,
+        block_size: int = 256,
+        channels: int = 1,
+        max_voices: int = 32,
+        steal: str = STEAL_OLDEST,
+        fade_ms: float = 5.0,
+    ):
+        """
+        Initializes the PlaybackEngine.
+
+        Args:
+            samplerate (int): Output sample rate, clips must already match it.
+            block_size (int): Frames per callback.
+            channels (int): Output channels, the mono mix is copied to each.
+            max_voices (int): Maximum number of clips playing at once.
+            steal (str): STEAL_OLDEST or STEAL_QUIETEST, the voice that makes
+                room for a new one over max_voices.
+            fade_ms (float): Fade out of a choked or stolen voice.
+        """
+        self.samplerate = samplerate
+        self.block_size = block_size
+        self.channels = channels
+        self.max_voices = max_voices
+        self.steal = steal
+
+        fade_length = max(1, int(samplerate * fade_ms / 1000.0))
+        self._fade_out = np.linspace(1.0, 0.0, fade_length, endpoint=False)
+        self._fade_out = self._fade_out.astype(np.float32)
+
+        self.device = None
+        self.stream = None
+        self.backend = None
+        self._closing = False
+
+        # Called (from the audio thread) when the stream dies on its own
+        self.on_stream_lost = None
+
+        # deque.append/popleft are atomic, so the UI thread never waits on the
+        # audio thread and vice versa
+        self._commands = collections.deque()
+        self._voices = []
+        self._voice_ids = itertools.count(1)
+        self._queue_tail = None  # Last voice of queue()
+
+        # Engine sample clock: frames rendered since the engine was created
+        self.frame = 0
+
+        self._mix = np.zeros(block_size, dtype=np.float32)
+        self._scratch = np.zeros(block_size, dtype=np.float32)
+
+        # Last stage of the mix (e.g. dynamics.Limiter), None is passthrough
+        self.output_stage = None
+
+        self.meter = LevelMeter(samplerate)
+        self.metrics = EngineMetrics("playback")
+
+        # Seconds from trigger() to the callback that outputs the first sample
+        self.onset_latencies = collections.deque(maxlen=4096)
+
+    def trigger(self, clip, trigger_time=None, latencies=None):
+        """
+        Schedules clip to start at the next callback (any thread).
+
+        Args:
+            clip (Clip): The clip to play.
+            trigger_time (float): perf_counter() time of the trigger event,
+                now when None.
+            latencies (deque): Where the onset latency of this trigger is
+                also appended, to measure one trigger source on its own.
+        """
+        if trigger_time is None:
+            trigger_time = time.perf_counter()
+        self._commands.append((PLAY, clip, trigger_time, latencies))
+
+    def trigger_many(self, clips, trigger_time=None):
+        """Schedules clips to start together, in the same block (any thread)."""
+        if trigger_time is None:
+            trigger_time = time.perf_counter()
+        self._commands.append((PLAY_MANY, tuple(clips), trigger_time, None))
+
+    def _voice(self, clip, loop, loop_start, loop_end, loops):
+        # Built on the calling thread, the audio thread only links it in
+        voice = Voice(clip, next(self._voice_ids))
+        if loop:
+            voice.set_loop(loop_start, loop_end, loops)
+        return voice
+
+    def schedule(
+        self,
+        clip,
+        frame: int = None,
+        loop: bool = False,
+        loop_start: int = 0,
+        loop_end: int = None,
+        loops: int = None,
+    ):
+        """
+        Schedules clip on the sample clock (any thread), returns its voice id.
+
+        Args:
+            clip (Clip): The clip to play.
+            frame (int): Engine frame (see frame) of its first sample, the
+                next block when None or already past.
+            loop (bool): Loops between loop_start and loop_end.
+            loop_start (int): Sample of the clip the loop jumps back to.
+            loop_end (int): Sample the loop jumps back at, None for the end.
+            loops (int): Repeats of the loop before it plays on to the end,
+                None loops until release() or stop_voice().
+        """
+        voice = self._voice(clip, loop, loop_start, loop_end, loops)
+        voice.start = frame
+        self._commands.append((SCHEDULE, voice, None, None))
+        return voice.id
+
+    def queue(self, clip, loop=False, loop_start=0, loop_end=None, loops=None):
+        """
+        Plays clip right after the previously queued clip ends, sample exact,
+        or at the next block when the queue is empty. Returns its voice id.
+        A looping clip holds the queue until it is released.
+        """
+        voice = self._voice(clip, loop, loop_start, loop_end, loops)
+        self._commands.append((QUEUE, voice, None, None))
+        return voice.id
+
+    def sequence(self, clips, frame: int = None):
+        """
+        Plays clips back to back without gaps, the first at frame (the next
+        block when None). Returns their voice ids.
+        """
+        voices = [Voice(clip, next(self._voice_ids)) for clip in clips]
+        for voice, following in zip(voices, voices[1:]):
+            voice.next = following
+        if voices:
+            voices[0].start = frame
+            self._commands.append((SCHEDULE, tuple(voices), None, None))
+        return [voice.id for voice in voices]
+
+    def release(self, voice_id: int):
+        """Lets a looping voice finish its current loop and play on to the end."""
+        self._commands.append((RELEASE, voice_id, None, None))
+
+    def stop_voice(self, voice_id: int):
+        """Fades one voice out at the next callback, what was queued after it starts."""
+        self._commands.append((STOP, voice_id, None, None))
+
+    def stop_all(self):
+        """Fades out every playing clip at the next callback, drops the queue."""
+        self._commands.append((STOP_ALL, None, None, None))
+
+    def _drain_commands(self):
+        now = time.perf_counter()
+        while self._commands:
+            command, clip, trigger_time, latencies = self._commands.popleft()
+
+            if command == PLAY:
+                self._start_voice(Voice(clip, start=self.frame))
+                self.onset_latencies.append(now - trigger_time)
+                if latencies is not None:
+                    latencies.append(now - trigger_time)
+            elif command == PLAY_MANY:
+                for each in clip:
+                    self._start_voice(Voice(each, start=self.frame))
+                self.onset_latencies.append(now - trigger_time)
+            elif command == SCHEDULE:
+                voices = clip if isinstance(clip, tuple) else (clip,)
+                if voices[0].start is None or voices[0].start < self.frame:
+                    voices[0].start = self.frame
+                for voice in voices:
+                    self._start_voice(voice)
+            elif command == QUEUE:
+                tail = self._queue_tail
+                if tail is not None and tail in self._voices:
+                    tail.next = clip
+                else:
+                    clip.start = self.frame
+                self._queue_tail = clip
+                self._start_voice(clip)
+            elif command == RELEASE:
+                for voice in self._voices:
+                    if voice.id == clip:
+                        voice.loops = 0
+            elif command == STOP:
+                for voice in [v for v in self._voices if v.id == clip]:
+                    if voice.started and voice.fade is None:
+                        voice.fade = 0
+                    elif not voice.started:
+                        self._end_voice(voice, self.frame)
+            elif command == STOP_ALL:
+                # Faded like a choke, nothing waiting starts after them
+                self._voices = [voice for voice in self._voices if voice.started]
+                for voice in self._voices:
+                    voice.next = None
+                    if voice.fade is None:
+                        voice.fade = 0
+                self._queue_tail = None
+
+    def _start_voice(self, voice):
+        # Limits apply once it sounds (see _make_room), the waiting ones cost
+        # nothing. Past the bound a waiting voice is dropped, silently, and
+        # only when none waits the oldest playing one fades out like a steal
+        if len(self._voices) >= 4 * self.max_voices:
+            waiting = [other for other in self._voices if not other.started]
+            playing = [other for other in self._voices if other.fade is None]
+            if waiting:
+                self._end_voice(waiting[0], self.frame)
+            elif playing:
+                playing[0].fade = 0
+        self._voices.append(voice)
+
+    def _make_room(self, voice, frame: int):
+        """Applies choke group and polyphony limits for a voice starting now."""
+        clip = voice.clip
+        playing = [
+            other
+            for other in self._voices
+            if other.started and other.fade is None and other is not voice
+        ]
+
+        group = clip.choke_group
+        limit = clip.polyphony
+        for other in playing:
+            if group is not None and other.clip.choke_group == group:
+                other.fade = 0
+        if limit is not None:
+            same = [o for o in playing if o.clip is clip and o.fade is None]
+            for other in same[: max(0, len(same) - limit + 1)]:
+                other.fade = 0  # Oldest first, playing is in start order
+
+        playing = [other for other in playing if other.fade is None]
+        if len(playing) >= self.max_voices:
+            if self.steal == STEAL_QUIETEST:
+                window = len(self._fade_out)
+                min(playing, key=lambda other: other.level(window)).fade = 0
+            else:
+                playing[0].fade = 0
+
+        # Fades are short, but mashing can pile them up: cut the oldest then
+        fading = [other for other in self._voices if other.fade is not None]
+        for other in fading[: max(0, len(fading) - self.max_voices)]:
+            self._end_voice(other, frame)
+        voice.started = True
+
+    def _end_voice(self, voice, frame: int):
+        self._voices.remove(voice)
+        voice.start = None  # Skipped if the render loop still gets to it
+        if voice.next is not None and voice.next.start is None:
+            voice.next.start = frame  # Gapless: on the sample this one ended
+
+    def render(self, frames: int):
+        """Mixes the next block of frames and returns it as a mono float32 array."""
+        if frames > len(self._mix):
+            self._mix = np.zeros(frames, dtype=np.float32)
+            self._scratch = np.zeros(frames, dtype=np.float32)
+
+        self._drain_commands()
+
+        mix = self._mix[:frames]
+        scratch = self._scratch[:frames]
+        mix.fill(0.0)
+
+        # Voices are in start order, a voice that ends in this block hands
+        # over to its next voice before the loop gets to it
+        block_start = self.frame
+        for voice in list(self._voices):
+            if voice.start is None or voice.start >= block_start + frames:
+                continue  # Waiting for its predecessor, later, or already cut
+            if not voice.started:
+                self._make_room(voice, block_start)
+            ended = voice.mix(
+                mix, scratch, max(0, voice.start - block_start), self._fade_out
+            )
+            if ended is not None:
+                self._end_voice(voice, block_start + ended)
+
+        self.frame += frames
+        if self.output_stage is not None:
+            mix = self.output_stage.process(mix)
+        self.meter.process(mix)
+        return mix
+
+    def callback(self, outdata, frames, time_info, status):
+        """Output stream callback."""
+        start = time.perf_counter()
+
+        mix = self.render(frames)
+        outdata[:] = mix[:, np.newaxis]
+
+        self.metrics.record(
+            time.perf_counter() - start, frames, self.samplerate, status
+        )
+
+    def _open_stream(self):
+        return self.backend.open_output_stream(
+            self.callback,
+            self.samplerate,
+            self.block_size,
+            channels=self.channels,
+            device=self.device,
+            dtype="float32",
+            finished_callback=self._on_stream_finished,
+        )
+
+    def _on_stream_finished(self):
+        # Called by the backend when the stream ends, which is unexpected
+        # unless we stopped it ourselves (device unplugged, driver reset...)
+        if self.stream is not None and not self._closing and self.on_stream_lost:
+            self.on_stream_lost()
+
+    def start(self, backend, device=None):
+        """
+        Opens and starts the output stream.
+
+        Args:
+            backend (AudioBackend): Backend that opens the stream.
+            device: Output device index, None for the default device.
+        """
+        self.device = device
+        self.backend = backend
+        self.stream = self._open_stream()
+        self.stream.start()
+
+    def reopen(self, device):
+        """
+        Moves playback to another device without losing the playing voices.
+
+        The new stream is opened before the old one is closed, so the gap is
+        only the time it takes to start the new stream.
+        """
+        self.device = device
+        if self.backend is None:
+            return
+
+        new_stream = self._open_stream()
+        self._close_stream()
+        self.stream = new_stream
+        self.stream.start()
+
+    def set_block_size(self, block_size: int, clips=()):
+        """
+        Reopens the stream with another block size. The given clips get their
+        first block primed again for the new size, playing voices continue.
+        """
+        self.block_size = block_size
+        for clip in clips:
+            clip.prime(block_size)
+        if self.stream is not None:
+            self.reopen(self.device)
+
+    def _close_stream(self):
+        if self.stream is None:
+            return
+        self._closing = True
+        try:
+            self.stream.stop()
+            self.stream.close()
+        except Exception as e:
+            print(f"Error closing playback stream: {e}")
+        finally:
+            self.stream = None
+            self._closing = False
+
+    def stop(self):
+        self._close_stream()
@@ -0,0 +1,164 @@
+import threading
+
+import numpy as np
+import soundfile as sf
+
+from audio_engine.ringbuffer import RingBuffer
+
+
+class Recorder:
+    """
+    Records an output bus to a FLAC or WAV file without touching the disk
+    from the audio thread.
+
+    The audio callback hands every block to process(), which only copies it
+    into a lock-free ring buffer. A writer thread wakes up every batch_ms and
+    writes everything buffered in one call. When the disk stalls for longer
+    than the ring holds (buffer_seconds), the blocks that do not fit are
+    dropped, counted and reported, and the audio keeps running.
+    """
+
+    def __init__(
+        self,
+        samplerate: int = 44100,
+        channels: int = 1,
+        buffer_seconds: float = 4.0,
+        batch_ms: float = 250.0,
+    ):
+        """
+        Initializes the Recorder.
+
+        Args:
+            samplerate (int): Sample rate of the recorded bus.
+            channels (int): Channels of the recorded blocks.
+            buffer_seconds (float): Audio the ring holds while the disk is
+                busy, the longest stall recorded without a gap.
+            batch_ms (float): How often the writer thread writes.
+        """
+        self.samplerate = samplerate
+        self.channels = channels
+        self.buffer_seconds = buffer_seconds
+        self.batch_ms = batch_ms
+
+        self.path = None
+        self.frames_recorded = 0
+        self._ring = None  # Set while recording, read by the audio thread
+        self._file = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._reported_drops = 0
+        # start() and stop() come from the UI and the control server threads
+        self._lock = threading.Lock()
+
+    @property
+    def recording(self):
+        return self._ring is not None
+
+    @property
+    def dropped_blocks(self):
+        return self._reported_drops if self._ring is None else self._ring.dropped
+
+    def process(self, block):
+        """Queues one block for the file (audio thread), never blocks."""
+        ring = self._ring
+        if ring is not None:
+            ring.write(block)
+
+    def start(self, path: str, subtype: str = None):
+        """
+        Starts recording to path, the format follows the extension (.flac,
+        .wav...). Returns False when the file could not be opened.
+
+        Args:
+            path (str): File to record to, replaced if it exists.
+            subtype (str): soundfile subtype, None for the format's default
+                (16 bit PCM for FLAC and WAV).
+        """
+        with self._lock:
+            return self._start(path, subtype)
+
+    def _start(self, path: str, subtype: str):
+        if self.recording:
+            self._stop()
+
+        try:
+            self._file = sf.SoundFile(
+                path, "w", self.samplerate, self.channels, subtype=subtype
+            )
+        except (RuntimeError, TypeError, ValueError) as e:
+            print(f"Error opening recording {path}: {e}")
+            return False
+
+        self.path = path
+        self.frames_recorded = 0
+        self._reported_drops = 0
+        self._stopping.clear()
+
+        ring = RingBuffer(int(self.samplerate * self.buffer_seconds), self.channels)
+        self._thread = threading.Thread(target=self._run, args=(ring,))
+        self._thread.daemon = True
+        self._thread.start()
+        self._ring = ring  # The audio thread starts queuing from here
+        print(f"Recording to {path}")
+        return True
+
+    def stop(self):
+        """Writes what is still buffered and closes the file."""
+        with self._lock:
+            self._stop()
+
+    def _stop(self):
+        if self._ring is None:
+            return
+        ring, self._ring = self._ring, None
+        self._stopping.set()
+        self._thread.join()
+        self._thread = None
+
+        self._file.close()
+        self._file = None
+        self._reported_drops = ring.dropped
+
+        seconds = self.frames_recorded / self.samplerate
+        message = f"Recorded {seconds:.1f} s to {self.path}"
+        if ring.dropped:
+            message += f", {ring.dropped} blocks dropped"
+        print(message)
+
+    def snapshot(self):
+        """State for the app and the control API, JSON serializable."""
+        return {
+            "recording": self.recording,
+            "path": self.path,
+            "frames": self.frames_recorded,
+            "seconds": self.frames_recorded / self.samplerate,
+            "dropped_blocks": self.dropped_blocks,
+        }
+
+    # --- Writer thread ---
+
+    def _run(self, ring):
+        batch = np.zeros((ring.capacity, self.channels), dtype=np.float32)
+        period = self.batch_ms / 1000.0
+
+        while not self._stopping.wait(period):
+            self._drain(ring, batch)
+        self._drain(ring, batch)
+
+    def _drain(self, ring, batch):
+        frames = ring.read(batch)
+        if frames:
+            try:
+                self._file.write(batch[:frames])
+            except (RuntimeError, OSError) as e:
+                print(f"Error writing recording {self.path}: {e}")
+            else:
+                self.frames_recorded += frames
+
+        dropped = ring.dropped
+        if dropped > self._reported_drops:
+            print(
+                f"Recording fell behind, {dropped - self._reported_drops} blocks "
+                f"dropped ({dropped} in total)"
+            )
+            self._reported_drops = dropped
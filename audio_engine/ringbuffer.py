@@ -0,0 +1,73 @@
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Single producer, single consumer ring of float32 frames.
+
+    One thread writes, one other thread reads, and neither ever waits on a
+    lock: the writer only moves frames_written and the reader only moves
+    frames_read, plain ints the other side just reads. A block that does not
+    fit is dropped whole (write() returns False) instead of overwriting
+    frames the reader has not taken yet.
+    """
+
+    def __init__(self, capacity: int, channels: int = 1):
+        """
+        Initializes the RingBuffer.
+
+        Args:
+            capacity (int): Frames the ring holds.
+            channels (int): Samples per frame, blocks are (frames, channels)
+                or (frames,) when mono.
+        """
+        self.capacity = capacity
+        self.channels = channels
+        self._buffer = np.zeros((capacity, channels), dtype=np.float32)
+
+        # Frames written / read since creation, only ever increase
+        self.frames_written = 0
+        self.frames_read = 0
+        self.dropped = 0  # Blocks that did not fit
+
+    @property
+    def available(self):
+        """Frames written and not read yet."""
+        return self.frames_written - self.frames_read
+
+    def write(self, block):
+        """Appends a block (writer thread). False when it was dropped."""
+        frames = len(block)
+        if frames > self.capacity - self.available:
+            self.dropped += 1
+            return False
+
+        block = block.reshape(frames, self.channels)
+        start = self.frames_written % self.capacity
+        first = min(frames, self.capacity - start)
+        self._buffer[start : start + first] = block[:first]
+        self._buffer[: frames - first] = block[first:]
+        self.frames_written += frames  # Published only once the frames are in
+        return True
+
+    def read(self, out):
+        """
+        Moves up to len(out) frames into out (reader thread), returns how
+        many. out is (frames, channels) or (frames,) when mono.
+        """
+        frames = min(len(out), self.available)
+        if frames == 0:
+            return 0
+
+        if out.ndim == 1:
+            out = out[:, None]  # A view, even of a strided column
+        start = self.frames_read % self.capacity
+        first = min(frames, self.capacity - start)
+        out[:first] = self._buffer[start : start + first]
+        out[first:frames] = self._buffer[: frames - first]
+        self.frames_read += frames
+        return frames
+
+    def clear(self):
+        """Drops what was not read yet (reader thread)."""
+        self.frames_read = self.frames_written
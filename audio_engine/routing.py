@@ -0,0 +1,347 @@
+import time
+
+import numpy as np
+
+from audio_engine.meters import LevelMeter
+from audio_engine.metrics import EngineMetrics
+from audio_engine.ringbuffer import RingBuffer
+
+# Sources: the raw microphone, the microphone after the voice path, the clips
+MIC = "mic"
+MIC_FX = "mic_fx"
+CLIPS = "clips"
+SOURCES = (MIC, MIC_FX, CLIPS)
+
+# Outputs: what the viewers hear (virtual cable) and the local headphones
+CABLE = "cable"
+MONITOR = "monitor"
+OUTPUTS = (CABLE, MONITOR)
+
+
+class RoutingMatrix:
+    """
+    Gains from every source to every output, applied to one block with one
+    matrix multiply: mixed (outputs x frames) = gains (outputs x sources) @
+    inputs (sources x frames).
+
+    inputs and mixed are allocated once per block size, the audio thread
+    fills the rows of inputs and calls mix(). Gains are changed from any
+    thread by swapping in a new matrix, so a block never sees half of a
+    change.
+    """
+
+    def __init__(self, sources=SOURCES, outputs=OUTPUTS, block_size: int = 256):
+        """
+        Initializes the RoutingMatrix, every route muted.
+
+        Args:
+            sources (tuple): Names of the rows of inputs.
+            outputs (tuple): Names of the rows of mixed.
+            block_size (int): Frames per block the buffers start with.
+        """
+        self.sources = tuple(sources)
+        self.outputs = tuple(outputs)
+        self.gains = np.zeros((len(self.outputs), len(self.sources)), np.float32)
+        self._allocate(block_size)
+
+    def _allocate(self, frames: int):
+        self.inputs = np.zeros((len(self.sources), frames), dtype=np.float32)
+        self.mixed = np.zeros((len(self.outputs), frames), dtype=np.float32)
+
+    def set_gain(self, source: str, output: str, gain: float):
+        """Sets the gain of one route (any thread), 0.0 mutes it."""
+        gains = self.gains.copy()
+        gains[self.outputs.index(output), self.sources.index(source)] = gain
+        self.gains = gains
+
+    def set_routes(self, routes):
+        """Replaces every gain with routes, {(source, output): gain}."""
+        gains = np.zeros_like(self.gains)
+        for (source, output), gain in routes.items():
+            gains[self.outputs.index(output), self.sources.index(source)] = gain
+        self.gains = gains
+
+    def routes(self):
+        """The routes that are not muted, {(source, output): gain}."""
+        gains = self.gains
+        return {
+            (source, output): float(gains[o, s])
+            for o, output in enumerate(self.outputs)
+            for s, source in enumerate(self.sources)
+            if gains[o, s] != 0.0
+        }
+
+    def feeds(self, output: str):
+        """True when some source reaches output."""
+        return bool(self.gains[self.outputs.index(output)].any())
+
+    def prepare(self, frames: int):
+        """inputs for a block of frames, to be filled row by row (audio thread)."""
+        if self.inputs.shape[1] != frames:
+            self._allocate(frames)  # Only when the block size changes
+        return self.inputs
+
+    def mix(self):
+        """Mixes the filled inputs into mixed and returns it (audio thread)."""
+        np.matmul(self.gains, self.inputs, out=self.mixed)
+        return self.mixed
+
+
+class AudioRouter:
+    """
+    Runs the whole soundboard on one clock: a single duplex stream reads the
+    microphone and writes the virtual cable, and its callback produces every
+    source (raw microphone, voice path, clip mix) and every output of the
+    routing matrix for the same block.
+
+    The monitor output plays on another device, which has its own clock: the
+    callback writes the monitor mix to a ring buffer and the monitor stream
+    reads it. It waits for prefill_blocks blocks before playing (again after
+    running dry), and a block that does not fit is dropped, so the monitor
+    delay stays bounded when the two clocks drift apart.
+
+    The voice path only runs once started with start_voice(), until then its
+    sources are silent and the microphone is just read.
+    """
+
+    def __init__(
+        self,
+        playback,
+        voice,
+        samplerate: int = 44100,
+        block_size: int = 256,
+        routes=None,
+        prefill_blocks: int = 2,
+    ):
+        """
+        Initializes the AudioRouter.
+
+        Args:
+            playback (PlaybackEngine): Clip mixer, rendered by the router
+                instead of its own stream.
+            voice (VoiceChanger): Voice path, run by the router instead of
+                its own stream.
+            samplerate (int): Sample rate of every stream.
+            block_size (int): Frames per callback.
+            routes (dict): {(source, output): gain}, see RoutingMatrix.
+            prefill_blocks (int): Blocks buffered before the monitor plays.
+        """
+        self.playback = playback
+        self.voice = voice
+        self.samplerate = samplerate
+        self.block_size = block_size
+        self.prefill_blocks = prefill_blocks
+
+        self.matrix = RoutingMatrix(block_size=block_size)
+        self.matrix.set_routes(routes or {})
+        self._mic = SOURCES.index(MIC)
+        self._mic_fx = SOURCES.index(MIC_FX)
+        self._clips = SOURCES.index(CLIPS)
+        self._cable = OUTPUTS.index(CABLE)
+        self._monitor = OUTPUTS.index(MONITOR)
+
+        # Last stage of each output (e.g. dynamics.Limiter), None is passthrough
+        self.output_stages = [None] * len(OUTPUTS)
+        self.meters = [LevelMeter(samplerate) for _ in OUTPUTS]
+        # Gets what goes to the cable (e.g. a Recorder), None records nothing
+        self.recorder = None
+        self.metrics = EngineMetrics("router")
+
+        self.monitor_ring = None  # Sized for the block size at every start
+        self.monitor_underruns = 0
+        self._monitor_playing = False
+
+        self.backend = None
+        self.input_device = None
+        self.output_device = None
+        self.monitor_device = None
+        self.stream = None
+        self.monitor_stream = None
+        self._closing = False
+
+        # Called (from the audio thread) when a stream dies on its own
+        self.on_stream_lost = None
+
+    @property
+    def active(self):
+        return self.stream is not None
+
+    def start_voice(self):
+        """Starts running the voice path on the router's stream."""
+        self.voice.routed = True
+        print("Voice changing active...")
+
+    def stop_voice(self):
+        """Stops running the voice path, its sources go silent again."""
+        if self.voice.routed:
+            self.voice.routed = False
+            print("Voice changer stopped")
+
+    # --- Audio thread ---
+
+    def callback(self, indata, outdata, frames, time_info, status):
+        """Duplex stream callback: microphone in, virtual cable out."""
+        start = time.perf_counter()
+
+        inputs = self.matrix.prepare(frames)
+        mic = indata[:, 0]
+        if self.voice.routed:
+            inputs[self._mic] = mic
+            # The xruns of the block go to the router metrics only, once
+            inputs[self._mic_fx] = self.voice.process_block(mic)
+        else:
+            inputs[self._mic] = 0.0
+            inputs[self._mic_fx] = 0.0
+
+        clips_start = time.perf_counter()
+        inputs[self._clips] = self.playback.render(frames)
+        self.playback.metrics.record(
+            time.perf_counter() - clips_start, frames, self.samplerate
+        )
+
+        mixed = self.matrix.mix()
+        cable = self._finish(self._cable, mixed[self._cable])
+        outdata[:] = cable[:, None]
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.process(cable)
+        if self.monitor_stream is not None:
+            self.monitor_ring.write(self._finish(self._monitor, mixed[self._monitor]))
+
+        self.metrics.record(
+            time.perf_counter() - start, frames, self.samplerate, status
+        )
+
+    def _finish(self, output: int, audio):
+        stage = self.output_stages[output]
+        if stage is not None:
+            audio = stage.process(audio)
+        self.meters[output].process(audio)
+        return audio
+
+    def monitor_callback(self, outdata, frames, time_info, status):
+        """Output stream callback of the monitor device."""
+        ring = self.monitor_ring
+        if not self._monitor_playing:
+            if ring.available < self.prefill_blocks * frames:
+                outdata.fill(0.0)
+                return
+            self._monitor_playing = True
+
+        read = ring.read(outdata[:, 0])
+        if read < frames:
+            outdata[read:, 0] = 0.0
+            self.monitor_underruns += 1
+            self._monitor_playing = False  # Buffer up again before playing on
+        if outdata.shape[1] > 1:
+            outdata[:, 1:] = outdata[:, :1]
+
+    # --- Streams ---
+
+    def _open_streams(self):
+        stream = self.backend.open_duplex_stream(
+            self.callback,
+            self.samplerate,
+            self.block_size,
+            channels=1,
+            input_device=self.input_device,
+            output_device=self.output_device,
+            dtype="float32",
+            finished_callback=self._on_stream_finished,
+        )
+
+        monitor_stream = None
+        if self.matrix.feeds(MONITOR):
+            try:
+                monitor_stream = self.backend.open_output_stream(
+                    self.monitor_callback,
+                    self.samplerate,
+                    self.block_size,
+                    channels=1,
+                    device=self.monitor_device,
+                    dtype="float32",
+                    finished_callback=self._on_stream_finished,
+                )
+            except Exception as e:
+                # The cable matters more, it runs without the monitor
+                print(f"Error opening monitor stream: {e}")
+        return stream, monitor_stream
+
+    def _on_stream_finished(self):
+        # Called by the backend when a stream ends, which is unexpected unless
+        # we stopped it ourselves (device unplugged, driver reset...)
+        if self.stream is not None and not self._closing and self.on_stream_lost:
+            self.on_stream_lost()
+
+    def start(
+        self, backend, input_device=None, output_device=None, monitor_device=None
+    ):
+        """
+        Opens and starts the streams.
+
+        Args:
+            backend (AudioBackend): Backend that opens the streams.
+            input_device: Microphone device index, None for the default.
+            output_device: Virtual cable device index, None for the default.
+            monitor_device: Headphones device index, None for the default.
+        """
+        self.backend = backend
+        self.input_device = input_device
+        self.output_device = output_device
+        self.monitor_device = monitor_device
+
+        self.stream, self.monitor_stream = self._open_streams()
+        self._start_streams()
+
+    def _start_streams(self):
+        # Room for the prefill and as much again of drift, beyond it blocks drop
+        blocks = 2 * self.prefill_blocks + 2
+        self.monitor_ring = RingBuffer(blocks * self.block_size)
+        self._monitor_playing = False
+        if self.monitor_stream is not None:
+            self.monitor_stream.start()
+        self.stream.start()
+
+    def reopen(self, input_device, output_device, monitor_device):
+        """Moves the streams to other devices, voices and effects keep playing."""
+        self.input_device = input_device
+        self.output_device = output_device
+        self.monitor_device = monitor_device
+        if self.stream is None:
+            return
+
+        # The duplex stream can hold the microphone exclusively, so the old
+        # streams have to go before the new ones can open
+        self._close_streams()
+        self.stream, self.monitor_stream = self._open_streams()
+        self._start_streams()
+
+    def set_block_size(self, block_size: int):
+        """Reopens the streams with another block size."""
+        self.block_size = block_size
+        if self.stream is not None:
+            self.reopen(self.input_device, self.output_device, self.monitor_device)
+
+    def _close_streams(self):
+        self._closing = True
+        try:
+            # One failing stream must not leave the other one open
+            for stream in (self.stream, self.monitor_stream):
+                if stream is None:
+                    continue
+                try:
+                    stream.stop()
+                except Exception as e:
+                    print(f"Error stopping router stream: {e}")
+                finally:
+                    try:
+                        stream.close()
+                    except Exception as e:
+                        print(f"Error closing router stream: {e}")
+        finally:
+            self.stream = None
+            self.monitor_stream = None
+            self._closing = False
+
+    def stop(self):
+        self._close_streams()
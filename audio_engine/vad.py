@@ -0,0 +1,93 @@
+import math
+
+import numpy as np
+
+
+class VoiceActivityDetector:
+    """
+    Cheap per-block voice activity detection for the microphone path.
+
+    A block counts as voice when its energy is above both a fixed threshold
+    and an adaptive noise floor (plus margin), and its zero-crossing rate is
+    not the one of hiss. Much louder blocks count as voice whatever their
+    zero crossings, so fricatives ("s", "f") are not cut. After the last voice
+    block the detector stays active for hangover_ms, so word endings and
+    short pauses keep the effects running.
+
+    The cost is one dot product and one sign comparison per block.
+    """
+
+    def __init__(
+        self,
+        samplerate: int = 44100,
+        threshold_db: float = -50.0,
+        margin_db: float = 9.0,
+        loud_db: float = 15.0,
+        max_zero_crossing_rate: float = 0.3,
+        hangover_ms: float = 300.0,
+        floor_rise_db_per_s: float = 3.0,
+    ):
+        """
+        Initializes the VoiceActivityDetector.
+
+        Args:
+            samplerate (int): Sample rate of the blocks.
+            threshold_db (float): Blocks below this RMS level are never voice.
+            margin_db (float): How far above the noise floor voice has to be.
+            loud_db (float): Above floor + margin + loud_db the zero-crossing
+                test is skipped.
+            max_zero_crossing_rate (float): Share of sign changes per sample
+                above which a quiet block is taken for noise.
+            hangover_ms (float): How long the detector stays active after
+                the last voice block.
+            floor_rise_db_per_s (float): How fast the noise floor estimate can
+                rise when the room gets louder.
+        """
+        self.samplerate = samplerate
+        self.threshold_db = threshold_db
+        self.margin_db = margin_db
+        self.loud_db = loud_db
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.hangover_samples = int(samplerate * hangover_ms / 1000.0)
+        self.floor_rise_per_sample = floor_rise_db_per_s / samplerate
+
+        self.reset()
+
+    def reset(self):
+        self.floor_db = None
+        self.active = False
+        self._hangover = 0
+
+    def is_voice(self, block):
+        """Decision for this block alone, without hangover."""
+        if len(block) == 0:
+            return False
+
+        energy = float(np.dot(block, block)) / len(block)
+        level_db = 10.0 * math.log10(max(energy, 1e-12))
+
+        # The floor follows quieter blocks at once and rises slowly
+        if self.floor_db is None or level_db < self.floor_db:
+            self.floor_db = level_db
+        else:
+            self.floor_db += self.floor_rise_per_sample * len(block)
+
+        gate_db = max(self.threshold_db, self.floor_db + self.margin_db)
+        if level_db < gate_db:
+            return False
+        if level_db > gate_db + self.loud_db:
+            return True
+
+        signs = np.signbit(block)
+        crossings = np.count_nonzero(signs[1:] != signs[:-1])
+        return crossings / len(block) < self.max_zero_crossing_rate
+
+    def process(self, block):
+        """Returns True while voice is active (including the hangover)."""
+        if self.is_voice(block):
+            self._hangover = self.hangover_samples
+        else:
+            self._hangover = max(0, self._hangover - len(block))
+
+        self.active = self._hangover > 0
+        return self.active
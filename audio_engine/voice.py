@@ -0,0 +1,312 @@
+import threading
+import time
+
+import numpy as np
+
+from audio_engine.effects import EffectCrossfade
+from audio_engine.meters import LevelMeter
+from audio_engine.metrics import EngineMetrics
+from audio_engine.vad import VoiceActivityDetector
+
+
+class VoiceChanger:
+    """
+    Live microphone path: one duplex stream that reads the microphone,
+    applies the optional cleanup stage and the current effect and writes to
+    the output device.
+
+    While the voice activity detector hears nobody, the expensive stages
+    (effect.expensive) are frozen and the block passes around them, which is
+    most of the time. Their state is kept, and the switch between processed
+    and bypassed signal is a crossfade over one block, so it does not click.
+
+    Effect changes go through set_effect(): the new effect is warmed up on the
+    last input, then old and new run side by side for crossfade_blocks blocks
+    while the output fades from one to the other.
+    """
+
+    def __init__(
+        self,
+        samplerate: int = 44100,
+        block_size: int = 256,
+        channels: int = 1,
+        dtype: str = "float32",
+        crossfade_blocks: int = 4,
+        history_ms: float = 250.0,
+    ):
+        """
+        Initializes the VoiceChanger.
+
+        Args:
+            samplerate (int): Stream sample rate.
+            block_size (int): Frames per callback.
+            channels (int): Stream channels, the effect runs on the first one.
+            dtype (str): Sample format of the stream.
+            crossfade_blocks (int): Length of an effect change, in blocks.
+            history_ms (float): Input kept to warm up an incoming effect.
+        """
+        self.samplerate = samplerate
+        self.block_size = block_size
+        self.channels = channels
+        self.dtype = dtype
+
+        # EffectChain (or any object with process(block)), None is passthrough.
+        # pre_effect cleans the microphone (noise suppression) before effect
+        self.pre_effect = None
+        self.effect = None
+        # Last stage, after the effects (e.g. dynamics.Limiter), never bypassed
+        self.output_stage = None
+
+        # None runs every block through the effects
+        self.vad = VoiceActivityDetector(samplerate)
+        # Gain of the signal bypassing pre_effect (its attenuation of noise)
+        self.idle_gain = 1.0
+        self._voice_active = True
+        self._ramps = {}
+
+        self.crossfade_blocks = crossfade_blocks
+        self._pending_effect = None  # (effect, blocks) for the audio thread
+        self._effect_lock = threading.Lock()  # set_effect() callers, not audio
+        self._deferred_effect = None  # Audio thread only, see _install_effect
+        self._history = np.zeros(int(samplerate * history_ms / 1000.0), np.float32)
+        self._history_position = 0
+
+        self.input_meter = LevelMeter(samplerate)
+        self.output_meter = LevelMeter(samplerate)
+        self.metrics = EngineMetrics("voice")
+
+        self.backend = None
+        self.input_device = None
+        self.output_device = None
+        self.stream = None
+        self._closing = False
+        # True while an AudioRouter runs the path on its stream (no own stream)
+        self.routed = False
+
+        # Called (from the audio thread) when the stream dies on its own
+        self.on_stream_lost = None
+
+    @property
+    def active(self):
+        return self.stream is not None or self.routed
+
+    def callback(self, indata, outdata, frames, time_info, status):
+        """Duplex stream callback."""
+        audio = self.process_block(indata[:, 0], status)
+        outdata[:] = audio[:, None]
+
+    def process_block(self, audio, status=None):
+        """
+        Runs one mono block of the microphone through the path and returns
+        the output, from the callback of its own stream or of an AudioRouter.
+        """
+        start = time.perf_counter()
+        frames = len(audio)
+
+        self.input_meter.process(audio)
+        self._remember(audio)
+
+        pending = self._pending_effect
+        if pending is not None:
+            self._pending_effect = None
+        else:
+            pending, self._deferred_effect = self._deferred_effect, None
+        if pending is not None and not self._install_effect(
+            pending[0], pending[1] * frames
+        ):
+            self._deferred_effect = pending
+
+        # None: open (processing), False: closed (bypass), else a fade ramp
+        ramp = None
+        vad = self.vad
+        if vad is not None:
+            voice = vad.process(audio)
+            if voice != self._voice_active:
+                ramp = self._ramp(frames, fade_in=voice)
+                self._voice_active = voice
+            elif not voice:
+                ramp = False
+        else:
+            self._voice_active = True
+
+        audio = self._run_stage(self.pre_effect, audio, ramp, self.idle_gain)
+        audio = self._run_stage(self.effect, audio, ramp, 1.0)
+
+        # Nothing to fade while the gate bypasses both effects
+        effect = self.effect
+        if isinstance(effect, EffectCrossfade) and (effect.done or ramp is False):
+            self.effect = effect.new
+
+        if self.output_stage is not None:
+            audio = self.output_stage.process(audio)
+        self.output_meter.process(audio)
+
+        self.metrics.record(
+            time.perf_counter() - start,
+            frames,
+            self.samplerate,
+            status,
+            bypassed=ramp is False,
+        )
+        return audio
+
+    def _remember(self, audio):
+        """Writes the block into the input history ring."""
+        size = len(self._history)
+        audio = audio[-size:]
+        start = self._history_position
+        first = min(len(audio), size - start)
+        self._history[start : start + first] = audio[:first]
+        self._history[: len(audio) - first] = audio[first:]
+        self._history_position = (start + len(audio)) % size
+
+    def recent_input(self):
+        """Copy of the input history, oldest sample first."""
+        position = self._history_position
+        return np.concatenate((self._history[position:], self._history[:position]))
+
+    def _install_effect(self, effect, length):
+        """
+        Starts the fade to effect (audio thread). An effect must never run
+        twice per block, its state would move on twice: an effect already
+        fading in is left alone, and going back to the one fading out
+        reverses the running fade. An effect still running deeper in nested
+        fades waits until they are done, False is returned then.
+        """
+        current = self.effect
+        if effect is current:
+            return True
+        if isinstance(current, EffectCrossfade):
+            if effect is current.new:
+                return True
+            if effect is current.old:
+                self.effect = current.reversed(length)
+                return True
+            if any(effect is other for other in current.effects()):
+                return False
+        self.effect = EffectCrossfade(current, effect, length)
+        return True
+
+    def set_effect(self, effect, crossfade_blocks=None):
+        """
+        Changes the effect without a click. Called from the UI thread or the
+        control server thread, the calls are serialized.
+
+        The incoming effect is reset and run over the recent input first, so
+        its delay lines and envelopes are already filled with the voice when
+        it becomes audible. Without a running stream the change is immediate.
+        """
+        if crossfade_blocks is None:
+            crossfade_blocks = self.crossfade_blocks
+
+        with self._effect_lock:
+            if not self.active or crossfade_blocks <= 0:
+                self._pending_effect = None
+                self.effect = effect
+                return
+            if effect is self.effect and self._pending_effect is None:
+                return
+
+            # An effect still playing, fading out or about to be installed by
+            # the audio thread must not be touched here. pending is read
+            # first: once the audio thread takes it, it is in self.effect
+            pending = self._pending_effect
+            current = self.effect
+            playing = [current]
+            if isinstance(current, EffectCrossfade):
+                playing += list(current.effects())
+            for queued in (pending, self._deferred_effect):
+                if queued is not None:
+                    playing.append(queued[0])
+            if effect is not None and not any(effect is other for other in playing):
+                # Faded in, or the cut at its start would echo later as a click
+                warmup = self.recent_input()
+                fade = min(len(warmup), self.samplerate // 100)
+                warmup[:fade] *= np.linspace(0.0, 1.0, fade, dtype=np.float32)
+                effect.reset()
+                effect.process(warmup)
+
+            self._pending_effect = (effect, crossfade_blocks)
+
+    def _ramp(self, frames, fade_in):
+        """Linear 0..1 (or 1..0) ramp over one block, cached per block size."""
+        if frames not in self._ramps:
+            self._ramps[frames] = np.linspace(0.0, 1.0, frames, dtype=np.float32)
+        ramp = self._ramps[frames]
+        return ramp if fade_in else ramp[::-1]
+
+    @staticmethod
+    def _run_stage(stage, audio, ramp, bypass_gain):
+        if stage is None:
+            return audio
+        if ramp is None or not getattr(stage, "expensive", False):
+            return stage.process(audio)
+
+        bypassed = audio * bypass_gain if bypass_gain != 1.0 else audio
+        if ramp is False:
+            return bypassed
+
+        processed = stage.process(audio)
+        return bypassed + (processed - bypassed) * ramp
+
+    def _open_stream(self):
+        return self.backend.open_duplex_stream(
+            self.callback,
+            self.samplerate,
+            self.block_size,
+            channels=self.channels,
+            input_device=self.input_device,
+            output_device=self.output_device,
+            dtype=self.dtype,
+            finished_callback=self._on_stream_finished,
+        )
+
+    def _on_stream_finished(self):
+        if self.stream is not None and not self._closing and self.on_stream_lost:
+            self.on_stream_lost()
+
+    def start(self, backend, input_device=None, output_device=None):
+        """Opens and starts the duplex stream."""
+        self.backend = backend
+        self.input_device = input_device
+        self.output_device = output_device
+        self.stream = self._open_stream()
+        self.stream.start()
+        print("Voice changing active...")
+
+    def reopen(self, input_device, output_device):
+        """Moves the stream to other devices, keeping the effect and its state."""
+        self.input_device = input_device
+        self.output_device = output_device
+        if self.stream is None:
+            return
+
+        # A duplex stream can hold the input device exclusively, so the old
+        # stream has to go before the new one can open
+        self._close_stream()
+        self.stream = self._open_stream()
+        self.stream.start()
+
+    def set_block_size(self, block_size: int):
+        """Reopens the stream with another block size, keeping effect state."""
+        self.block_size = block_size
+        if self.stream is not None:
+            self.reopen(self.input_device, self.output_device)
+
+    def _close_stream(self):
+        if self.stream is None:
+            return
+        self._closing = True
+        try:
+            self.stream.stop()
+            self.stream.close()
+        except Exception as e:
+            print(f"Error closing voice changer stream: {e}")
+        finally:
+            self.stream = None
+            self._closing = False
+
+    def stop(self):
+        if self.stream is not None:
+            self._close_stream()
+            print("Voice changer stopped")
@@ -0,0 +1,194 @@
+"""
+Micro-benchmarks of the real-time kernels: every voice_effects processor, the
+playback mixer (steady and with buttons mashed), the output limiter and
+compressor, the routing matrix, the level meter and the whole voice path with
+the voice gate open (voice) and closed (silence), at block sizes from 64 to
+4096.
+
+For each kernel and block size it prints the time per sample and the
+real-time factor (processing time / block duration, 1.0 means the whole
+deadline is used). It exits with status 1 when a kernel takes more than
+--budget of the block deadline, so it can guard changes in CI.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_kernels --budget 0.25
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from audio_engine.clip import Clip
+from audio_engine.dynamics import Compressor, Limiter
+from audio_engine.effects import EffectChain, available_effects, load_effect
+from audio_engine.meters import LevelMeter
+from audio_engine.playback import PlaybackEngine
+from audio_engine.routing import CABLE, CLIPS, MIC_FX, MONITOR, RoutingMatrix
+from audio_engine.voice import VoiceChanger
+
+BLOCK_SIZES = (64, 128, 256, 512, 1024, 2048, 4096)
+
+
+def measure(process, block, min_time: float):
+    """Median seconds per call of process(block), after a warmup call."""
+    process(block)  # numba compiles on the first call
+
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while time.perf_counter() < deadline or len(timings) < 5:
+        start = time.perf_counter()
+        process(block)
+        timings.append(time.perf_counter() - start)
+
+    return float(np.median(timings))
+
+
+def effect_kernels(samplerate: int):
+    for name in available_effects():
+        try:
+            effect = load_effect(name, samplerate)
+        except Exception as e:
+            print(f"skipping {name}: {e}")
+            continue
+        yield name, effect.process
+
+
+def mixer_kernel(samplerate: int, block_size: int, voices: int = 8):
+    engine = PlaybackEngine(samplerate=samplerate, block_size=block_size)
+    noise = np.random.default_rng(0).integers(-8000, 8000, samplerate * 60)
+    clip = Clip(noise.astype(np.int16), samplerate, block_size=block_size)
+    # Looped, so every block size mixes that many voices however long it runs
+    for _ in range(voices):
+        engine.schedule(clip, loop=True)
+
+    return f"mixer ({voices} voices)", lambda block: engine.render(len(block))
+
+
+def mashed_mixer_kernel(samplerate: int, block_size: int, presses: int = 4):
+    """Mixer with presses new voices every block, held at max_voices by stealing."""
+    engine = PlaybackEngine(samplerate=samplerate, block_size=block_size)
+    noise = np.random.default_rng(0).integers(-8000, 8000, samplerate * 60)
+    clip = Clip(noise.astype(np.int16), samplerate, block_size=block_size)
+
+    def process(block):
+        for _ in range(presses):
+            engine.trigger(clip)
+        engine.render(len(block))
+
+    return f"mixer (mashed, {engine.max_voices})", process
+
+
+def dynamics_kernels(samplerate: int):
+    """Output bus limiter and compressor, the signal pushed well over the ceiling."""
+    limiter = Limiter(samplerate)
+    compressor = Compressor(samplerate)
+    return [
+        ("output limiter", lambda block: limiter.process(block * 8.0)),
+        ("output compressor", lambda block: compressor.process(block * 8.0)),
+    ]
+
+
+def routing_kernel(block_size: int):
+    """Routing matrix with its sources filled, as in the router callback."""
+    matrix = RoutingMatrix(block_size=block_size)
+    routes = {(MIC_FX, CABLE): 1.0, (CLIPS, CABLE): 1.0, (CLIPS, MONITOR): 1.0}
+    matrix.set_routes(routes)
+
+    def process(block):
+        inputs = matrix.prepare(len(block))
+        inputs[:] = block
+        matrix.mix()
+
+    return "routing matrix", process
+
+
+def meter_kernel(samplerate: int):
+    return "level meter", LevelMeter(samplerate).process
+
+
+def voice_path_kernels(samplerate: int, block_size: int):
+    """Voice path with pitch shift and noise suppression, idle and speaking."""
+    kernels = []
+    for name, level in (("voice path (idle)", 0.0005), ("voice path (voice)", 0.3)):
+        voice_path = VoiceChanger(samplerate=samplerate, block_size=block_size)
+        if level > 0.01:
+            # A steady tone would become the noise floor, keep the gate open
+            voice_path.vad = None
+        voice_path.pre_effect = EffectChain.from_specs(["noise_cancel"], samplerate)
+        voice_path.effect = EffectChain.from_specs(["pitch_shift"], samplerate)
+
+        phase = 2 * np.pi * 220 * np.arange(block_size) / samplerate
+        indata = (level * np.sin(phase)).astype(np.float32)[:, None]
+        outdata = np.zeros_like(indata)
+
+        def process(block, voice_path=voice_path, indata=indata, outdata=outdata):
+            voice_path.callback(indata, outdata, len(indata), None, None)
+
+        kernels.append((name, process))
+    return kernels
+
+
+def run(samplerate: int, block_sizes, budget: float, min_time: float):
+    rng = np.random.default_rng(0)
+    failures = []
+
+    effects = list(effect_kernels(samplerate))
+
+    print(f"{'kernel':<24}{'block':>7}{'ns/sample':>12}{'RTF':>10}")
+    for block_size in block_sizes:
+        block = (rng.standard_normal(block_size) * 0.1).astype(np.float32)
+        deadline = block_size / samplerate
+
+        kernels = list(effects)
+        kernels.append(mixer_kernel(samplerate, block_size))
+        kernels.append(mashed_mixer_kernel(samplerate, block_size))
+        kernels.extend(dynamics_kernels(samplerate))
+        kernels.append(routing_kernel(block_size))
+        kernels.append(meter_kernel(samplerate))
+        kernels.extend(voice_path_kernels(samplerate, block_size))
+
+        for name, process in kernels:
+            seconds = measure(process, block, min_time)
+            factor = seconds / deadline
+            flag = "  FAIL" if factor > budget else ""
+            print(
+                f"{name:<24}{block_size:>7}{seconds / block_size * 1e9:>12.1f}"
+                f"{factor:>10.4f}{flag}"
+            )
+            if factor > budget:
+                failures.append((name, block_size, factor))
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--samplerate", type=int, default=44100)
+    parser.add_argument(
+        "--block-sizes", type=int, nargs="+", default=list(BLOCK_SIZES)
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=0.25,
+        help="Maximum share of the block deadline a single kernel may use",
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.1, help="Seconds per measurement"
+    )
+    args = parser.parse_args()
+
+    failures = run(args.samplerate, args.block_sizes, args.budget, args.min_time)
+
+    if failures:
+        print(f"\n{len(failures)} kernel(s) over {args.budget:.0%} of the deadline:")
+        for name, block_size, factor in failures:
+            print(f"  {name} at {block_size}: {factor:.1%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
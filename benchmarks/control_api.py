@@ -0,0 +1,113 @@
+"""
+Request latency and throughput benchmark for the local control API.
+
+Runs the PlaybackEngine on the realtime offline backend with a ControlServer
+in front of it, then sends play requests back to back from a client, one at
+a time (round trip latency) and as batches, over the Unix socket and over
+HTTP keep-alive.
+
+Usage (from the repository root):
+    python -m benchmarks.control_api --requests 2000 --batch 8
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import tempfile
+import time
+
+import numpy as np
+
+from audio_engine.backends.offline import OfflineBackend
+from audio_engine.clip import Clip
+from audio_engine.control import ControlServer, EngineControl
+from audio_engine.playback import PlaybackEngine
+
+
+def unix_round_trips(path: str, request, count: int):
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    reader = client.makefile("rb")
+    line = json.dumps(request).encode() + b"\n"
+
+    times = np.empty(count)
+    for i in range(count):
+        start = time.perf_counter()
+        client.sendall(line)
+        reply = reader.readline()
+        times[i] = time.perf_counter() - start
+    client.close()
+    assert json.loads(reply), reply
+    return times
+
+
+def http_round_trips(port: int, request, count: int):
+    client = http.client.HTTPConnection("127.0.0.1", port)
+    body = json.dumps(request)
+
+    times = np.empty(count)
+    for i in range(count):
+        start = time.perf_counter()
+        client.request("POST", "/", body, {"Content-Type": "application/json"})
+        reply = client.getresponse().read()
+        times[i] = time.perf_counter() - start
+    client.close()
+    assert json.loads(reply), reply
+    return times
+
+
+def report(label: str, times, commands: int):
+    ms = times * 1000.0
+    print(
+        f"{label:<22} {len(times) / times.sum():8.0f} req/s "
+        f"{commands * len(times) / times.sum():8.0f} cmd/s  "
+        f"p50 {np.percentile(ms, 50):.3f} ms  p99 {np.percentile(ms, 99):.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--samplerate", type=int, default=44100)
+    parser.add_argument("--block-size", type=int, default=256)
+    args = parser.parse_args()
+
+    engine = PlaybackEngine(samplerate=args.samplerate, block_size=args.block_size)
+    engine.start(
+        OfflineBackend(samplerate=args.samplerate, realtime=True, capture=False)
+    )
+    noise = np.random.default_rng(0).integers(-8000, 8000, args.samplerate // 100)
+    clip = Clip(noise.astype(np.int16), args.samplerate, block_size=args.block_size)
+
+    folder = tempfile.mkdtemp()
+    server = ControlServer(
+        EngineControl(engine, resolve_clip={"noise.wav": clip}.get),
+        socket_path=os.path.join(folder, "control.sock"),
+        http_port=0,
+    )
+    server.start()
+
+    play = {"cmd": "play", "sound": "noise.wav"}
+    batch = [play] * args.batch
+    try:
+        if server.socket_path and hasattr(socket, "AF_UNIX"):
+            path = server.socket_path
+            report("unix play", unix_round_trips(path, play, args.requests), 1)
+            times = unix_round_trips(path, batch, args.requests)
+            report(f"unix batch of {args.batch}", times, args.batch)
+        report("http play", http_round_trips(server.http_port, play, args.requests), 1)
+        times = http_round_trips(server.http_port, batch, args.requests)
+        report(f"http batch of {args.batch}", times, args.batch)
+    finally:
+        server.stop()
+        engine.stop()
+
+    onset = np.array(engine.onset_latencies) * 1000.0
+    print(f"trigger to first sample p50 {np.percentile(onset, 50):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Trigger-to-first-sample latency benchmark for the playback engine.
+
+Runs the PlaybackEngine on the realtime offline backend (callbacks at the
+real block rate, no audio hardware needed), fires clips at random moments
+from a separate thread, like button clicks would, and prints latency
+percentiles. With --hotkeys the triggers go through the global hotkey path
+(HotkeyTrigger.fire, as a key press would) and its own latency record,
+measured from the listener callback: the OS and pynput delay before it is
+not included.
+
+Usage (from the repository root):
+    python -m benchmarks.trigger_latency --triggers 500 --block-size 256
+    python -m benchmarks.trigger_latency --hotkeys
+"""
+
+import argparse
+import random
+import threading
+import time
+
+import numpy as np
+
+from audio_engine.backends.offline import OfflineBackend
+from audio_engine.clip import Clip
+from audio_engine.hotkeys import HotkeyTrigger
+from audio_engine.playback import PlaybackEngine
+
+
+def run(triggers: int, samplerate: int, block_size: int, hotkeys: bool = False):
+    engine = PlaybackEngine(samplerate=samplerate, block_size=block_size)
+    engine.start(OfflineBackend(samplerate=samplerate, realtime=True, capture=False))
+
+    # Short noise burst, so voices keep finishing and the mixer stays busy
+    noise = np.random.default_rng(0).integers(-8000, 8000, samplerate // 10)
+    clip = Clip(noise.astype(np.int16), samplerate, block_size=block_size)
+
+    # Not started, fire() is what the listener thread calls on a key press
+    hotkey = HotkeyTrigger(engine, {"noise": clip}.get, {"<ctrl>+1": "noise"})
+
+    def fire():
+        for _ in range(triggers):
+            time.sleep(random.uniform(0.001, 0.02))
+            if hotkeys:
+                hotkey.fire("<ctrl>+1")
+            else:
+                engine.trigger(clip)
+
+    thread = threading.Thread(target=fire)
+    thread.start()
+    thread.join()
+
+    # Let the last triggers reach a callback
+    time.sleep(4 * block_size / samplerate)
+    engine.stop()
+
+    latencies = hotkey.latencies if hotkeys else engine.onset_latencies
+    return np.array(latencies) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--triggers", type=int, default=500)
+    parser.add_argument("--samplerate", type=int, default=44100)
+    parser.add_argument("--block-size", type=int, default=256)
+    parser.add_argument(
+        "--hotkeys", action="store_true", help="trigger through the hotkey path"
+    )
+    args = parser.parse_args()
+
+    latencies = run(args.triggers, args.samplerate, args.block_size, args.hotkeys)
+    block_ms = 1000.0 * args.block_size / args.samplerate
+
+    print(f"triggers: {len(latencies)}  block: {args.block_size} ({block_ms:.2f} ms)")
+    if args.hotkeys:
+        print("from the listener callback (OS and pynput delay not included)")
+    for percentile in (50, 90, 99):
+        print(f"p{percentile}: {np.percentile(latencies, percentile):.3f} ms")
+    print(f"max: {latencies.max():.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,41 +1,47 @@
+import io
 import os
 import threading
 import time
-import wave
 
 import customtkinter as ctk
 import matplotlib.pyplot as plt
 import numpy as np
-import pyaudio
-import sounddevice as sd
-import soundfile as sf
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from PIL import Image, ImageTk
 
+from sound_library.search import SearchIndex
+from sound_library.watcher import ADDED, DELETED
+from soundboard.config import CHUNK, LIBRARY_POLL_MS, RATE
+from soundboard.engine import SoundboardEngine
 from ColorIDManager import ColorIDManager
 from ListWidget import ListWidget
-from voice_effects.robot_effect import _robot_effect_core_int16
+from MetricsPanel import MetricsPanel
+from StallWatchdog import StallWatchdog
 from VolumeVisualizer import VolumeVisualizer
 
-# print(sd.query_devices())
-VIRTUAL_CABLE_DEVICE_ID = 8  # 6
-MICROPHONE_DEVICE_ID = 1  # 1
-STEREO_MIX = 0
+# The audio settings (devices, backend, hotkeys, control API...) are in
+# soundboard/config.py, shared with the headless mode
 
-CHUNK = 256
-FORMAT = pyaudio.paInt16
-CHANNELS = 1
-RATE = 44100
+# Latencies the user can pin in the settings, instead of the automatic choice
+LATENCY_CHOICES_MS = (3, 6, 12, 24, 47)
+
+# Most buttons the sound panel shows for a search
+SEARCH_RESULT_LIMIT = 200
+
+# The UI counts as stalled when its event loop runs this late
+UI_STALL_THRESHOLD_MS = 100
+# JSON lines file the UI stalls (with their stack) are appended to, None disables it
+UI_STALL_LOG_PATH = None
 
 
 class SoundboardApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, engine):
         super().__init__()
 
-        self.color_id_manager = ColorIDManager()
+        # All the audio runs in the engine (started), the window draws and forwards
+        self.engine = engine
 
-        self.voices_folder = "voice_effects"
-        self.sounds_folder = "sounds"
+        self.color_id_manager = ColorIDManager()
 
         # App configuration
         self.title("Audio Soundboard")
@@ -159,6 +165,17 @@ class SoundboardApp(ctk.CTk):
         )
         self.sound_panel_frame_label.pack(padx=10, pady=10)
 
+        # Filters the panel on every keystroke, Enter plays the best match
+        self.sound_search_entry = ctk.CTkEntry(
+            self.sound_panel_label_frame,
+            placeholder_text="Search sounds",
+            font=("Roboto", 14),
+        )
+        self.sound_search_entry.pack(fill="x", padx=10, pady=(0, 10))
+        self.sound_search_entry.bind("<KeyRelease>", self.update_sound_panel)
+        self.sound_search_entry.bind("<Escape>", self.clear_sound_search)
+        self.sound_search_entry.bind("<Return>", self.play_first_search_result)
+
         self.sound_panel = ListWidget(self.sound_panel_frame, columns=4)
         self.sound_panel.grid(row=1, column=0, sticky="nswe")
 
@@ -176,10 +193,53 @@ class SoundboardApp(ctk.CTk):
         )
         self.sound_panel_settings_button.pack(padx=10, pady=20)
 
-        # Warmup voice_changer (we precompile it with first its call)
+        # Event loop lag of this window, stalls are shown with the audio health
+        self.watchdog = StallWatchdog(
+            self, threshold_ms=UI_STALL_THRESHOLD_MS, log_path=UI_STALL_LOG_PATH
+        )
+
+        # Audio health: status panel under the settings button
+        self.metrics_panel = MetricsPanel(
+            self.settings_frame,
+            metrics=self.engine.metrics,
+            watchdog=self.watchdog,
+            recorder=self.engine.recorder,
+            fg_color="transparent",
+        )
+        self.metrics_panel.pack(fill="x", pady=(0, 10))
+
+        self.latency_menu = ctk.CTkOptionMenu(
+            self.settings_frame,
+            values=["Auto latency"] + [f"{ms} ms" for ms in LATENCY_CHOICES_MS],
+            command=self.set_latency_target,
+            font=("Roboto", 14),
+        )
+        self.latency_menu.pack(fill="x", padx=10, pady=(0, 10))
+
+        # Mic cleanup before the voice effect, off by default
+        self.noise_switch = ctk.CTkSwitch(
+            self.settings_frame,
+            text="Noise suppression",
+            command=self.toggle_noise_suppression,
+            font=("Roboto", 14),
+        )
+        self.noise_switch.pack(fill="x", padx=10, pady=(0, 10))
+
+        # Archive of what goes to the cable, a new file per recording
+        self.record_switch = ctk.CTkSwitch(
+            self.settings_frame,
+            text="Record output",
+            command=self.toggle_recording,
+            font=("Roboto", 14),
+        )
+        self.record_switch.pack(fill="x", padx=10, pady=(0, 10))
+
+        self.update_meters()
 
         self.init_voice_changer_list()
+        self.check_block_size()
         self.init_sound_browser()
+        self.watchdog.start()
 
         # Initialize UI components
         # Not Made yet
@@ -193,104 +253,188 @@ class SoundboardApp(ctk.CTk):
         # # Start audio monitoring for the wave display
         # self.monitoring = False
         # self.start_monitoring()
-        #
-        # # Preload variables, and preload audio
-        # self.audio_cache = {}
-        # self.preload_audio_files()
-
-    # --- Voice changer list setion ---
 
-    def warmup_voice_changers(self):
-        dummy_audio = np.zeros(1024, dtype=np.int16)
-        self.apply_robot_effect(dummy_audio)
+    # --- Meters section ---
 
-    def apply_robot_effect(self, audio):
-        try:
-            return _robot_effect_core_int16(audio)
-        except Exception as e:
-            print(f"Error in robot effect: {e}")
-            return audio
+    def update_meters(self):
+        """Copies the audio thread meter levels to the visualizers"""
+        voice_path = self.engine.voice_path
+        self.real_sound_visualizer.set_volume(voice_path.input_meter.level)
+        self.virtual_sound_visualizer.set_volume(self.engine.cable_level())
+        self.after(50, self.update_meters)
 
-    def init_voice_changer_list(self):
-        self.warmup_voice_changers()
-
-        files = sorted(
-            os.listdir(self.voices_folder),
-            key=lambda x: os.path.getmtime(os.path.join(self.voices_folder, x)),
-        )
-
-        for file in files:
-            if file in ["__pycache__", "__init__.py"]:
-                continue
-
-            if file.endswith(".py"):
-                file = file[:-3]
-            else:
-                print("File should be python code")  # TODO: Tell a user about that
-                # continue
-
-            self.voice_changer_list.add_button(
-                text=file,
-                width=160,
-                height=90,
-                fg_color="#333333",
-                hover_color="#3c3c3c",
-                command=lambda c=file + ".py": self.set_voice_changer(c),
-                identity_indicator_color=self.color_id_manager.set_id_color(),
-            )
+    # --- End of Meters section ---
 
-    # --- End of Voice changer list section ---
+    # --- Block size section ---
 
-    # --- Sound browser section ---
+    def check_block_size(self):
+        self.engine.check_block_size()
+        self.after(1000, self.check_block_size)
 
-    def preload_audio_files(self):
-        if not os.path.exists(self.sounds_folder):
-            return  #  TODO: say message to user about folder not found
+    def set_latency_target(self, choice):
+        if choice == "Auto latency":
+            self.engine.set_latency_target(None)
+        else:
+            self.engine.set_latency_target(float(choice.split()[0]))
 
-        for file in os.listdir(self.sounds_folder):
-            if file.endswith((".wav", ".mp3", ".flac", ".ogg")):
-                file_path = os.path.join(self.sounds_folder, file)
+    # --- End of Block size section ---
 
-                try:
-                    data, samplerate = sf.read(file_path, dtype="int16")
+    # --- Voice changer list setion ---
 
-                    # TODO: Give user a choice to not convert into mono, for better sound
-                    if len(data.shape) > 1:
-                        data = np.mean(data, axis=1).astype(np.int16)
+    def init_voice_changer_list(self):
+        self.voice_changer_buttons = {}  # "robot_effect.py" -> button
+
+        # The effects the engine loaded, oldest file first
+        for file in self.engine.voice_watcher.sorted_names():
+            if file in self.engine.voice_effect_chains:
+                self.add_voice_changer_button(file)
+
+    def add_voice_changer_button(self, file):
+        self.voice_changer_buttons[file] = self.voice_changer_list.add_button(
+            text=file[:-3],
+            width=160,
+            height=90,
+            fg_color="#333333",
+            hover_color="#3c3c3c",
+            command=lambda c=file: self.set_voice_changer(c),
+            identity_indicator_color=self.color_id_manager.set_id_color(),
+        )
+
+    def on_voice_changer_file_changed(self, event, file):
+        """Shows one change of the voice_effects folder, the engine applied it"""
+        if event == DELETED:
+            button = self.voice_changer_buttons.pop(file, None)
+            if button is not None:
+                self.voice_changer_list.remove_button(button)
+        elif file not in self.voice_changer_buttons:
+            # New, or changed and loading now
+            self.add_voice_changer_button(file)
+
+    def toggle_noise_suppression(self):
+        if not self.engine.set_noise_suppression(bool(self.noise_switch.get())):
+            self.noise_switch.deselect()
+
+    def toggle_recording(self):
+        enabled = bool(self.record_switch.get())
+        if self.engine.set_recording(enabled) is None and enabled:
+            self.record_switch.deselect()
 
-                    self.audio_cache[file_path] = {
-                        "data": data,
-                        "samplerate": samplerate,
-                    }
+    # --- End of Voice changer list section ---
 
-                except Exception as e:
-                    print(f"Failed to preload {file}: {e}")
+    # --- Sound browser section ---
 
     def init_sound_browser(self):
-        self.preload_audio_files()
+        # The panel is drawn from the library index, without listing or
+        # decoding anything; the library reconciles it in the background
+        self.sound_names = []  # Panel order
+        self.sound_colors = {}  # file name -> identity indicator color
+        self.sound_thumbnails = {}  # file name -> waveform PNG drawn by the library
+        self.sound_images = {}  # file name -> CTkImage, made on first display
+        self.sound_search = SearchIndex()
+
         self.load_sound_files()
 
+        self.poll_library_changes()
+
     def load_sound_files(self):
-        self.sound_panel.clear_buttons()
-
-        files = sorted(
-            os.listdir(self.sounds_folder),
-            key=lambda x: os.path.getmtime(os.path.join(self.sounds_folder, x)),
-        )
-
-        for file in files:
-            if file.endswith((".wav", ".mp3", ".flac", ".ogg")):
-                file_cut = file[:-3] if not file.endswith(".flac") else file[:-4]
-                self.sound_panel.add_button(
-                    text=file_cut,
-                    width=125,
-                    height=68,
-                    fg_color="#333333",
-                    hover_color="#3c3c3c",
-                    command=lambda file=file: self.play_sound(file),
-                    font_size=15,
-                    identity_indicator_color=self.color_id_manager.set_id_color(),
+        for row in self.engine.sound_library.sounds():
+            self.add_sound(row["name"], row["color"], row.get("tags", ""))
+            self.sound_thumbnails[row["name"]] = row.get("thumbnail")
+        self.update_sound_panel()
+
+    def add_sound(self, file, color=None, tags=""):
+        if color is None:
+            color = self.color_id_manager.set_id_color()
+            self.engine.sound_library.set_color(file, color)
+
+        self.sound_names.append(file)
+        self.sound_colors[file] = color
+        self.sound_search.add(file, tags)
+
+    def remove_sound(self, file):
+        self.sound_names.remove(file)
+        del self.sound_colors[file]
+        self.sound_thumbnails.pop(file, None)
+        self.sound_images.pop(file, None)
+        self.sound_search.remove(file)
+
+    def update_sound_panel(self, event=None):
+        """Shows the sounds matching the search box, re-binding the buttons"""
+        query = self.sound_search_entry.get().strip()
+        if query:
+            files = self.sound_search.search(query, limit=SEARCH_RESULT_LIMIT)
+        else:
+            files = self.sound_names
+
+        self.sound_panel.show_items(
+            files,
+            self.bind_sound_button,
+            width=125,
+            height=68,
+            fg_color="#333333",
+            hover_color="#3c3c3c",
+            font_size=15,
+        )
+
+    def bind_sound_button(self, button, file):
+        button.set_text(os.path.splitext(file)[0])
+        button.set_command(lambda: self.play_sound(file))
+        button.set_identity_indicator_color(self.sound_colors[file])
+        button.set_image(self.sound_image(file))
+
+    def sound_image(self, file):
+        """The waveform of a sound, only decoded from PNG (drawn at index time)"""
+        if file not in self.sound_images:
+            image = None
+            thumbnail = self.sound_thumbnails.get(file)
+            if thumbnail:
+                picture = Image.open(io.BytesIO(thumbnail))
+                image = ctk.CTkImage(
+                    light_image=picture, dark_image=picture, size=picture.size
                 )
+            self.sound_images[file] = image
+        return self.sound_images[file]
+
+    def clear_sound_search(self, event=None):
+        self.sound_search_entry.delete(0, "end")
+        self.update_sound_panel()
+
+    def play_first_search_result(self, event=None):
+        query = self.sound_search_entry.get().strip()
+        files = self.sound_search.search(query, limit=1)
+        if query and files:
+            self.play_sound(files[0])
+
+    def on_sound_file_changed(self, event, file):
+        """Applies one change of the sounds folder to the panel"""
+        if event == DELETED:
+            if file not in self.sound_colors:
+                return
+            self.remove_sound(file)
+        elif file not in self.sound_colors:
+            self.add_sound(file)
+            self.sound_thumbnails[file] = self.engine.sound_library.thumbnail(file)
+        else:
+            if event == ADDED:
+                # Drawn from the folder listing before the index knew it
+                self.engine.sound_library.set_color(file, self.sound_colors[file])
+
+            # New waveform, only the button showing the file is re-bound
+            self.sound_thumbnails[file] = self.engine.sound_library.thumbnail(file)
+            self.sound_images.pop(file, None)
+            self.sound_panel.rebind(file, self.bind_sound_button)
+            return
+
+        self.update_sound_panel()
+
+    def poll_library_changes(self):
+        sound_updates, voice_updates = self.engine.poll()
+        for event, file in sound_updates:
+            self.on_sound_file_changed(event, file)
+        for event, file in voice_updates:
+            self.on_voice_changer_file_changed(event, file)
+
+        self.after(LIBRARY_POLL_MS, self.poll_library_changes)
 
         # Add a refresh button
         # refresh_btn = ctk.CTkButton(
@@ -305,9 +449,8 @@ class SoundboardApp(ctk.CTk):
     # --- End of Sound browser section ---
 
     def refresh_sounds(self):
-        """Refresh sound list and preload new files"""
-        self.load_sound_files()
-        self.preload_audio_files()
+        """Looks for changes the watcher missed, they apply at the next poll"""
+        self.engine.refresh_sounds()
 
     def init_voice_changers(self):
         # Label
@@ -357,9 +500,7 @@ class SoundboardApp(ctk.CTk):
         self.vc_toggle_btn.pack(side="left")
 
         # Voice changer state
-        self.voice_changer_active = False
-        self.current_voice_changer = "Normal"
-        self.voice_changer_thread = None
+        self.engine.current_voice_changer = "Normal"
 
     def init_info_panel(self):
         self.voice_changer_panel = ctk.CTkFrame(
@@ -379,12 +520,12 @@ class SoundboardApp(ctk.CTk):
         self.name_label.grid(row=0, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
 
         self.active_label = ctk.CTkLabel(
-            self.voice_changer_panel, text=f"Active: {self.voice_changer_active}"
+            self.voice_changer_panel, text=f"Active: {self.engine.voice_path.active}"
         )
         self.active_label.grid(row=1, column=0, padx=5, pady=5, sticky="w")
 
         self.mode_label = ctk.CTkLabel(
-            self.voice_changer_panel, text=f"Mode: {self.current_voice_changer}"
+            self.voice_changer_panel, text=f"Mode: {self.engine.current_voice_changer}"
         )
         self.mode_label.grid(row=2, column=0, padx=5, pady=5, sticky="w")
 
@@ -411,42 +552,38 @@ class SoundboardApp(ctk.CTk):
         self.figure.tight_layout()
 
     def update_wave_display(self):
-        try:
-            device_virtual = 2  # Change to function to find
-            device_microphone = 1
-
-            p = pyaudio.PyAudio()
-            # Open stream for first device
-            stream1 = p.open(
-                format=FORMAT,
-                channels=1,
-                rate=RATE,
-                input=True,
-                input_device_index=device_virtual,
-                frames_per_buffer=CHUNK,
-            )
+        latest = {}
+        streams = []
 
-            # Open stream for second device
-            stream2 = p.open(
-                format=FORMAT,
-                channels=1,
-                rate=RATE,
-                input=True,
-                input_device_index=device_microphone,
-                frames_per_buffer=CHUNK,
-            )
+        def make_callback(key):
+            def callback(indata, frames, time_info, status):
+                latest[key] = indata[:, 0].copy()
+
+            return callback
+
+        try:
+            # Capture side of the virtual cable and the microphone
+            for key, role in (
+                ("virtual", "virtual_cable_monitor"),
+                ("microphone", "microphone"),
+            ):
+                stream = self.engine.audio_backend.open_input_stream(
+                    make_callback(key),
+                    RATE,
+                    CHUNK,
+                    channels=1,
+                    device=self.engine.device_manager.resolve(role),
+                    dtype="int16",
+                )
+                stream.start()
+                streams.append(stream)
 
             while self.monitoring:
                 try:
-                    # Read and update data for first device
-                    data1 = stream1.read(CHUNK, exception_on_overflow=False)
-                    audio_data1 = np.frombuffer(data1, dtype=np.int16)
-                    self.line1.set_ydata(audio_data1)
-
-                    # Read and update data for second device
-                    data2 = stream2.read(CHUNK, exception_on_overflow=False)
-                    audio_data2 = np.frombuffer(data2, dtype=np.int16)
-                    self.line2.set_ydata(audio_data2)
+                    if "virtual" in latest:
+                        self.line1.set_ydata(latest["virtual"])
+                    if "microphone" in latest:
+                        self.line2.set_ydata(latest["microphone"])
 
                     # Update both plots at once
                     self.canvas.draw_idle()
@@ -460,14 +597,9 @@ class SoundboardApp(ctk.CTk):
             print(f"Error setting up audio streams: {e}")
         finally:
             # Clean up resources
-            if "stream1" in locals() and stream1 is not None:
-                stream1.stop_stream()
-                stream1.close()
-            if "stream2" in locals() and stream2 is not None:
-                stream2.stop_stream()
-                stream2.close()
-            if "p" in locals() and p is not None:
-                p.terminate()
+            for stream in streams:
+                stream.stop()
+                stream.close()
 
     def start_monitoring(self):
         if not self.monitoring:
@@ -481,176 +613,55 @@ class SoundboardApp(ctk.CTk):
         if hasattr(self, "monitor_thread") and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=1.0)
 
-    def play_sound(self, file_path):
-        # ChGeck if audio is preloaded
-        if file_path not in self.audio_cache:
-            thread = threading.Thread(target=self.play_audio_fallback, args=(file_path))
-            thread.daemon = True
-            thread.start()
-            return
-
-        audio_info = self.audio_cache[file_path]
-
-        thread = threading.Thread(
-            target=self.play_audio_optimized,
-            args=(audio_info["data"], audio_info["samplerate"]),
-        )
-        thread.daemon = True
-        thread.start()
-
-    def play_audio_optimized(self, audio_data, samplerate):
-        try:
-            sd.play(
-                audio_data,
-                samplerate=samplerate,
-                device=VIRTUAL_CABLE_DEVICE_ID,
-                blocksize=256,
-                latency="low",  # Request low latency mode
-            )
-
-        except Exception as e:
-            print(f"Error playing optimized audio: {e}")
-
-    def play_audio_fallback(self, file_path):
-        """Fallback method for playing non-preloaded audio"""
-        try:
-            data, samplerate = sf.read(file_path, dtype="int16")
-
-            # Convert to mono if stereo
-            # TODO: give user a choice
-            if len(data.shape) > 1:
-                data = np.mean(data, axis=1).astype(np.int16)
-
-            self.play_audio_optimized(data, samplerate)
-
-        except Exception as e:
-            print(f"Error in fallback audio playback: {e}")
+    def play_sound(self, file):
+        self.engine.play(file)
 
     def uncheck_all_other_modes(self):
         for button in self.changer_list:
             button.configure(fg_color="#4D5BCE")
 
     def set_voice_changer(self, changer_type):
-        self.current_voice_changer = changer_type
-        self.mode_label.configure(text=f"Mode: {self.current_voice_changer}")
-        self.uncheck_all_other_modes()
-        self.changer_list[self.changers_label.index(changer_type)].configure(
-            fg_color="#4CAF50"
-        )
-        print(f"Voice changer set to: {changer_type}")
+        self.engine.set_voice_effect(changer_type)
 
     def toggle_voice_changer(self):
-        if self.voice_changer_active:
+        if self.engine.voice_path.active:
             # Stop voice changer
-            self.voice_changer_active = False
+            self.engine.stop_voice_changer()
             self.vc_toggle_btn.configure(text="Start Voice Changer", fg_color="#4CAF50")
-            self.active_label.configure(text=f"Active: {self.voice_changer_active}")
         else:
             # Start voice changer
-            self.voice_changer_active = True
+            self.engine.start_voice_changer()
             self.vc_toggle_btn.configure(text="Stop Voice Changer", fg_color="#F44336")
-            self.active_label.configure(text=f"Active: {self.voice_changer_active}")
-
-            # Start voice changer in a thread
-            if (
-                self.voice_changer_thread is None
-                or not self.voice_changer_thread.is_alive()
-            ):
-                self.voice_changer_thread = threading.Thread(target=self.voice_changer)
-                self.voice_changer_thread.daemon = True
-                self.voice_changer_thread.start()
-
-    # Your existing functions with modifications
-    def voice_changer(self):
-        p = pyaudio.PyAudio()
 
-        input_device = MICROPHONE_DEVICE_ID
-        output_device = VIRTUAL_CABLE_DEVICE_ID
-
-        stream_in = p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            input=True,
-            input_device_index=input_device,
-            frames_per_buffer=CHUNK,
-        )
-
-        stream_out = p.open(
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RATE,
-            output=True,
-            output_device_index=output_device,
-            frames_per_buffer=CHUNK,
-        )
-
-        print("Voice changing active...")
-
-        try:
-            while self.voice_changer_active:
-                data = stream_in.read(CHUNK, exception_on_overflow=False)
-                audio = np.frombuffer(data, dtype=np.int16)
-
-                # Apply effect based on selected voice changer
-                if self.current_voice_changer == "Normal":
-                    modified_audio = audio
-                elif self.current_voice_changer == "High Pitch":
-                    modified_audio = self.granular_pitch_shift(audio, shift_factor=1.5)
-                elif self.current_voice_changer == "Low Pitch":
-                    modified_audio = self.granular_pitch_shift(audio, shift_factor=0.7)
-                elif self.current_voice_changer == "Robot":
-                    modified_audio = self.apply_robot_effect(audio)
-                elif self.current_voice_changer == "Echo":
-                    modified_audio = self.apply_echo_effect(audio)
-                else:
-                    modified_audio = audio
-
-                # Convert back to bytes and output
-                stream_out.write(modified_audio.tobytes())
-        except Exception as e:
-            print(f"Error in voice changer: {e}")
-        finally:
-            stream_in.stop_stream()
-            stream_out.stop_stream()
-            stream_in.close()
-            stream_out.close()
-            p.terminate()
-            print("Voice changer stopped")
-
-    # TODO: Delete it, since better methods used
-    def play_audio(self, file_path, virtual_device):
-        try:
-            # Read audio file
-            with wave.open(file_path, "rb") as wf:
-                data = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int32)
-                samplerate = wf.getframerate()
-
-            # Play through virtual cable
-            sd.play(data, samplerate=samplerate, device=virtual_device)
-            sd.wait()
-        except Exception as e:
-            print(f"Error playing audio {file_path}: {e}")
+        self.active_label.configure(text=f"Active: {self.engine.voice_path.active}")
 
     def on_closing(self):
+        self.watchdog.stop()
         self.stop_monitoring()
-        self.voice_changer_active = False
+        self.engine.stop()
 
         # Wait for threads to finish
         time.sleep(0.5)
         self.destroy()
 
 
-# Launch the app
-if __name__ == "__main__":
+def run_app():
     ctk.set_appearance_mode("dark")  # Set the appearance mode
     ctk.set_default_color_theme("blue")  # Set the color theme
 
-    app = SoundboardApp()
+    engine = SoundboardEngine()
+    engine.start()
+
+    app = SoundboardApp(engine)
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
 
 
+# Launch the app (python -m soundboard --headless runs it without the window)
+if __name__ == "__main__":
+    run_app()
+
+
 """
 def voice_changer():
     p = pyaudio.PyAudio()
@@ -0,0 +1,4 @@
+"""
+Sound library: what is known about the files in the sounds folder (analysis,
+indexes), computed off the audio thread and cached on disk
+"""
@@ -0,0 +1,160 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from audio_engine.analysis import analyze_file
+
+INDEX_FILE_NAME = ".soundboard_analysis.json"
+
+# Bump when analyze_file changes, so old entries get recomputed
+ANALYSIS_VERSION = 1
+
+
+class AnalysisIndex:
+    """
+    Sidecar file in the sounds folder with the analysis of every clip
+    (loudness, true peak, duration, silence at both ends).
+
+    An entry is valid as long as the file keeps its size and modification
+    time, so a library scan only analyzes new and changed files, in parallel.
+    The normalization gain is derived from the entry when a clip is loaded and
+    baked into the clip, playback does no per-sample analysis.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        target_lufs: float = -16.0,
+        peak_ceiling_db: float = -1.0,
+        max_gain_db: float = 12.0,
+    ):
+        """
+        Initializes the AnalysisIndex.
+
+        Args:
+            folder (str): Sounds folder, the index file is written into it.
+            target_lufs (float): Loudness every clip is brought to, None
+                disables normalization.
+            peak_ceiling_db (float): The gain never pushes the true peak over
+                this level.
+            max_gain_db (float): Largest boost or cut applied to a clip.
+        """
+        self.folder = folder
+        self.path = os.path.join(folder, INDEX_FILE_NAME)
+        self.target_lufs = target_lufs
+        self.peak_ceiling_db = peak_ceiling_db
+        self.max_gain_db = max_gain_db
+
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path) as file:
+                index = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable analysis index {self.path}: {e}")
+            return
+
+        if index.get("version") == ANALYSIS_VERSION:
+            self.entries = index.get("files", {})
+
+    def save(self):
+        # Written next to the index and renamed, a crash never leaves half a file
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump({"version": ANALYSIS_VERSION, "files": self.entries}, file)
+        os.replace(temporary, self.path)
+
+    def _signature(self, file_name: str):
+        stat = os.stat(os.path.join(self.folder, file_name))
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def get(self, file_name: str):
+        """The analysis of a file, None if missing or out of date."""
+        entry = self.entries.get(file_name)
+        if entry is None:
+            return None
+        try:
+            if entry["signature"] != self._signature(file_name):
+                return None
+        except OSError:
+            return None
+        return entry
+
+    def scan(self, file_names, jobs=None, prune=True):
+        """
+        Analyzes the files that have no valid entry and drops the entries of
+        files that are gone, then saves the index if anything changed.
+
+        Args:
+            file_names (iterable): Sound file names in the folder.
+            jobs (int): Worker processes, 1 analyzes in this process.
+            prune (bool): file_names is the whole folder, other entries are
+                removed. False to only (re)analyze the given files.
+
+        Returns:
+            int: Number of files analyzed.
+        """
+        file_names = list(file_names)
+        stale = [name for name in file_names if self.get(name) is None]
+        removed = set(self.entries) - set(file_names) if prune else set()
+
+        for name in removed:
+            del self.entries[name]
+
+        if stale:
+            paths = [os.path.join(self.folder, name) for name in stale]
+            if jobs == 1 or len(stale) == 1:
+                results = map(_analyze, paths)
+                self._store(stale, results)
+            else:
+                with ProcessPoolExecutor(max_workers=jobs) as executor:
+                    self._store(stale, executor.map(_analyze, paths))
+
+        if stale or removed:
+            try:
+                self.save()
+            except OSError as e:
+                print(f"Error writing analysis index {self.path}: {e}")
+
+        return len(stale)
+
+    def _store(self, names, results):
+        for name, analysis in zip(names, results):
+            if analysis is None:
+                continue
+            try:
+                analysis["signature"] = self._signature(name)
+            except OSError:
+                continue
+            self.entries[name] = analysis
+
+    def gain(self, file_name: str):
+        """
+        Linear gain that brings the file to target_lufs without its true peak
+        going over peak_ceiling_db. 1.0 for unknown or silent files.
+        """
+        if self.target_lufs is None:
+            return 1.0
+
+        entry = self.get(file_name)
+        if entry is None or entry["loudness"] is None:
+            return 1.0
+
+        gain_db = self.target_lufs - entry["loudness"]
+        if entry["true_peak"] is not None:
+            gain_db = min(gain_db, self.peak_ceiling_db - entry["true_peak"])
+        gain_db = max(-self.max_gain_db, min(self.max_gain_db, gain_db))
+        return 10 ** (gain_db / 20.0)
+
+
+def _analyze(file_path: str):
+    # Runs in the worker processes, a broken file must not stop the scan
+    try:
+        return analyze_file(file_path)
+    except Exception as e:
+        print(f"Failed to analyze {file_path}: {e}")
+        return None
@@ -0,0 +1,263 @@
+import os
+import queue
+import sqlite3
+import threading
+
+from audio_engine.analysis import peak_levels
+from audio_engine.clip import load_clip
+from sound_library.analysis_index import AnalysisIndex
+from sound_library.library_index import INDEX_FILE_NAME, LibraryIndex
+from sound_library.peaks import peaks_path, read_peaks, render_thumbnail, write_peaks
+from sound_library.watcher import ADDED, DELETED, MODIFIED, FolderWatcher
+
+SOUND_EXTENSIONS = (".wav", ".mp3", ".flac", ".ogg")
+
+
+class SoundLibrary:
+    """
+    The sounds folder as the app sees it: decoded clips ready to trigger,
+    their analysis, and the persistent index the sound panel is drawn from.
+
+    Everything slow (analysis, decoding, thumbnails, index writes) happens on
+    one loader thread. At start it reconciles the index with the folder, then
+    it applies the watcher events one file at a time. The UI gets the result
+    as (ADDED | MODIFIED | DELETED, name) updates from poll(), after the clip
+    is already in the cache.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        samplerate: int = 44100,
+        block_size: int = 256,
+        target_lufs: float = -16.0,
+        trim_db: float = -50.0,
+        options: dict = None,
+    ):
+        """
+        Initializes the SoundLibrary.
+
+        Args:
+            folder (str): The sounds folder.
+            samplerate (int): Engine sample rate the clips are decoded to.
+            block_size (int): Size of the primed first block of the clips.
+            target_lufs (float): Normalization loudness, None plays raw.
+            trim_db (float): Silence trimming threshold, None keeps silence.
+            options (dict): Sound name -> playback options of its clip, like
+                {"polyphony": 1, "choke_group": "horns"}.
+        """
+        self.folder = folder
+        self.samplerate = samplerate
+        self.block_size = block_size
+        self.trim_db = trim_db
+        self.options = dict(options or {})
+
+        self.cache = {}  # file path -> Clip
+        self.updates = queue.Queue()
+        self._jobs = queue.Queue()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._can_draw = True  # False once PIL turned out missing
+
+        self.watcher = FolderWatcher(
+            folder, accept=lambda name: name.endswith(SOUND_EXTENSIONS)
+        )
+        self.analysis = AnalysisIndex(folder, target_lufs=target_lufs)
+
+        # Without a readable index the panel is built from the folder listing
+        try:
+            self.index = LibraryIndex(os.path.join(folder, INDEX_FILE_NAME))
+        except sqlite3.Error as e:
+            print(f"Library index unavailable, starting without it: {e}")
+            self.index = None
+
+    def path(self, name: str):
+        return os.path.join(self.folder, name)
+
+    def sounds(self):
+        """
+        Rows of the sound panel as known at the last run (name, color,
+        duration...), or the folder listing when there is no index yet.
+        """
+        if self.index is not None:
+            rows = self.index.sounds()
+            if rows:
+                return rows
+        names = self.watcher.sorted_names()
+        return [{"name": name, "color": None} for name in names]
+
+    def set_color(self, name: str, color: str):
+        if self.index is not None:
+            self.index.set_color(name, color)
+
+    def load(self, name: str):
+        """Decodes one sound into the cache (any thread) and returns the clip."""
+        entry = self.watcher.entries.get(name)
+        try:
+            clip = load_clip(
+                self.path(name),
+                self.samplerate,
+                self.block_size,
+                gain=self.analysis.gain(name),
+                trim_db=self.trim_db,
+            )
+        except Exception as e:
+            print(f"Failed to load {name}: {e}")
+            if entry is not None:
+                entry.status = "failed"
+            return None
+
+        for option, value in self.options.get(name, {}).items():
+            setattr(clip, option, value)
+
+        self.cache[self.path(name)] = clip
+        if entry is not None:
+            entry.status = "loaded"
+        return clip
+
+    def peaks(self, name: str, stamp=None):
+        """
+        Min/max peak levels of a sound (see peak_levels) from its peak file,
+        None if missing, or stale for stamp (see _peaks_stamp).
+        """
+        try:
+            return read_peaks(peaks_path(self.folder, name), stamp)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _peaks_stamp(self, entry, clip):
+        """What the peaks of a clip depend on: the file and its trimming."""
+        return (entry.mtime, entry.size, clip.samplerate, clip.start, clip.end)
+
+    def thumbnail(self, name: str):
+        """PNG bytes of the waveform drawn at index time, None if unknown."""
+        if self.index is None:
+            return None
+        row = self.index.get(name)
+        return row["thumbnail"] if row else None
+
+    def _store(self, name: str, clip):
+        """
+        Writes the peak file of a sound and its file data, duration and
+        pre-drawn waveform to the index (loader thread).
+        """
+        entry = self.watcher.entries.get(name)
+        if self.index is None or entry is None:
+            return
+
+        duration = thumbnail = None
+        if clip is not None:
+            duration = len(clip.source) / clip.samplerate
+            # What plays: trimmed. Read back when the file did not change
+            stamp = self._peaks_stamp(entry, clip)
+            levels = self.peaks(name, stamp)
+            if levels is None:
+                levels = peak_levels(clip.data)
+                try:
+                    write_peaks(peaks_path(self.folder, name), levels, stamp)
+                except Exception as e:
+                    print(f"Error writing the peaks of {name}: {e}")
+            try:
+                # At its normalization gain, which may change without the file
+                thumbnail = render_thumbnail(levels, gain=clip.gain)
+            except ImportError:
+                self._can_draw = False  # No PIL, the buttons go without waveform
+            except Exception as e:
+                print(f"Error drawing the waveform of {name}: {e}")
+
+        try:
+            self.index.update(name, entry.mtime, entry.size, duration, thumbnail)
+        except sqlite3.Error as e:
+            print(f"Error writing library index: {e}")
+
+    # --- Loader thread ---
+
+    def reconcile(self):
+        """Brings cache and index in line with the folder, O(library)."""
+        names = self.watcher.sorted_names()
+        rows = {}
+        if self.index is not None:
+            rows = {row["name"]: row for row in self.index.sounds()}
+
+        for name in rows.keys() - set(names):
+            self._forget(name)
+            self.updates.put((DELETED, name))
+
+        # Only new or changed files are analyzed, in parallel
+        self.analysis.scan(names)
+
+        for name in names:
+            if self._stopping.is_set():
+                return
+            clip = self.load(name)
+
+            row = rows.get(name)
+            entry = self.watcher.entries.get(name)
+            if row is not None and entry is not None:
+                unchanged = (row["mtime"], row["size"]) == (entry.mtime, entry.size)
+                # A missing waveform is drawn again, from the peak file
+                drawn = row["thumbnail"] or clip is None or not self._can_draw
+                if unchanged and drawn:
+                    continue  # Panel and index already right
+
+            self._store(name, clip)
+            self.updates.put((ADDED if row is None else MODIFIED, name))
+
+    def _forget(self, name: str):
+        self.cache.pop(self.path(name), None)
+        if self.index is not None:
+            self.index.remove(name)
+        try:
+            os.remove(peaks_path(self.folder, name))
+        except OSError:
+            pass
+
+    def _apply(self, event: str, name: str):
+        if event == DELETED:
+            self._forget(name)
+        else:
+            self.analysis.scan([name], prune=False)
+            self._store(name, self.load(name))
+        self.updates.put((event, name))
+
+    def _run(self):
+        self.reconcile()
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            self._apply(*job)
+
+    def start(self):
+        self._stopping.clear()
+        self.watcher.start()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self.watcher.stop()
+        self._jobs.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            if self._thread.is_alive():
+                return  # Still decoding one file, the index stays open
+            self._thread = None
+        if self.index is not None:
+            self.index.close()
+
+    def poll(self):
+        """
+        Hands the watcher events to the loader thread and returns the updates
+        that are ready for the UI. Called from the UI timer.
+        """
+        for event in self.watcher.poll():
+            self._jobs.put(event)
+
+        updates = []
+        while True:
+            try:
+                updates.append(self.updates.get_nowait())
+            except queue.Empty:
+                return updates
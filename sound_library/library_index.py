@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+
+INDEX_FILE_NAME = ".soundboard_library.sqlite"
+
+# Bump with every schema change, an older index is rebuilt from scratch
+# (version 1 stored raw peak bytes as thumbnail, it is migrated instead)
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE sounds (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    color TEXT,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    duration REAL,
+    thumbnail BLOB,
+    tags TEXT NOT NULL DEFAULT ''
+)
+"""
+
+COLUMNS = (
+    "name",
+    "position",
+    "color",
+    "mtime",
+    "size",
+    "duration",
+    "thumbnail",
+    "tags",
+)
+
+
+class LibraryIndex:
+    """
+    On-disk index of the sound panel: one row per sound with its file
+    metadata, duration, waveform thumbnail (PNG), button colour and position.
+
+    The panel is drawn from this index at startup, before any file is listed
+    or decoded; the library then reconciles it with the folder in the
+    background. One connection is shared by the UI and the loader thread,
+    behind a lock.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the LibraryIndex.
+
+        Args:
+            path (str): SQLite file, created when missing.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+
+        with self._lock, self._connection:
+            version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+            if version == 1:
+                # Keeps colours and order, the loader redraws every thumbnail
+                self._connection.execute(
+                    "UPDATE sounds SET thumbnail = NULL, size = -1"
+                )
+                self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            elif version != SCHEMA_VERSION:
+                self._connection.execute("DROP TABLE IF EXISTS sounds")
+                self._connection.execute(SCHEMA)
+                self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def sounds(self):
+        """Every row as a dict, in panel order."""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM sounds ORDER BY position"
+            ).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows]
+
+    def get(self, name: str):
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM sounds WHERE name = ?", (name,)
+            ).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def update(self, name: str, mtime: float, size: int, duration, thumbnail):
+        """
+        Stores the file data of a sound. A new sound goes to the end of the
+        panel, an existing one keeps its position, colour and tags.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                INSERT INTO sounds (name, position, mtime, size, duration, thumbnail)
+                VALUES (?, (SELECT COALESCE(MAX(position), -1) + 1 FROM sounds),
+                        ?, ?, ?, ?)
+                ON CONFLICT (name) DO UPDATE SET
+                    mtime = excluded.mtime,
+                    size = excluded.size,
+                    duration = excluded.duration,
+                    thumbnail = excluded.thumbnail
+                """,
+                (name, mtime, size, duration, thumbnail),
+            )
+
+    def set_color(self, name: str, color: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE sounds SET color = ? WHERE name = ?", (color, name)
+            )
+
+    def remove(self, name: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM sounds WHERE name = ?", (name,))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,82 @@
+import io
+import os
+
+import numpy as np
+
+PEAKS_FOLDER = ".peaks"
+
+# Size of the waveform drawn on the sound buttons
+THUMBNAIL_SIZE = (100, 22)
+THUMBNAIL_COLOR = (162, 162, 162, 255)
+
+
+def peaks_path(folder: str, name: str):
+    return os.path.join(folder, PEAKS_FOLDER, name + ".npz")
+
+
+def write_peaks(path: str, levels, stamp=()):
+    """
+    Saves peak_levels() output, e.g. next to the sounds in .peaks/, with a
+    stamp of what it was computed from (file mtime, size...), see read_peaks.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    arrays = {"stamp": np.asarray(stamp, dtype=np.float64)}
+    for size, (mins, maxs) in levels.items():
+        arrays[f"min_{size}"] = mins
+        arrays[f"max_{size}"] = maxs
+
+    # Written next to the target and renamed, readers never see half a file
+    temporary = path + ".tmp.npz"
+    np.savez(temporary, **arrays)
+    os.replace(temporary, path)
+
+
+def read_peaks(path: str, stamp=None):
+    """
+    Loads a peak file back into {samples per peak: (mins, maxs)}. With a
+    stamp, None when the file was written for another stamp (stale).
+    """
+    with np.load(path) as file:
+        if stamp is not None:
+            stored = file["stamp"] if "stamp" in file.files else None
+            if stored is None or not np.array_equal(stored, stamp):
+                return None
+        sizes = sorted(int(key[4:]) for key in file.files if key.startswith("min_"))
+        return {size: (file[f"min_{size}"], file[f"max_{size}"]) for size in sizes}
+
+
+def render_thumbnail(levels, gain=1.0, size=THUMBNAIL_SIZE, color=THUMBNAIL_COLOR):
+    """
+    Draws the waveform as a transparent PNG (bytes) of size (width, height),
+    as loud as it plays (gain).
+
+    Uses the coarsest level that still has a peak per column, reduced to
+    exactly width columns, and fills every column between its min and max
+    with one broadcast comparison, no per-pixel drawing.
+    """
+    from PIL import Image
+
+    width, height = size
+    usable = [key for key in sorted(levels) if len(levels[key][0]) >= width]
+    mins, maxs = levels[usable[-1] if usable else min(levels)]
+
+    image = np.zeros((height, width, 4), dtype=np.uint8)
+    if len(mins):
+        columns = np.linspace(0, len(mins), width, endpoint=False)
+        starts = np.unique(columns.astype(int))
+        scale = gain
+        if mins.dtype.kind == "i":
+            scale /= float(np.iinfo(mins.dtype).max)
+        low = np.minimum.reduceat(mins, starts) * scale
+        high = np.maximum.reduceat(maxs, starts) * scale
+
+        # Sample value +1..-1 to row 0..height-1
+        top = np.round((1.0 - np.clip(high, -1, 1)) * (height - 1) / 2.0)
+        bottom = np.round((1.0 - np.clip(low, -1, 1)) * (height - 1) / 2.0)
+        rows = np.arange(height)[:, None]
+        mask = (rows >= top[None, :]) & (rows <= bottom[None, :])
+        image[:, : len(starts)][mask] = color
+
+    output = io.BytesIO()
+    Image.fromarray(image, "RGBA").save(output, format="PNG")
+    return output.getvalue()
@@ -0,0 +1,115 @@
+import re
+
+import numpy as np
+
+# Share of the query trigrams a name has to contain, so one typo still matches
+MIN_MATCH_RATIO = 0.7
+
+WORD_SPLIT = re.compile(r"[\W_]+")
+
+
+def trigrams(text: str, prefix: bool = False):
+    """
+    Trigrams of the words of text, each word padded with two spaces in front
+    (so "ai" matches names with a word starting with "ai") and, unless prefix,
+    one space behind (so whole words score higher).
+    """
+    grams = set()
+    for word in WORD_SPLIT.split(text.lower()):
+        if not word:
+            continue
+        padded = "  " + word + ("" if prefix else " ")
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """
+    In-memory trigram index over sound names and tags.
+
+    Every trigram maps to the ids of the items containing it. A query scores
+    all items at once with one bincount over the posting arrays of its
+    trigrams, so a keystroke costs a few numpy calls whatever the library
+    size. Items are ranked by score, then by the order they were added in.
+    """
+
+    def __init__(self):
+        self._names = []  # id -> name, None once removed
+        self._grams = []  # id -> its trigrams, None once removed
+        self._ids = {}  # name -> id
+        self._postings = {}  # trigram -> list of ids
+        self._arrays = {}  # trigram -> np.ndarray of the ids, built on demand
+        self._alive = np.zeros(0, dtype=bool)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add(self, name: str, tags: str = ""):
+        """Indexes name (and its tags); adding it again re-indexes it."""
+        if name in self._ids:
+            self.remove(name)
+
+        item = len(self._names)
+        grams = trigrams(f"{name} {tags}")
+        self._names.append(name)
+        self._grams.append(grams)
+        self._ids[name] = item
+        if item >= len(self._alive):
+            alive = np.zeros(max(64, 2 * len(self._alive)), dtype=bool)
+            alive[: len(self._alive)] = self._alive
+            self._alive = alive
+        self._alive[item] = True
+
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(item)
+            self._arrays.pop(gram, None)
+
+    def remove(self, name: str):
+        item = self._ids.pop(name, None)
+        if item is None:
+            return
+        self._alive[item] = False
+        self._names[item] = None
+
+        # Its ids go from the postings, trigrams nothing contains anymore too
+        for gram in self._grams[item]:
+            postings = self._postings[gram]
+            postings.remove(item)
+            if not postings:
+                del self._postings[gram]
+            self._arrays.pop(gram, None)
+        self._grams[item] = None
+
+    def search(self, query: str, limit: int = None):
+        """Names matching query, best first. Empty query: every name in order."""
+        grams = trigrams(query, prefix=True)
+        if not grams:
+            names = [name for name in self._names if name is not None]
+            return names[:limit] if limit else names
+
+        postings = [self._array(gram) for gram in grams]
+        postings = [array for array in postings if len(array)]
+        if not postings:
+            return []
+
+        scores = np.bincount(np.concatenate(postings), minlength=len(self._names))
+        needed = max(1, int(np.ceil(MIN_MATCH_RATIO * len(grams))))
+        matches = np.flatnonzero(
+            (scores[: len(self._names)] >= needed) & self._alive[: len(self._names)]
+        )
+
+        # Best score first, ties in insertion order (matches is ascending)
+        order = np.argsort(-scores[matches], kind="stable")
+        if limit:
+            order = order[:limit]
+        return [self._names[item] for item in matches[order]]
+
+    def _array(self, gram: str):
+        array = self._arrays.get(gram)
+        if array is None:
+            postings = self._postings.get(gram)
+            if postings is None:
+                return np.zeros(0, dtype=np.intp)  # Typed, not cached
+            array = np.array(postings, dtype=np.intp)
+            self._arrays[gram] = array
+        return array
@@ -0,0 +1,242 @@
+import ctypes
+import ctypes.util
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+
+ADDED = "added"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+# inotify event masks (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class FileEntry:
+    """What the watcher knows about one file."""
+
+    __slots__ = ("mtime", "size", "status")
+
+    def __init__(self, mtime: float, size: int, status: str = "new"):
+        self.mtime = mtime
+        self.size = size
+        # Set by the owner of the cache, e.g. "loaded" or "failed"
+        self.status = status
+
+
+class FolderWatcher:
+    """
+    Keeps an index of the files of one folder (name -> FileEntry) and reports
+    what changes in it as (ADDED | MODIFIED | DELETED, name) events.
+
+    On Linux the kernel tells what changed (inotify), so the work per change
+    does not depend on the number of files. Elsewhere, or when inotify is not
+    available, the folder is polled: one scandir per poll_interval, compared
+    with the index.
+
+    Events are collected on the watcher thread and handed over through a
+    queue: the UI calls poll() from its own timer, so every widget update
+    stays on the Tk thread.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        accept=None,
+        poll_interval: float = 1.0,
+        use_inotify: bool = True,
+    ):
+        """
+        Initializes the FolderWatcher.
+
+        Args:
+            folder (str): Folder to watch (not recursive).
+            accept (callable): accept(name) -> bool, which files to index.
+                All files when None.
+            poll_interval (float): Seconds between two scans when polling.
+            use_inotify (bool): False forces polling.
+        """
+        self.folder = folder
+        self.accept = accept or (lambda name: True)
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and sys.platform.startswith("linux")
+
+        self._events = queue.Queue()
+        self._stop = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.entries = self._scan()
+
+    def _stat(self, name: str):
+        stat = os.stat(os.path.join(self.folder, name))
+        return stat.st_mtime, stat.st_size
+
+    def _scan(self):
+        entries = {}
+        try:
+            with os.scandir(self.folder) as it:
+                for item in it:
+                    if not self.accept(item.name) or not item.is_file():
+                        continue
+                    stat = item.stat()
+                    entries[item.name] = FileEntry(stat.st_mtime, stat.st_size)
+        except OSError as e:
+            print(f"Error listing {self.folder}: {e}")
+        return entries
+
+    def sorted_names(self):
+        """File names, oldest modification first (no stat needed)."""
+        with self._lock:
+            return sorted(self.entries, key=lambda name: self.entries[name].mtime)
+
+    # --- Index updates (watcher thread) ---
+
+    def _update(self, name: str):
+        """Re-stats one file and queues the event the change stands for."""
+        if not self.accept(name):
+            return
+
+        try:
+            mtime, size = self._stat(name)
+        except OSError:
+            self._remove(name)
+            return
+
+        with self._lock:
+            entry = self.entries.get(name)
+            if entry is None:
+                self.entries[name] = FileEntry(mtime, size)
+                event = ADDED
+            elif (entry.mtime, entry.size) != (mtime, size):
+                entry.mtime, entry.size = mtime, size
+                event = MODIFIED
+            else:
+                return
+        self._events.put((event, name))
+
+    def _remove(self, name: str):
+        with self._lock:
+            if self.entries.pop(name, None) is None:
+                return
+        self._events.put((DELETED, name))
+
+    def rescan(self):
+        """Full comparison of the folder with the index, O(files)."""
+        current = self._scan()
+
+        with self._lock:
+            known = dict(self.entries)
+
+        for name in known.keys() - current.keys():
+            self._remove(name)
+        for name, entry in current.items():
+            old = known.get(name)
+            if old is None or (old.mtime, old.size) != (entry.mtime, entry.size):
+                self._update(name)
+
+    # --- Thread ---
+
+    def _run_polling(self):
+        while not self._stop.wait(self.poll_interval):
+            self.rescan()
+
+    def _run_inotify(self, fd):
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.5)
+                if not ready:
+                    continue
+
+                data = os.read(fd, 64 * 1024)
+                offset = 0
+                while offset < len(data):
+                    _, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                    offset += EVENT_HEADER.size
+                    name = data[offset : offset + length].rstrip(b"\0")
+                    offset += length
+                    self._handle_inotify(mask, os.fsdecode(name))
+        finally:
+            os.close(fd)
+
+    def _handle_inotify(self, mask: int, name: str):
+        if mask & IN_Q_OVERFLOW:
+            self.rescan()  # The kernel dropped events
+        elif mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+            # The folder itself is gone, keep going by polling
+            print(f"{self.folder} moved or deleted, polling it instead")
+            self._stop.set()
+        elif mask & (IN_DELETE | IN_MOVED_FROM):
+            self._remove(name)
+        elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            self._update(name)
+
+    def _open_inotify(self):
+        """inotify file descriptor watching the folder, None if unavailable."""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+            if fd < 0:
+                return None
+            watch = libc.inotify_add_watch(
+                fd, os.fsencode(self.folder), ctypes.c_uint32(WATCH_MASK)
+            )
+            if watch < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def _run(self):
+        if self.use_inotify:
+            fd = self._open_inotify()
+            if fd is not None:
+                self._run_inotify(fd)
+                if self._stopping:
+                    return
+                self._stop.clear()
+                self.rescan()
+            else:
+                print(f"inotify unavailable, polling {self.folder}")
+
+        self._run_polling()
+
+    def start(self):
+        self._stopping = False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def poll(self):
+        """Returns the events queued since the last call (UI thread)."""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
@@ -0,0 +1,5 @@
+"""
+The soundboard without its window: clip library, playback, voice path and the
+control API, wired together by SoundboardEngine. No Tk import anywhere below,
+so it also runs on a headless box (python -m soundboard --headless).
+"""
@@ -0,0 +1,63 @@
+"""
+Runs the soundboard.
+
+Usage (from the repository root):
+    python -m soundboard              # with its window, like python main.py
+    python -m soundboard --headless   # no Tk, driven by hotkeys and the control API
+"""
+
+import argparse
+import signal
+import threading
+
+from soundboard import config
+from soundboard.engine import SoundboardEngine
+
+# Seconds between two block size checks, as in the GUI
+BLOCK_SIZE_CHECK_INTERVAL = 1.0
+
+
+def run_headless():
+    engine = SoundboardEngine()
+    engine.start()
+
+    # Ctrl+C and service managers (SIGTERM) both stop the engine cleanly
+    stopping = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+
+    effects = len(engine.voice_effect_chains)
+    print(f"Soundboard running headless, {effects} voice effects")
+    interval = config.LIBRARY_POLL_MS / 1000.0
+    elapsed = 0.0
+    try:
+        while not stopping.wait(interval):
+            for event, file in engine.poll()[0]:
+                print(f"Sound {event}: {file}")
+
+            elapsed += interval
+            if elapsed >= BLOCK_SIZE_CHECK_INTERVAL:
+                elapsed = 0.0
+                engine.check_block_size()
+    finally:
+        engine.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--headless", action="store_true", help="run without the window (no Tk)"
+    )
+    args = parser.parse_args()
+
+    if args.headless:
+        run_headless()
+    else:
+        # The window needs Tk, only imported here
+        from main import run_app
+
+        run_app()
+
+
+if __name__ == "__main__":
+    main()
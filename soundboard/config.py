@@ -0,0 +1,84 @@
+"""
+Audio settings of the soundboard, shared by the GUI and the headless mode
+"""
+
+import os
+
+# Devices are looked up by (part of) their name, see query_devices() of the backend
+# None means the system default device
+VIRTUAL_CABLE_DEVICE_NAME = "CABLE Input"
+VIRTUAL_CABLE_MONITOR_NAME = "CABLE Output"  # Capture side of the cable
+MICROPHONE_DEVICE_NAME = None
+MONITOR_DEVICE_NAME = None  # Headphones, plays the "monitor" output
+DEVICE_HOSTAPI = None  # e.g. "WASAPI" to prefer one host API
+
+AUDIO_BACKEND = "sounddevice"  # "sounddevice", "pyaudio" or "offline"
+
+CHUNK = 256  # Starting block size, adapted to the machine at runtime
+CHANNELS = 1
+RATE = 44100
+
+SOUNDS_FOLDER = "sounds"
+VOICES_FOLDER = "voice_effects"
+
+# Blocks over which a voice effect change fades from the old to the new one
+EFFECT_CROSSFADE_BLOCKS = 4
+
+# How often the changes of the sounds and voice_effects folders are applied
+LIBRARY_POLL_MS = 500
+
+# Loudness every sound is normalized to on playback, None plays them raw
+NORMALIZE_TARGET_LUFS = -16.0
+
+# Silence under this level is trimmed off both ends of the sounds, None keeps it
+TRIM_SILENCE_DB = -50.0
+
+# One stream for everything, see audio_engine/routing.py: the microphone, the
+# voice path and the clips are mixed in the app on one clock. False keeps
+# separate playback and voice streams to the virtual cable, mixed by the OS
+ROUTING = True
+
+# Gain of every route, {(source, output): gain}. Sources: "mic" (raw
+# microphone), "mic_fx" (after the voice effect), "clips" (the sound panel).
+# Outputs: "cable" (what the viewers hear), "monitor" (headphones, only
+# opened when a route goes to it). Add ("clips", "monitor"): 1.0 to hear the
+# sounds on MONITOR_DEVICE_NAME too
+ROUTES = {
+    ("mic_fx", "cable"): 1.0,
+    ("clips", "cable"): 1.0,
+}
+
+# Dynamics of what goes to the virtual cable and the monitor, see
+# audio_engine/dynamics.py. The limiter keeps peaks under the ceiling (dBFS)
+# and delays the output by its look-ahead, None disables it
+OUTPUT_LIMITER_CEILING_DB = -1.0
+OUTPUT_LIMITER_LOOKAHEAD_MS = 1.5
+# Compressor before the limiter, None disables it
+# e.g. {"threshold_db": -18.0, "ratio": 3.0, "makeup_db": 3.0}
+OUTPUT_COMPRESSOR = None
+
+# Recordings of what goes to the virtual cable (needs ROUTING), one file per
+# recording named after its start time, "flac" or "wav"
+RECORDINGS_FOLDER = "recordings"
+RECORDING_FORMAT = "flac"
+
+# Sounds playing at once, past it a voice is stolen: "oldest" or "quietest"
+MAX_VOICES = 32
+VOICE_STEALING = "oldest"
+
+# Per sound playback options, see Clip: polyphony limits the voices of the sound
+# (1 restarts it), a sound cuts the others of its choke_group
+# e.g. {"airhorn.wav": {"polyphony": 1, "choke_group": "horns"}}
+SOUND_OPTIONS = {}
+
+# Global hotkeys (pynput format) -> sound file, work even when the app has no focus
+# e.g. {"<ctrl>+<alt>+1": "airhorn.wav"}
+HOTKEYS = {}
+
+# Local control API for scripts (stream deck...), see audio_engine/control.py
+# None disables the Unix socket / the HTTP port, e.g. CONTROL_HTTP_PORT = 8765
+CONTROL_SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".soundboard.sock")
+CONTROL_HTTP_PORT = None
+
+# JSON lines file the audio health metrics are appended to, None disables it
+METRICS_LOG_PATH = None
@@ -0,0 +1,536 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from audio_engine.backends import get_backend
+from audio_engine.blocksize import BlockSizeController
+from audio_engine.control import ControlServer, EngineControl
+from audio_engine.devices import INPUT, OUTPUT, DeviceManager
+from audio_engine.dynamics import Compressor, Limiter
+from audio_engine.effects import EffectChain, reload_effect_module
+from audio_engine.hotkeys import HotkeyTrigger
+from audio_engine.metrics import MetricsLogger
+from audio_engine.playback import PlaybackEngine
+from audio_engine.recorder import Recorder
+from audio_engine.routing import CABLE, OUTPUTS, AudioRouter
+from audio_engine.voice import VoiceChanger
+from sound_library.library import SoundLibrary
+from sound_library.watcher import DELETED, FolderWatcher
+from soundboard import config
+
+
+class SoundboardEngine:
+    """
+    Everything the soundboard does, without a window: the devices, the clip
+    library, the playback stream, the live voice path with its effects, the
+    hotkeys and the control API.
+
+    Nothing in here touches Tk. The GUI is a client like the control API:
+    it calls play(), set_voice_effect()... and draws what poll() returns.
+    Headless, a plain loop calls poll() and check_block_size() instead (see
+    soundboard.__main__).
+    """
+
+    def __init__(
+        self,
+        sounds_folder: str = config.SOUNDS_FOLDER,
+        voices_folder: str = config.VOICES_FOLDER,
+        backend: str = config.AUDIO_BACKEND,
+        samplerate: int = config.RATE,
+        block_size: int = config.CHUNK,
+    ):
+        """
+        Initializes the SoundboardEngine, nothing is opened before start().
+
+        Args:
+            sounds_folder (str): Folder of the sound clips.
+            voices_folder (str): Folder of the voice effect modules.
+            backend (str): Audio backend name, see get_backend().
+            samplerate (int): Sample rate of every stream.
+            block_size (int): Starting block size, adapted at runtime.
+        """
+        self.sounds_folder = sounds_folder
+        self.voices_folder = voices_folder
+        self.samplerate = samplerate
+        self.block_size = block_size
+
+        # All streams are opened through one backend
+        self.audio_backend = get_backend(backend)
+
+        # Resolve devices by name and follow them when the device list changes
+        self.device_manager = DeviceManager(
+            query_devices=self.audio_backend.query_devices,
+            query_hostapis=self.audio_backend.query_hostapis,
+            rescan=self.audio_backend.rescan,
+            streams_open=self.streams_open,
+        )
+        self.init_devices()
+
+        # Clips, analysis and panel index of the sounds folder, loaded in the
+        # background once started
+        self.sound_library = SoundLibrary(
+            sounds_folder,
+            samplerate=samplerate,
+            block_size=block_size,
+            target_lufs=config.NORMALIZE_TARGET_LUFS,
+            trim_db=config.TRIM_SILENCE_DB,
+            options=config.SOUND_OPTIONS,
+        )
+        self.audio_cache = self.sound_library.cache
+
+        # Sound playback goes through one stream that stays open
+        self.playback_engine = PlaybackEngine(
+            samplerate=samplerate,
+            block_size=block_size,
+            max_voices=config.MAX_VOICES,
+            steal=config.VOICE_STEALING,
+        )
+        self.playback_engine.on_stream_lost = self.device_manager.request_rescan
+
+        # Keys trigger cached clips from their own thread, a busy UI can't delay them
+        self.hotkeys = HotkeyTrigger(
+            self.playback_engine,
+            lambda name: self.audio_cache.get(self.sound_library.path(name)),
+            config.HOTKEYS,
+        )
+
+        # Live microphone path, started when a voice effect is picked
+        self.voice_path = VoiceChanger(
+            samplerate=samplerate,
+            block_size=block_size,
+            crossfade_blocks=config.EFFECT_CROSSFADE_BLOCKS,
+        )
+        self.voice_path.on_stream_lost = self.device_manager.request_rescan
+        self.current_voice_changer = "Normal"
+        self.voice_effect_chains = {}  # "robot_effect.py" -> EffectChain
+        self.noise_suppression = None
+
+        # Routed, one stream runs the clips and the voice path and feeds the
+        # cable and the monitor. Otherwise each has its own stream to the cable
+        self.router = None
+        if config.ROUTING:
+            self.router = AudioRouter(
+                self.playback_engine,
+                self.voice_path,
+                samplerate=samplerate,
+                block_size=block_size,
+                routes=config.ROUTES,
+            )
+            self.router.on_stream_lost = self.device_manager.request_rescan
+            self.router.output_stages = [
+                self.make_output_stage(samplerate) for _ in OUTPUTS
+            ]
+        # Archive of what goes to the cable, written from its own thread
+        self.recorder = Recorder(samplerate)
+        if self.router is not None:
+            self.router.recorder = self.recorder
+        else:
+            self.playback_engine.output_stage = self.make_output_stage(samplerate)
+            self.voice_path.output_stage = self.make_output_stage(samplerate)
+
+        # __init__.py, __pycache__ and private helper modules are left out
+        self.voice_watcher = FolderWatcher(
+            voices_folder,
+            accept=lambda name: name.endswith(".py") and not name.startswith("_"),
+        )
+
+        self.metrics = [self.voice_path.metrics, self.playback_engine.metrics]
+        if self.router is not None:
+            self.metrics.append(self.router.metrics)
+        self.metrics_logger = None
+        if config.METRICS_LOG_PATH:
+            self.metrics_logger = MetricsLogger(self.metrics, config.METRICS_LOG_PATH)
+
+        # Smallest block size that runs without glitches, or the pinned one
+        # Routed, the deadline is the one of the router callback running both
+        self.block_controller = BlockSizeController(
+            [self.router.metrics] if self.router is not None else self.metrics,
+            samplerate=samplerate,
+            block_size=block_size,
+            on_change=self.apply_block_size,
+        )
+
+        # Requests run on the server thread against the engine, never Tk
+        self.control_server = ControlServer(
+            EngineControl(
+                self.playback_engine,
+                voice=self.voice_path,
+                router=self.router,
+                resolve_clip=lambda name: self.audio_cache.get(
+                    self.sound_library.path(name or "")
+                ),
+                resolve_effect=self.resolve_control_effect,
+                record=self.set_recording,
+                recorder=self.recorder,
+            ),
+            socket_path=config.CONTROL_SOCKET_PATH,
+            http_port=config.CONTROL_HTTP_PORT,
+        )
+
+    def start(self):
+        """
+        Opens the playback stream, loads and measures the voice effects, then
+        starts the library loader, the watchers, the hotkeys and the control
+        API. The voice path opens with the first voice effect.
+        """
+        self.device_manager.start_watching()
+        self.start_playback_engine()
+        self.hotkeys.start()
+        if self.metrics_logger is not None:
+            self.metrics_logger.start()
+
+        for file in self.voice_watcher.sorted_names():
+            self.warmup_voice_changer(file)
+        self.voice_watcher.start()
+        self.calibrate_block_size()
+
+        self.sound_library.start()
+        if config.CONTROL_SOCKET_PATH or config.CONTROL_HTTP_PORT is not None:
+            self.control_server.start()
+
+    def stop(self):
+        self.control_server.stop()
+        self.recorder.stop()
+        self.hotkeys.stop()
+        self.device_manager.stop_watching()
+        self.sound_library.stop()
+        self.voice_watcher.stop()
+        if self.router is not None:
+            self.router.stop()
+        self.voice_path.stop()
+        self.playback_engine.stop()
+        if self.metrics_logger is not None:
+            self.metrics_logger.stop()
+
+    def poll(self):
+        """
+        Applies the changes of the sounds and voice_effects folders, returns
+        them as (sound updates, voice effect updates) for the UI: lists of
+        (ADDED | MODIFIED | DELETED, file). A voice effect that fails to load
+        is left out. Called from one thread (the UI timer or the headless
+        loop).
+        """
+        # The clip cache is already updated when an event gets here
+        sound_updates = self.sound_library.poll()
+        voice_updates = [
+            (event, file)
+            for event, file in self.voice_watcher.poll()
+            if self.on_voice_changer_file_changed(event, file)
+        ]
+        return sound_updates, voice_updates
+
+    # --- Output bus section ---
+
+    def cable_level(self):
+        """Meter level (0.0..1.0) of what goes to the virtual cable"""
+        if self.router is not None:
+            return self.router.meters[OUTPUTS.index(CABLE)].level
+        return max(self.voice_path.output_meter.level, self.playback_engine.meter.level)
+
+    @staticmethod
+    def make_output_stage(samplerate: int):
+        """
+        Compressor and limiter of one stream going to the virtual cable, as
+        configured, None when both are off. Each stream gets its own, they
+        keep state.
+        """
+        stages = []
+        if config.OUTPUT_COMPRESSOR is not None:
+            stages.append(Compressor(samplerate, **config.OUTPUT_COMPRESSOR))
+        if config.OUTPUT_LIMITER_CEILING_DB is not None:
+            stages.append(
+                Limiter(
+                    samplerate,
+                    ceiling_db=config.OUTPUT_LIMITER_CEILING_DB,
+                    lookahead_ms=config.OUTPUT_LIMITER_LOOKAHEAD_MS,
+                )
+            )
+        if not stages:
+            return None
+
+        chain = EffectChain(stages)
+        # numba compiles on the first call, not in the audio callback
+        chain.process(np.zeros(256, dtype=np.float32))
+        chain.reset()
+        return chain
+
+    # --- Devices section ---
+
+    def init_devices(self):
+        self.device_manager.add_role(
+            "virtual_cable",
+            config.VIRTUAL_CABLE_DEVICE_NAME,
+            OUTPUT,
+            config.DEVICE_HOSTAPI,
+        )
+        self.device_manager.add_role(
+            "virtual_cable_monitor",
+            config.VIRTUAL_CABLE_MONITOR_NAME,
+            INPUT,
+            config.DEVICE_HOSTAPI,
+        )
+        self.device_manager.add_role(
+            "microphone", config.MICROPHONE_DEVICE_NAME, INPUT, config.DEVICE_HOSTAPI
+        )
+        self.device_manager.add_role(
+            "monitor", config.MONITOR_DEVICE_NAME, OUTPUT, config.DEVICE_HOSTAPI
+        )
+        self.device_manager.add_listener(self.on_device_changed)
+
+    def streams_open(self):
+        """True while a stream is open (the device watcher can't rescan then)"""
+        if self.router is not None:
+            return self.router.active
+        return self.playback_engine.stream is not None or self.voice_path.active
+
+    def on_device_changed(self, role, device_index):
+        """Called from the device watcher thread"""
+        print(f"Audio device for {role} changed to {device_index}")
+
+        if self.router is not None:
+            if role in ("virtual_cable", "microphone", "monitor"):
+                try:
+                    self.router.reopen(
+                        self.device_manager.resolve("microphone"),
+                        self.device_manager.resolve("virtual_cable"),
+                        self.device_manager.resolve("monitor"),
+                    )
+                except Exception as e:
+                    print(f"Error reopening router streams: {e}")
+            return
+
+        if role == "virtual_cable":
+            try:
+                self.playback_engine.reopen(device_index)
+            except Exception as e:
+                print(f"Error reopening playback stream: {e}")
+
+        if role in ("virtual_cable", "microphone"):
+            try:
+                self.voice_path.reopen(
+                    self.device_manager.resolve("microphone"),
+                    self.device_manager.resolve("virtual_cable"),
+                )
+            except Exception as e:
+                print(f"Error reopening voice changer stream: {e}")
+
+    # --- End of Devices section ---
+
+    # --- Block size section ---
+
+    def calibrate_block_size(self):
+        """Measures the effects at every block size"""
+        chains = list(self.voice_effect_chains.values())
+
+        def process(block):
+            # Worst case: every effect on the same block, plus metering
+            for chain in chains:
+                chain.process(block)
+            self.voice_path.input_meter.process(block)
+
+        self.block_controller.calibrate(process)
+        for chain in chains:
+            chain.reset()
+
+    def check_block_size(self):
+        """Adapts the block size to the recent load, call it every second"""
+        self.block_controller.check()
+
+    def set_latency_target(self, latency_ms):
+        """Pins the latency (ms), None goes back to the automatic choice"""
+        self.block_controller.pin_latency(latency_ms)
+
+    def apply_block_size(self, block_size):
+        """Reopens the streams with the new block size, the audio keeps running"""
+        self.block_size = block_size
+        self.sound_library.block_size = block_size
+        try:
+            self.voice_path.set_block_size(block_size)
+            self.playback_engine.set_block_size(
+                block_size, clips=list(self.audio_cache.values())
+            )
+            if self.router is not None:
+                self.router.set_block_size(block_size)
+        except Exception as e:
+            print(f"Error changing block size: {e}")
+
+    # --- End of Block size section ---
+
+    # --- Voice path section ---
+
+    def warmup_voice_changer(self, file):
+        """Loads an effect and runs it once (numba compiles on the first call)"""
+        try:
+            chain = EffectChain.from_specs([file[:-3]], self.samplerate)
+            chain.process(np.zeros(1024, dtype=np.float32))
+            chain.reset()
+        except Exception as e:
+            print(f"Failed to load voice effect {file}: {e}")
+            return None
+
+        self.voice_effect_chains[file] = chain
+        return chain
+
+    def on_voice_changer_file_changed(self, event, file):
+        """
+        Applies one change of the voice_effects folder. Returns False when a
+        new or changed effect failed to load.
+        """
+        loaded = True
+        if event == DELETED:
+            self.voice_effect_chains.pop(file, None)
+        else:
+            try:
+                reload_effect_module(file[:-3])
+            except Exception as e:
+                print(f"Failed to reload voice effect {file}: {e}")
+                return False
+            loaded = self.warmup_voice_changer(file) is not None
+
+        # The playing instance is replaced (or dropped) too
+        if file == self.current_voice_changer:
+            self.voice_path.set_effect(self.voice_effect_chains.get(file))
+        return loaded
+
+    def set_voice_effect(self, name):
+        """Switches the voice effect ("Normal" for none), opening the voice path"""
+        self.current_voice_changer = name
+        self.voice_path.set_effect(self.voice_effect_chains.get(name))
+
+        # There is no separate start button, picking an effect starts the path
+        if not self.voice_path.active:
+            self.start_voice_changer()
+
+        print(f"Voice changer set to: {name}")
+
+    def start_voice_changer(self):
+        if self.router is not None:
+            self.router.start_voice()
+            return
+        try:
+            self.voice_path.start(
+                self.audio_backend,
+                input_device=self.device_manager.resolve("microphone"),
+                output_device=self.device_manager.resolve("virtual_cable"),
+            )
+        except Exception as e:
+            print(f"Error opening voice changer stream: {e}")
+
+    def stop_voice_changer(self):
+        if self.router is not None:
+            self.router.stop_voice()
+            return
+        self.voice_path.stop()
+
+    def set_noise_suppression(self, enabled: bool):
+        """Mic cleanup before the voice effect. False if it could not load."""
+        if not enabled:
+            self.voice_path.pre_effect = None
+            self.voice_path.idle_gain = 1.0
+            return True
+
+        if self.noise_suppression is None:
+            try:
+                chain = EffectChain.from_specs(["noise_cancel"], self.samplerate)
+                # numba compiles on the first call
+                chain.process(np.zeros(1024, dtype=np.float32))
+            except Exception as e:
+                print(f"Failed to load noise suppression: {e}")
+                return False
+            self.noise_suppression = chain
+
+        # Fresh noise floor estimate for the current room
+        self.noise_suppression.reset()
+        # While the voice gate is closed the noise is attenuated just as much
+        self.voice_path.idle_gain = self.noise_suppression.effects[0].floor
+        self.voice_path.pre_effect = self.noise_suppression
+        return True
+
+    def resolve_control_effect(self, name):
+        """Effect chain of a control API request (server thread)"""
+        effect = None
+        if name not in (None, "Normal"):
+            effect = self.voice_effect_chains[name]
+        self.current_voice_changer = name or "Normal"
+        if not self.voice_path.active:
+            self.start_voice_changer()
+        return effect
+
+    # --- End of Voice path section ---
+
+    # --- Playback section ---
+
+    def start_playback_engine(self):
+        if self.router is not None:
+            try:
+                self.router.start(
+                    self.audio_backend,
+                    input_device=self.device_manager.resolve("microphone"),
+                    output_device=self.device_manager.resolve("virtual_cable"),
+                    monitor_device=self.device_manager.resolve("monitor"),
+                )
+            except Exception as e:
+                print(f"Error opening router streams: {e}")
+            return
+        try:
+            self.playback_engine.start(
+                self.audio_backend, device=self.device_manager.resolve("virtual_cable")
+            )
+        except Exception as e:
+            print(f"Error opening playback stream: {e}")
+
+    def play(self, name):
+        """Plays a sound of the sounds folder, decoding it first if needed"""
+        clip = self.audio_cache.get(self.sound_library.path(name))
+        if clip is None:
+            thread = threading.Thread(target=self.play_audio_fallback, args=(name,))
+            thread.daemon = True
+            thread.start()
+            return
+
+        # Only queues the clip, it starts at the next audio callback
+        self.playback_engine.trigger(clip)
+
+    def play_audio_fallback(self, name):
+        """Fallback method for playing non-preloaded audio"""
+        try:
+            clip = self.sound_library.load(name)
+            if clip is not None:
+                self.playback_engine.trigger(clip)
+
+        except Exception as e:
+            print(f"Error in fallback audio playback: {e}")
+
+    def stop_all(self):
+        self.playback_engine.stop_all()
+
+    # --- End of Playback section ---
+
+    # --- Recording section ---
+
+    def set_recording(self, enabled: bool):
+        """
+        Starts recording what goes to the virtual cable to a new file of the
+        recordings folder, or stops. Returns the file, None when stopped or
+        when it could not start.
+        """
+        if not enabled:
+            self.recorder.stop()
+            return None
+        if self.router is None:
+            print("Recording needs ROUTING, the cable is mixed by the OS otherwise")
+            return None
+
+        os.makedirs(config.RECORDINGS_FOLDER, exist_ok=True)
+        name = time.strftime("%Y-%m-%d_%H-%M-%S") + "." + config.RECORDING_FORMAT
+        path = os.path.join(config.RECORDINGS_FOLDER, name)
+        return path if self.recorder.start(path) else None
+
+    # --- End of Recording section ---
+
+    def refresh_sounds(self):
+        """Looks for changes the watcher missed, they apply at the next poll"""
+        self.sound_library.watcher.rescan()
+
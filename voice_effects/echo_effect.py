@@ -0,0 +1,60 @@
+import numpy as np
+
+
+class EchoEffect:
+    """
+    Feedback echo: the voice comes back every delay_ms, quieter each time.
+
+    The delay line is a ring buffer of exactly one delay. A chunk of up to one
+    delay only depends on samples that are already in the ring, so blocks are
+    processed with whole-array numpy operations instead of a per-sample loop,
+    whatever the block size.
+    """
+
+    expensive = False
+    latency = 0
+
+    def __init__(self, samplerate=44100, delay_ms=250.0, feedback=0.4, mix=0.5):
+        self.samplerate = samplerate
+        self.feedback = feedback
+        self.mix = mix
+
+        self.ring = np.zeros(max(1, int(samplerate * delay_ms / 1000.0)), np.float32)
+        self.pos = 0
+
+    def _process_chunk(self, chunk, output):
+        """Processes at most one delay worth of samples."""
+        size = len(self.ring)
+        count = len(chunk)
+        first = min(count, size - self.pos)
+
+        # What went into the delay line one delay ago
+        delayed = np.concatenate(
+            (self.ring[self.pos : self.pos + first], self.ring[: count - first])
+        )
+
+        # Feed the input plus the attenuated echo back into the delay line
+        feed = chunk + self.feedback * delayed
+        self.ring[self.pos : self.pos + first] = feed[:first]
+        self.ring[: count - first] = feed[first:]
+        self.pos = (self.pos + count) % size
+
+        np.multiply(delayed, self.mix, out=output)
+        output += chunk
+
+    def process(self, block):
+        output = np.empty_like(block)
+        size = len(self.ring)
+        for start in range(0, len(block), size):
+            self._process_chunk(
+                block[start : start + size], output[start : start + size]
+            )
+        return output
+
+    def reset(self):
+        self.ring.fill(0.0)
+        self.pos = 0
+
+
+def create_effect(samplerate, **params):
+    return EchoEffect(samplerate, **params)
@@ -1 +1,179 @@
+import numpy as np
+from numba import jit
+from numpy.lib.stride_tricks import sliding_window_view
 
+
+@jit(nopython=True, cache=True)
+def _spectral_gate_core(
+    power, smoothed, noise, gains, smoothing, adapt, rise, threshold, floor, release
+):
+    """
+    Per frame and bin: tracks the noise floor and computes the gate gain.
+    The noise floor averages the power of the bins that look like noise and
+    only creeps up slowly under voice, so it settles on the background level
+    """
+    output = np.empty_like(power)
+
+    for frame in range(power.shape[0]):
+        for b in range(power.shape[1]):
+            smoothed[b] += (1.0 - smoothing) * (power[frame, b] - smoothed[b])
+
+            snr = smoothed[b] / (noise[b] + 1e-12)
+            if snr < threshold:
+                noise[b] = adapt * noise[b] + (1.0 - adapt) * smoothed[b]
+            else:
+                noise[b] *= rise
+
+            # Soft gate: full reduction at the noise floor, open at threshold
+            if snr >= threshold:
+                target = 1.0
+            elif snr <= 1.0:
+                target = floor
+            else:
+                target = floor + (1.0 - floor) * (snr - 1.0) / (threshold - 1.0)
+
+            # Open at once, close slowly, to keep word endings
+            if target >= gains[b]:
+                gains[b] = target
+            else:
+                gains[b] = target + (gains[b] - target) * release
+
+            output[frame, b] = gains[b]
+
+    return output
+
+
+class NoiseSuppressor:
+    """
+    Streaming noise suppression by spectral gating.
+
+    The signal is cut in Hann windowed frames (75% overlap), every frequency
+    bin is attenuated when it is not clearly above the adaptive noise floor
+    estimate, and the frames are overlap-added back. Input and output frames
+    do not line up with the stream blocks, so both sides are buffered and the
+    effect has a fixed latency of fft_size samples.
+
+    All frames that complete in a block go through one batched FFT, and the
+    per-bin work is a numba loop, so the cost per sample is the same for every
+    block size and does not depend on the signal: the CPU budget per block is
+    fixed.
+    """
+
+    expensive = True
+
+    def __init__(
+        self,
+        samplerate=44100,
+        fft_size=512,
+        reduction_db=18.0,
+        threshold_db=9.0,
+        noise_adapt_ms=500.0,
+        floor_rise_db_per_s=3.0,
+        release_ms=80.0,
+    ):
+        """
+        Initializes the NoiseSuppressor.
+
+        Args:
+            samplerate (int): Sample rate of the blocks.
+            fft_size (int): Frame length, also the latency in samples.
+            reduction_db (float): Attenuation of the bins that are noise.
+            threshold_db (float): How far above the noise floor a bin is
+                considered voice.
+            noise_adapt_ms (float): Time constant of the noise floor average.
+            floor_rise_db_per_s (float): How fast the noise floor estimate can
+                rise when the background gets louder.
+            release_ms (float): How fast the gate closes after voice.
+        """
+        self.samplerate = samplerate
+        self.fft_size = fft_size
+        self.hop = fft_size // 4
+        self.latency = fft_size
+
+        # Periodic Hann for analysis and synthesis, normalized for the overlap
+        phase = 2 * np.pi * np.arange(fft_size) / fft_size
+        self.window = (0.5 - 0.5 * np.cos(phase)).astype(np.float32)
+        self.synthesis_window = self.window * (self.hop / np.sum(self.window**2))
+
+        frame_rate = samplerate / self.hop
+        self.smoothing = 0.7
+        self.adapt = np.exp(-1.0 / (noise_adapt_ms / 1000.0 * frame_rate))
+        self.rise = 10 ** (floor_rise_db_per_s / 10.0 / frame_rate)
+        self.threshold = 10 ** (threshold_db / 10.0)
+        self.floor = 10 ** (-reduction_db / 20.0)
+        self.release = np.exp(-1.0 / (release_ms / 1000.0 * frame_rate))
+
+        self.reset()
+
+    def reset(self):
+        bins = self.fft_size // 2 + 1
+        self.smoothed = np.zeros(bins)
+        self.noise = np.zeros(bins)
+        self.gains = np.ones(bins)
+        self._frames = 0
+
+        # Input not yet part of a full frame, overlap-add tail, ready output
+        self._input = np.zeros(self.fft_size - self.hop, dtype=np.float32)
+        self._tail = np.zeros(self.fft_size - self.hop, dtype=np.float32)
+        self._output = np.zeros(self.hop, dtype=np.float32)
+
+    def _process_frames(self, pending, count):
+        size, hop = self.fft_size, self.hop
+
+        frames = sliding_window_view(pending, size)[::hop][:count] * self.window
+        spectrum = np.fft.rfft(frames, axis=1)
+        power = spectrum.real**2 + spectrum.imag**2
+
+        # The first frames overlap the zero history, the noise floor starts
+        # from the first full frame
+        first_full = size // hop - 1 - self._frames
+        if 0 <= first_full < count:
+            self.smoothed[:] = power[first_full]
+            self.noise[:] = power[first_full]
+        self._frames += count
+
+        gains = _spectral_gate_core(
+            power,
+            self.smoothed,
+            self.noise,
+            self.gains,
+            self.smoothing,
+            self.adapt,
+            self.rise,
+            self.threshold,
+            self.floor,
+            self.release,
+        )
+        frames = np.fft.irfft(spectrum * gains, n=size, axis=1)
+        frames *= self.synthesis_window
+
+        # Overlap-add: sum the four hop-sized quarters of every frame
+        added = np.zeros(count * hop + size - hop, dtype=np.float32)
+        added[: size - hop] += self._tail
+        for quarter in range(size // hop):
+            start = quarter * hop
+            added[start : start + count * hop] += frames[
+                :, start : start + hop
+            ].reshape(-1)
+
+        self._tail = added[count * hop :]
+        return added[: count * hop]
+
+    def process(self, block):
+        pending = np.concatenate((self._input, block))
+
+        count = 0
+        if len(pending) >= self.fft_size:
+            count = (len(pending) - self.fft_size) // self.hop + 1
+            ready = self._process_frames(pending, count)
+            self._output = np.concatenate((self._output, ready))
+
+        self._input = pending[count * self.hop :]
+
+        output = self._output[: len(block)]
+        self._output = self._output[len(block) :]
+        return output
+
+
+def create_effect(samplerate, **params):
+    return NoiseSuppressor(samplerate, **params)
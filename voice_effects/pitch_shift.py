@@ -0,0 +1,79 @@
+import numpy as np
+from numba import jit
+
+
+@jit(nopython=True, cache=True)
+def _pitch_shift_core(audio, buffer, write_pos, phase, phase_step, window):
+    """
+    Delay line pitch shifter.
+    Two read taps sweep through a window of delay at a speed that resamples
+    the voice by the shift factor, half a window apart. Each tap fades out
+    (sin^2) before it wraps around, so the two gains always sum to 1
+    """
+    size = len(buffer)
+    output = np.empty_like(audio)
+
+    for i in range(len(audio)):
+        buffer[write_pos] = audio[i]
+
+        sample = 0.0
+        for tap in range(2):
+            tap_phase = phase + 0.5 * tap
+            if tap_phase >= 1.0:
+                tap_phase -= 1.0
+
+            # Read between two samples, linear interpolation
+            read_pos = write_pos - tap_phase * window
+            index = np.floor(read_pos)
+            frac = read_pos - index
+            i0 = int(index) % size
+            i1 = (i0 + 1) % size
+            tap_sample = buffer[i0] * (1.0 - frac) + buffer[i1] * frac
+
+            gain = np.sin(np.pi * tap_phase)
+            sample += tap_sample * gain * gain
+
+        output[i] = sample
+
+        phase += phase_step
+        if phase >= 1.0:
+            phase -= 1.0
+        elif phase < 0.0:
+            phase += 1.0
+        write_pos = (write_pos + 1) % size
+
+    return output, write_pos, phase
+
+
+class PitchShiftEffect:
+    """Shifts the voice pitch by a factor (1.5 is higher, 0.7 is lower)."""
+
+    expensive = True
+    latency = 0
+
+    def __init__(self, samplerate=44100, factor=1.5, window_ms=40.0):
+        self.samplerate = samplerate
+        self.factor = factor
+        self.window = samplerate * window_ms / 1000.0
+
+        # The delay changes by (1 - factor) samples per sample
+        self.phase_step = (1.0 - factor) / self.window
+
+        self.buffer = np.zeros(int(self.window) + 2, dtype=np.float32)
+        self.write_pos = 0
+        self.phase = 0.0
+
+    def process(self, block):
+        output, self.write_pos, self.phase = _pitch_shift_core(
+            block, self.buffer, self.write_pos, self.phase, self.phase_step, self.window
+        )
+        return output
+
+    def reset(self):
+        self.buffer.fill(0.0)
+        self.write_pos = 0
+        self.phase = 0.0
+
+
+def create_effect(samplerate, **params):
+    return PitchShiftEffect(samplerate, **params)
@@ -19,3 +19,44 @@ def _robot_effect_core_int16(audio_int16):
     # Clip to prevent overflow and convert back
     robot_audio_clipped = np.clip(robot_audio_float, -32768, 32767)
     return robot_audio_clipped.astype(np.int16)
+
+
+@jit(nopython=True, cache=True)
+def _robot_effect_core(audio, phase, phase_step):
+    """
+    Streaming version of the robot effect on float32 blocks.
+    The modulator phase is carried from block to block, so the result does
+    not depend on the block size (the int16 core restarts it every block)
+    """
+    output = np.empty_like(audio)
+    for i in range(len(audio)):
+        output[i] = audio[i] * (np.sin(phase) * 0.5 + 0.5)
+        phase += phase_step
+
+    return output, phase % (2 * np.pi)
+
+
+class RobotEffect:
+    """Ring modulates the voice with a sine, which sounds metallic."""
+
+    expensive = False
+    latency = 0
+
+    # 5 modulator periods per 256 samples at 44.1 kHz, like the int16 core
+    DEFAULT_FREQUENCY = 5 * 44100 / 256
+
+    def __init__(self, samplerate=44100, frequency=DEFAULT_FREQUENCY):
+        self.samplerate = samplerate
+        self.phase_step = 2 * np.pi * frequency / samplerate
+        self.phase = 0.0
+
+    def process(self, block):
+        output, self.phase = _robot_effect_core(block, self.phase, self.phase_step)
+        return output
+
+    def reset(self):
+        self.phase = 0.0
+
+
+def create_effect(samplerate, **params):
+    return RobotEffect(samplerate, **params)